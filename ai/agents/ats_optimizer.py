@@ -1,8 +1,9 @@
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from typing import List
 
 from graph.state import AgentState
+from tools.llm_client import invoke_llm
+from tools.advice_rules import use_rule_based_advice, generate_ats_recommendations
 from config import config
 
 def ats_optimizer_agent(state: AgentState) -> AgentState:
@@ -10,10 +11,18 @@ def ats_optimizer_agent(state: AgentState) -> AgentState:
     Agent responsible for providing ATS optimization recommendations
     """
     try:
+        if use_rule_based_advice(state):
+            state['ats_recommendations'] = generate_ats_recommendations(
+                state.get('job_title') or 'the position',
+                state['matched_skills'],
+                state['missing_skills'],
+            )
+            state['messages'].append("✅ ATS optimization recommendations generated (rule-based)")
+            state['current_step'] = "ats_optimized"
+            return state
+
         # If combining with career advisor, do both in one call
         if config.COMBINE_ADVICE_CALLS:
-            llm = ChatOpenAI(model=config.MODEL_NAME, temperature=config.TEMPERATURE)
-            
             prompt = ChatPromptTemplate.from_messages([
                 ("system", """You are an expert career consultant and ATS specialist. 
                 Provide specific, actionable recommendations."""),
@@ -42,14 +51,12 @@ CAREER_ADVICE:
 Focus on actionable, specific suggestions.""")
             ])
             
-            chain = prompt | llm
-            
-            response = chain.invoke({
+            response = invoke_llm("ats_optimizer", prompt.invoke({
                 "match_score": state['match_score'],
                 "matched_skills": ", ".join(state['matched_skills'][:10]),
                 "missing_skills": ", ".join(state['missing_skills'][:10]),
                 "job_title": state.get('job_title', 'the position')
-            })
+            }))
             
             # Parse the combined response
             content = response.content
@@ -71,8 +78,6 @@ Focus on actionable, specific suggestions.""")
             
         else:
             # Original separate call
-            llm = ChatOpenAI(model=config.MODEL_NAME, temperature=config.TEMPERATURE)
-            
             prompt = ChatPromptTemplate.from_messages([
                 ("system", """You are an expert ATS (Applicant Tracking System) consultant. 
                 Provide specific, actionable recommendations to optimize resumes for ATS systems."""),
@@ -86,13 +91,11 @@ Focus on actionable, specific suggestions.""")
                 """)
             ])
             
-            chain = prompt | llm
-            
-            response = chain.invoke({
+            response = invoke_llm("ats_optimizer", prompt.invoke({
                 "match_score": state['match_score'],
                 "matched_skills": ", ".join(state['matched_skills'][:10]),
                 "missing_skills": ", ".join(state['missing_skills'][:10]),
-            })
+            }))
             
             # Parse recommendations from response
             lines = [line.strip().lstrip("- ").lstrip("•").strip() for line in response.content.split("\n") if line.strip()]
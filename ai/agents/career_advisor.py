@@ -1,7 +1,8 @@
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 
 from graph.state import AgentState
+from tools.llm_client import invoke_llm
+from tools.advice_rules import use_rule_based_advice, generate_career_advice
 from config import config
 
 def career_advisor_agent(state: AgentState) -> AgentState:
@@ -13,9 +14,11 @@ def career_advisor_agent(state: AgentState) -> AgentState:
         if config.COMBINE_ADVICE_CALLS and state.get('career_advice'):
             # Career advice already populated by ATS optimizer
             pass
+        elif use_rule_based_advice(state):
+            state['career_advice'] = generate_career_advice(
+                state['match_score'], state['matched_skills'], state['missing_skills']
+            )
         else:
-            llm = ChatOpenAI(model=config.MODEL_NAME, temperature=0.5)
-            
             prompt = ChatPromptTemplate.from_messages([
                 ("system", """You are a professional career advisor. Provide personalized, actionable career development advice."""),
                 ("human", """Based on this analysis, provide career development advice:
@@ -28,14 +31,12 @@ Areas for Improvement: {weaknesses}
 Provide 5 specific career development recommendations as a simple list.""")
             ])
             
-            chain = prompt | llm
-            
-            response = chain.invoke({
+            response = invoke_llm("career_advisor", prompt.invoke({
                 "job_title": state.get('job_title', 'the position'),
                 "match_score": state['match_score'],
                 "strengths": ", ".join(state['strengths'][:5]),
                 "weaknesses": ", ".join(state['weaknesses'][:5]),
-            })
+            }), temperature=0.5)
             
             # Parse recommendations
             lines = [line.strip().lstrip("- ").lstrip("•").strip() for line in response.content.split("\n") if line.strip()]
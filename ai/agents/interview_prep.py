@@ -2,10 +2,10 @@
 Interview Prep Agent - Generates likely interview questions based on JD and resume gaps.
 """
 
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from graph.state import AgentState
-from config import config
+from tools.llm_client import invoke_llm
+from tools.advice_rules import use_rule_based_advice, generate_interview_questions
 
 
 def interview_prep_agent(state: AgentState) -> AgentState:
@@ -14,8 +14,17 @@ def interview_prep_agent(state: AgentState) -> AgentState:
     Based on job requirements, missing skills, and company context.
     """
     try:
-        llm = ChatOpenAI(model=config.MODEL_NAME, temperature=0.5)
-        
+        if use_rule_based_advice(state):
+            questions = generate_interview_questions(
+                state.get('job_title') or 'Software Engineer',
+                state.get('job_skills', []),
+                state.get('matched_skills', []),
+                state.get('missing_skills', []),
+            )
+            state['interview_questions'] = questions
+            state['messages'].append(f"✅ Generated {len(questions)} interview questions (rule-based)")
+            return state
+
         prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a senior technical interviewer. Generate realistic interview questions 
             that this candidate will likely face based on the job requirements and their background.
@@ -49,14 +58,14 @@ TIP: [Advice]
         company_intel = state.get('company_intel', {})
         company_tech = ', '.join(company_intel.get('recent_tech', []))
         
-        response = llm.invoke(prompt.format(
+        response = invoke_llm("interview_prep", prompt.format(
             job_title=state.get('job_title', 'Software Engineer'),
             job_skills=', '.join(state.get('job_skills', [])[:15]),
             resume_skills=', '.join(state.get('resume_skills', [])[:15]),
             missing_skills=', '.join(state.get('missing_skills', [])[:10]),
             match_score=state.get('match_score', 0),
             company_tech=company_tech or 'Not available'
-        ))
+        ), temperature=0.5)
         
         # Parse questions
         questions = _parse_questions(response.content)
@@ -1,13 +1,19 @@
 """
 Investigator Agent - Researches company information, tech stack, and engineering culture.
 Runs in parallel with other agents after job parsing.
+Research that ran and found nothing is cached too, for COMPANY_NEGATIVE_TTL, so
+unknown companies do not trigger a web search and LLM call on every request.
+Failures (search or LLM errors, timeouts, open circuits) are not cached: the
+request gets generic intel and the next one researches again.
 """
 
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from graph.state import AgentState
 from tools.web_scraper import web_scraper
 from tools.cache import cache, company_cache_key
+from tools.company_names import normalize_company_name
+from tools.llm_client import invoke_llm
+from tools.usage_ledger import record_usage, CACHE_HIT
 from config import config
 
 
@@ -24,33 +30,117 @@ def investigator_agent(state: AgentState) -> AgentState:
             job_desc = state.get('job_description', '')
             company_name = _extract_company_name(job_desc)
         
-        # Check cache first for company intel
+        if not normalize_company_name(company_name):
+            # Nothing to search for: skip research instead of querying a blank name
+            state['company_intel'] = _fallback_intel(company_name)
+            state['messages'].append("⏭️ Company research skipped (no company name found)")
+            return state
+        
         cache_key = company_cache_key(company_name)
-        cached_intel = cache.get(cache_key)
-        if cached_intel:
-            print(f"🎯 Company Intel Cache HIT: {company_name}")
-            state['company_intel'] = cached_intel
-            state['messages'].append(f"✅ Company intel loaded from cache for {company_name}")
+        
+        if state.get('fast_mode'):
+            # No web search or LLM call in fast mode; only cached intel is used
+            cached_intel = cache.peek(cache_key)
+            if cached_intel:
+                print(f"🎯 Company Intel Cache HIT: {company_name}")
+                record_usage("investigator", cache=CACHE_HIT)
+                state['company_intel'] = cached_intel
+                state['messages'].append(f"✅ Company intel loaded from cache for {company_name}")
+                return state
+            state['company_intel'] = _fallback_intel(company_name)
+            state['messages'].append(f"⏭️ Company research skipped for {company_name} (fast mode)")
+            return state
+        
+        # Cache company intel for 24 hours (company info doesn't change often), empty results
+        # briefly, failures not at all; concurrent misses for the same company share one research run
+        computed = []
+        failures = []
+        
+        def research():
+            computed.append(True)
+            print(f"❌ Company Intel Cache MISS: {company_name}")
+            try:
+                return _research_company(company_name, state)
+            except Exception as e:
+                print(f"⚠️ Company research failed for {company_name}: {e}")
+                failures.append(str(e))
+                return None  # not cached
+        
+        intel = cache.get_or_compute(
+            cache_key, research, ttl=config.COMPANY_INTEL_TTL,
+            ttl_for=lambda intel: config.COMPANY_NEGATIVE_TTL if intel.get("negative") else config.COMPANY_INTEL_TTL,
+        )
+        
+        if intel is None:
+            # Transient failure here or in the worker we waited on; retried by the next request
+            state['company_intel'] = _fallback_intel(
+                company_name, "Unable to gather company intel",
+                error=failures[0] if failures else "Company research unavailable",
+            )
+            state['messages'].append(f"⚠️ Company research unavailable for {company_name}")
             return state
         
-        print(f"❌ Company Intel Cache MISS: {company_name}")
-        search_results = web_scraper.search_company_info(company_name)
+        state['company_intel'] = intel
         
-        # Extract tech from engineering blog if found, using job skills as keywords
-        job_skills = state.get('job_skills', [])
-        tech_found = []
-        for blog in search_results.get('engineering_blog', []):
-            if blog.get('url') and 'error' not in blog:
-                tech = web_scraper.extract_tech_from_url(blog['url'], job_keywords=job_skills)
-                tech_found.extend(tech)
+        if not computed:
+            print(f"🎯 Company Intel Cache HIT: {company_name}")
+            record_usage("investigator", cache=CACHE_HIT)
+            state['messages'].append(f"✅ Company intel loaded from cache for {company_name}")
+            return state
         
-        # Use LLM to synthesize company intel
-        llm = ChatOpenAI(model=config.MODEL_NAME, temperature=config.TEMPERATURE)
+        state['messages'].append(f"✅ Company intel gathered for {company_name}")
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a company research analyst helping candidates prepare for interviews.
-            Analyze the search results and provide actionable intelligence."""),
-            ("human", """Company: {company_name}
+    except Exception as e:
+        state['company_intel'] = _fallback_intel(
+            company_name if 'company_name' in dir() else "Unknown", "Unable to gather company intel", error=str(e)
+        )
+        state['messages'].append(f"⚠️ Investigator error: {str(e)}")
+    
+    return state
+
+
+def _fallback_intel(company_name: str, culture_notes: str = "", error: str = None) -> dict:
+    """Generic intel used when research is skipped, fails or finds nothing.
+    Marked `negative` so that, when cached (found nothing), it lives only COMPANY_NEGATIVE_TTL."""
+    intel = {
+        "company_name": company_name,
+        "recent_tech": [],
+        "talking_points": ["Research the company website before interview"],
+        "culture_notes": culture_notes,
+        "negative": True,
+    }
+    if error:
+        intel["error"] = error
+    return intel
+
+
+def _research_company(company_name: str, state: AgentState) -> dict:
+    """Web search + blog scraping + LLM synthesis for one company."""
+    search_results = web_scraper.search_company_info(company_name)
+    results = [r for key in ('engineering_blog', 'tech_stack') for r in search_results.get(key, [])]
+    found = [r for r in results if 'error' not in r]
+    errors = [r['error'] for r in results if 'error' in r]
+    if not found and errors:
+        # Search unavailable (network, timeout, open circuit): says nothing about the company
+        raise RuntimeError(f"Company search failed: {errors[0]}")
+    if not found:
+        # Search knows nothing about this name; the LLM would only guess
+        print(f"⚠️ No search results for company: {company_name}")
+        return _fallback_intel(company_name)
+    
+    # Extract tech from engineering blog if found, using job skills as keywords
+    job_skills = state.get('job_skills', [])
+    tech_found = []
+    for blog in search_results.get('engineering_blog', []):
+        if blog.get('url') and 'error' not in blog:
+            tech = web_scraper.extract_tech_from_url(blog['url'], job_keywords=job_skills)
+            tech_found.extend(tech)
+    
+    # Use LLM to synthesize company intel
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", """You are a company research analyst helping candidates prepare for interviews.
+        Analyze the search results and provide actionable intelligence."""),
+        ("human", """Company: {company_name}
 
 Search Results:
 Engineering Blog: {eng_blog}
@@ -64,45 +154,28 @@ Provide company intelligence in this format:
 RECENT_TECH: List 3-5 specific technologies they use or recently adopted
 TALKING_POINTS: List 3 specific things candidate should mention in interview
 CULTURE_NOTES: 1-2 sentences about engineering culture if found""")
-        ])
-        
-        response = llm.invoke(prompt.format(
-            company_name=company_name,
-            eng_blog=str(search_results.get('engineering_blog', []))[:500],
-            tech_info=str(search_results.get('tech_stack', []))[:500],
-            tech_found=', '.join(list(set(tech_found))[:10]),
-            job_skills=', '.join(state.get('job_skills', [])[:10]),
-            resume_skills=', '.join(state.get('resume_skills', [])[:10])
-        ))
-        
-        # Parse response
-        content = response.content
-        company_intel = {
-            "company_name": company_name,
-            "recent_tech": _parse_section(content, "RECENT_TECH"),
-            "talking_points": _parse_section(content, "TALKING_POINTS"),
-            "culture_notes": _parse_section(content, "CULTURE_NOTES"),
-            "raw_search_results": search_results
-        }
-        
-        state['company_intel'] = company_intel
-        
-        # Cache company intel for 24 hours (company info doesn't change often)
-        cache.set(cache_key, company_intel, ttl=86400)
-        
-        state['messages'].append(f"✅ Company intel gathered for {company_name}")
-        
-    except Exception as e:
-        state['company_intel'] = {
-            "company_name": company_name if 'company_name' in dir() else "Unknown",
-            "recent_tech": [],
-            "talking_points": ["Research the company website before interview"],
-            "culture_notes": "Unable to gather company intel",
-            "error": str(e)
-        }
-        state['messages'].append(f"⚠️ Investigator error: {str(e)}")
+    ])
     
-    return state
+    response = invoke_llm("investigator", prompt.format(
+        company_name=company_name,
+        eng_blog=str(search_results.get('engineering_blog', []))[:500],
+        tech_info=str(search_results.get('tech_stack', []))[:500],
+        tech_found=', '.join(list(set(tech_found))[:10]),
+        job_skills=', '.join(state.get('job_skills', [])[:10]),
+        resume_skills=', '.join(state.get('resume_skills', [])[:10])
+    ))
+    
+    # Parse response
+    content = response.content
+    company_intel = {
+        "company_name": company_name,
+        "recent_tech": _parse_section(content, "RECENT_TECH"),
+        "talking_points": _parse_section(content, "TALKING_POINTS"),
+        "culture_notes": _parse_section(content, "CULTURE_NOTES"),
+        "raw_search_results": search_results
+    }
+    
+    return company_intel
 
 
 def _extract_company_name(text: str) -> str:
@@ -1,12 +1,11 @@
 """
 Investigator Agent - Researches company information, tech stack, and recent news
 """
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 
 from graph.state import AgentState
 from tools.web_scraper import web_scraper
-from config import config
+from tools.llm_client import invoke_llm
 
 
 def investigator_agent(state: AgentState) -> AgentState:
@@ -38,8 +37,6 @@ def investigator_agent(state: AgentState) -> AgentState:
             )
 
         # Step 2: Use LLM to generate talking points based on JD and company
-        llm = ChatOpenAI(model=config.MODEL_NAME, temperature=0.5)
-
         prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a career research specialist. Analyze the company and job 
             to provide specific talking points for the interview."""),
@@ -67,14 +64,12 @@ CULTURE:
 Brief culture insight based on JD tone and requirements.""")
         ])
 
-        chain = prompt | llm
-
-        response = chain.invoke({
+        response = invoke_llm("investigator", prompt.invoke({
             "company_name": company_name or "Unknown Company",
             "job_title": job_title,
             "tech_stack": ", ".join(company_intel["tech_stack"]) or "Not available",
             "job_desc": job_description[:2000],
-        })
+        }), temperature=0.5)
 
         # Parse response
         content = response.content
@@ -1,36 +1,28 @@
 """
 Job Parser Agent - Hybrid approach:
 - NLP for fast skill extraction (from known database)
-- LLM for accurate job title extraction (single fast call)
+- Local title classifier (embeddings + regex) for title, position type, experience
+- LLM only when the classifier's confidence is below TITLE_CONFIDENCE_THRESHOLD
 - Redis caching for repeated JD parsing
 """
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from typing import List
 import re
 
 from graph.state import AgentState
 from tools.nlp_tools import extract_skills
-from tools.cache import cache, hash_content, jd_parse_cache_key
+from tools.cache import cache, hash_content, jd_parse_cache_key, jd_skills_cache_key
+from tools.llm_client import invoke_llm
+from tools.usage_ledger import record_usage, CACHE_HIT
+from tools.title_classifier import title_classifier, detect_position_type, detect_experience
 from config import config
 
 
-def extract_job_title_with_llm(job_description: str) -> dict:
-    """Use LLM to extract job title, position type, and experience - with caching."""
-    # Check cache first
-    jd_hash = hash_content(job_description[:2000])
-    cache_key = jd_parse_cache_key(jd_hash)
-    
-    cached_result = cache.get(cache_key)
-    if cached_result:
-        print(f"🎯 JD Parse Cache HIT")
-        return cached_result
-    
+def _parse_job_with_llm(job_description: str):
+    """Single LLM call for title, position type and experience; None on failure (not cached)."""
     print(f"❌ JD Parse Cache MISS - calling LLM")
     
     try:
-        llm = ChatOpenAI(model=config.MODEL_NAME, temperature=0.1)
-        
         prompt = ChatPromptTemplate.from_messages([
             ("system", """Extract job information from this job description.
 Reply in EXACTLY this format (no other text):
@@ -40,7 +32,7 @@ EXPERIENCE: [years required like "5+ years" or "Entry Level" or "Not specified"]
             ("human", "{job_description}")
         ])
         
-        response = llm.invoke(prompt.format(job_description=job_description[:2000]))
+        response = invoke_llm("job_parser", prompt.format(job_description=job_description[:2000]), temperature=0.1)
         content = response.content
         
         # Parse response
@@ -57,15 +49,40 @@ EXPERIENCE: [years required like "5+ years" or "Entry Level" or "Not specified"]
             elif line.startswith('EXPERIENCE:'):
                 experience = line.replace('EXPERIENCE:', '').strip()
         
-        result = {"title": title, "position_type": position_type, "experience": experience}
-        
-        # Cache for 24 hours (same JD = same result)
-        cache.set(cache_key, result, ttl=86400)
-        
-        return result
+        return {"title": title, "position_type": position_type, "experience": experience}
     except Exception as e:
         print(f"LLM extraction failed: {e}")
-        return {"title": None, "position_type": None, "experience": None}
+        return None
+
+
+def extract_job_title_with_llm(job_description: str) -> dict:
+    """Use LLM to extract job title, position type, and experience - with caching."""
+    jd_hash = hash_content(job_description[:2000])
+    cache_key = jd_parse_cache_key(jd_hash)
+    
+    # Cache for 24 hours (same JD = same result); concurrent misses share one LLM call
+    computed = []
+    
+    def compute():
+        computed.append(True)
+        return _parse_job_with_llm(job_description)
+    
+    result = cache.get_or_compute(cache_key, compute, ttl=86400)
+    if not computed and result:
+        print(f"🎯 JD Parse Cache HIT")
+        record_usage("job_parser", cache=CACHE_HIT)
+    
+    return result or {"title": None, "position_type": None, "experience": None}
+
+
+def extract_job_skills(job_description: str) -> List[str]:
+    """extract_skills for a JD, cached by content hash (same JD = same skills until SKILLS_VERSION changes)."""
+    cache_key = jd_skills_cache_key(hash_content(job_description))
+    skills = cache.get(cache_key)
+    if skills is None:
+        skills = extract_skills(job_description)
+        cache.set(cache_key, skills, ttl=86400)
+    return skills
 
 
 def extract_job_title_nlp(text: str) -> str:
@@ -106,56 +123,41 @@ def extract_job_title_nlp(text: str) -> str:
 
 def extract_position_type_nlp(text: str) -> str:
     """Extract position type using regex."""
-    text_lower = text.lower()
-    
-    if re.search(r'\bintern(ship)?\b', text_lower):
-        return "Internship"
-    if re.search(r'\bcontract\b|\bcontractor\b', text_lower):
-        return "Contract"
-    if re.search(r'\bpart[- ]?time\b', text_lower):
-        return "Part-time"
-    if re.search(r'\bfull[- ]?time\b', text_lower):
-        return "Full-time"
-    if re.search(r'\bfreelance\b', text_lower):
-        return "Freelance"
-    
-    # Default to Full-time for most job postings
-    return "Full-time"
+    return detect_position_type(text)
 
 
 def extract_experience_nlp(text: str) -> str:
     """Extract years of experience using regex."""
-    patterns = [
-        r'(\d+)\+?\s*(?:years?|yrs?)(?:\s+of)?\s+(?:experience|exp)',
-        r'(?:minimum|at least)\s+(\d+)\s*(?:years?|yrs?)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return f"{match.group(1)}+ years"
-    
-    if re.search(r'recent graduate|entry.level|new grad', text, re.IGNORECASE):
-        return "Entry Level / New Grad"
-    
-    return "Not specified"
+    return detect_experience(text)
 
 
 def job_parser_agent(state: AgentState) -> AgentState:
     """
     Hybrid job parser:
     1. Extract skills using NLP (fast, from known database)
-    2. Extract job title, position type, experience using LLM (accurate, single call)
+    2. Classify job title, position type, experience locally
+    3. Ask the LLM for the title only if the classifier is not confident
     """
     try:
         job_description = state['job_description']
         
         # Step 1: Extract skills using NLP (fast)
-        skills = extract_skills(job_description)
+        skills = extract_job_skills(job_description)
         state['job_skills'] = skills
         
-        # Step 2: Extract job info using LLM (hybrid approach)
-        llm_result = extract_job_title_with_llm(job_description)
+        # Step 2: Local classifier; LLM only below the confidence threshold (never in fast mode)
+        try:
+            local_result = title_classifier.classify(job_description)
+        except Exception as e:
+            print(f"⚠️ Title classifier failed: {e}")
+            local_result = {"title": None, "position_type": None, "experience": None, "confidence": 0.0}
+        
+        if state.get('fast_mode') or local_result["confidence"] >= config.TITLE_CONFIDENCE_THRESHOLD:
+            print(f"🎯 Title classifier: '{local_result['title']}' (confidence {local_result['confidence']:.2f})")
+            llm_result = local_result
+        else:
+            print(f"⚠️ Title classifier confidence {local_result['confidence']:.2f} below threshold - calling LLM")
+            llm_result = extract_job_title_with_llm(job_description)
         
         if llm_result["title"]:
             state['job_title'] = llm_result["title"]
@@ -1,45 +1,71 @@
+import json
+from typing import Dict, Optional
+
 from graph.state import AgentState
 from tools.report_generator import report_generator
+from tools.blob_store import blob_store
+from tools.cache import cache, report_cache_key, hash_content
 from config import config
 
+
+def build_report_data(result: Dict) -> Dict:
+    """Fields the PDF/HTML reports are built from (a workflow state or a stored result)."""
+    return {
+        'match_score': result.get('match_score', 0),
+        'job_title': result.get('job_title') or 'Target Position',
+        'matched_skills': result.get('matched_skills', []),
+        'missing_skills': result.get('missing_skills', []),
+        'strengths': result.get('strengths', []),
+        'weaknesses': result.get('weaknesses', []),
+        'ats_recommendations': result.get('ats_recommendations', []),
+        'career_advice': result.get('career_advice', []),
+        'improvement_suggestions': result.get('improvement_suggestions', [])
+    }
+
+
+def render_pdf_report(result: Dict) -> Optional[str]:
+    """
+    Render the PDF for `result` into the blob store and return its digest.
+    Renders are cached by the report data, so identical analyses (e.g. analysis
+    cache hits under a new analysisId) reuse the same file.
+    """
+    analysis_data = build_report_data(result)
+    key = report_cache_key(hash_content(json.dumps(analysis_data, sort_keys=True, default=str)))
+    digest = cache.get(key)
+    if digest and blob_store.path(digest, ".pdf"):
+        return digest
+
+    pdf_buffer = report_generator.generate_pdf_report(analysis_data)
+    digest = blob_store.put(pdf_buffer.getvalue(), ".pdf")
+    cache.set(key, digest, ttl=config.REPORT_BLOB_TTL)
+    return digest
+
+
 def report_generator_agent(state: AgentState) -> AgentState:
     """
     Agent responsible for generating comprehensive analysis reports
     """
-    # Skip report generation if configured for speed
-    if config.SKIP_REPORTS:
-        state['pdf_report'] = None
+    # Skip report generation if configured for speed (the PDF is then rendered on first download)
+    if config.SKIP_REPORTS or state.get('fast_mode'):
+        state['pdf_digest'] = None
         state['html_report'] = None
         state['messages'].append("⏭️ Report generation skipped (speed mode)")
         state['current_step'] = "reports_skipped"
         return state
-    
+
     try:
-        analysis_data = {
-            'match_score': state['match_score'],
-            'job_title': state.get('job_title', 'Target Position'),
-            'matched_skills': state['matched_skills'],
-            'missing_skills': state['missing_skills'],
-            'strengths': state['strengths'],
-            'weaknesses': state['weaknesses'],
-            'ats_recommendations': state.get('ats_recommendations', []),
-            'career_advice': state.get('career_advice', []),
-            'improvement_suggestions': state.get('improvement_suggestions', [])
-        }
-        
-        # Generate PDF report
-        pdf_buffer = report_generator.generate_pdf_report(analysis_data)
-        state['pdf_report'] = pdf_buffer.getvalue()
-        
+        # Generate PDF report; only its digest stays in the state, the file lives in the blob store
+        state['pdf_digest'] = render_pdf_report(state)
+
         # Generate HTML report
-        html_report = report_generator.generate_html_report(analysis_data)
+        html_report = report_generator.generate_html_report(build_report_data(state))
         state['html_report'] = html_report
-        
+
         state['messages'].append("✅ Reports generated successfully")
         state['current_step'] = "reports_generated"
-        
+
     except Exception as e:
         state['error'] = f"Report generation failed: {str(e)}"
         state['messages'].append(f"⚠️ Report generation error: {str(e)}")
-    
-    return state
\ No newline at end of file
+
+    return state
@@ -2,10 +2,11 @@
 Resume Coach Agent - Provides specific, tailored resume improvement suggestions.
 """
 
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
+import re
 from graph.state import AgentState
-from config import config
+from tools.llm_client import invoke_llm
+from tools.advice_rules import use_rule_based_advice, generate_resume_suggestions
 
 
 def resume_coach_agent(state: AgentState) -> AgentState:
@@ -14,8 +15,18 @@ def resume_coach_agent(state: AgentState) -> AgentState:
     Maps candidate experience to job requirements with specific edits.
     """
     try:
-        llm = ChatOpenAI(model=config.MODEL_NAME, temperature=0.4)
-        
+        if use_rule_based_advice(state):
+            suggestions = generate_resume_suggestions(
+                state.get('job_title') or 'Software Engineer',
+                state.get('resume_sections', {}),
+                state.get('resume_skills', []),
+                state.get('matched_skills', []),
+                state.get('missing_skills', []),
+            )
+            state['tailored_resume_suggestions'] = suggestions
+            state['messages'].append(f"✅ Generated {len(suggestions)} resume suggestions (rule-based)")
+            return state
+
         prompt = ChatPromptTemplate.from_messages([
             ("system", """You are an expert resume coach. Analyze the resume against the job description
             and provide SPECIFIC, ACTIONABLE suggestions to tailor the resume.
@@ -51,7 +62,7 @@ SUGGESTION 2:
         company_intel = state.get('company_intel', {})
         company_tech = ', '.join(company_intel.get('recent_tech', []))
         
-        response = llm.invoke(prompt.format(
+        response = invoke_llm("resume_coach", prompt.format(
             job_title=state.get('job_title', 'Position'),
             job_requirements=', '.join(state.get('job_requirements', [])[:5]),
             job_skills=', '.join(state.get('job_skills', [])[:15]),
@@ -60,7 +71,7 @@ SUGGESTION 2:
             missing_skills=', '.join(state.get('missing_skills', [])[:10]),
             match_score=state.get('match_score', 0),
             company_tech=company_tech or 'Not specified'
-        ))
+        ), temperature=0.4)
         
         # Parse suggestions
         suggestions = _parse_suggestions(response.content)
@@ -90,7 +101,7 @@ def _parse_suggestions(content: str) -> list:
         if not line:
             continue
         
-        if 'SUGGESTION' in line.upper() and ':' not in line[11:]:
+        if re.match(r'SUGGESTION\s*\d*\s*:?$', line.upper()):
             if current.get('section'):
                 suggestions.append(current)
             current = {}
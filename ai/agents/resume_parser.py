@@ -1,4 +1,3 @@
-from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
@@ -8,6 +7,7 @@ import json
 from graph.state import AgentState
 from tools.text_extraction import extract_text_from_file
 from tools.nlp_tools import extract_skills, extract_sections, extract_experience, extract_education
+from tools.llm_client import invoke_llm
 from config import config
 
 class ResumeParserOutput(BaseModel):
@@ -36,9 +36,7 @@ def resume_parser_agent(state: AgentState) -> AgentState:
         education = extract_education(sections.get('education', ''))
         
         # Step 5: Use LLM for enhanced parsing (only if not skipping)
-        if not config.SKIP_LLM_PARSING:
-            llm = ChatOpenAI(model=config.MODEL_NAME, temperature=config.TEMPERATURE)
-            
+        if not config.SKIP_LLM_PARSING and not state.get('fast_mode'):
             parser = PydanticOutputParser(pydantic_object=ResumeParserOutput)
             
             prompt = ChatPromptTemplate.from_messages([
@@ -65,14 +63,13 @@ DO NOT include soft skills (communication, teamwork, patience, leadership) or ge
                 """)
             ])
             
-            chain = prompt | llm | parser
-            
             try:
-                result = chain.invoke({
+                response = invoke_llm("resume_parser", prompt.invoke({
                     "resume_text": resume_text[:4000],  # Limit token count
                     "format_instructions": parser.get_format_instructions()
-                })
-                
+                }))
+                result = parser.parse(response.content)
+
                 # Combine NLP-extracted skills with LLM-extracted skills
                 all_skills = list(set(skills + result.skills))
                 state['resume_skills'] = all_skills
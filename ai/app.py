@@ -1,31 +1,110 @@
 from flask import Flask, request, jsonify, send_file, make_response
 from werkzeug.utils import secure_filename
 import os
-import io
 import base64
+import hmac
+import uuid
 
 from graph.workflow import resume_analyzer_graph
-from graph.state import AgentState
+from graph.state import create_initial_state
+from config import config
+from tools.usage_ledger import UsageLedger, start_ledger, end_ledger
+from tools.cache import (
+    cache, prefetch_request_keys, get_cached_analysis, cache_analysis_result, analysis_request_hashes,
+)
+from tools.single_flight import SingleFlight
+from tools.result_store import result_store, strip_result
+from tools.blob_store import blob_store
+from tools.report_generator import report_generator
+from tools.report_pipeline import ReportPipeline, QUEUED, RENDERING
+from agents.report_generator import render_pdf_report
 
 app = Flask(__name__)
 
 # Configure upload settings
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
-# Store results temporarily (in production, use Redis or a database)
-analysis_cache = {}
+# Concurrent identical submissions (same content hash) share one workflow run
+analysis_flight = SingleFlight("analysis")
+# Concurrent first downloads of one analysis share a single PDF render
+report_flight = SingleFlight("report")
+
+
+def _prerender_reports(analysis_id):
+    """Render both reports for a stored analysis and record their digests on it."""
+    result = result_store.get(analysis_id)
+    if result is None:
+        return  # expired before a worker got to it
+    digest, _ = report_flight.do(analysis_id, lambda: render_pdf_report(result))
+    html_digest = blob_store.put(report_generator.generate_report_page(result, analysis_id).encode("utf-8"), ".html")
+    # Merged into the stored result: a concurrent download may be recording its own digest
+    result_store.update(analysis_id, {'pdf_digest': digest, 'html_digest': html_digest})
+
+
+# Optional background rendering of reports once the analysis response is sent
+report_pipeline = ReportPipeline(
+    _prerender_reports,
+    workers=config.REPORT_PRERENDER_WORKERS,
+    queue_size=config.REPORT_PRERENDER_QUEUE,
+    is_busy=lambda: analysis_flight.in_flight() > 0,
+    max_defer=config.REPORT_PRERENDER_MAX_DEFER,
+)
 
 # Preload models at startup for faster first request
 print("🔄 Preloading models...")
 try:
     from tools.matching_tools import matching_tools
     from tools.nlp_tools import nlp  # This loads spaCy
-    # Warm up the sentence transformer
-    _ = matching_tools.calculate_similarity("test", "test")
+    # Warm up the sentence transformer (directly: calculate_similarity may be served from cache)
+    _ = matching_tools.model.encode("test")
     print("✅ Models preloaded successfully")
 except Exception as e:
     print(f"⚠️ Model preload warning: {e}")
 
+# Optionally precompute caches for active job descriptions (see warmup.py)
+if config.CACHE_WARMUP_SOURCE:
+    from warmup import start_background_warmup
+    start_background_warmup(config.CACHE_WARMUP_SOURCE)
+
+def _has_reports(result, analysis_id):
+    """Rendered already, or rendered on first download unless a background render is pending."""
+    pending = report_pipeline.status(analysis_id) in (QUEUED, RENDERING)
+    return result.get('pdf_digest') is not None or (config.LAZY_REPORTS and not pending)
+
+
+def _queue_reports(analysis_id, result):
+    if config.REPORT_PRERENDER and result.get('pdf_digest') is None:
+        report_pipeline.submit(analysis_id)
+
+
+def _build_response(result, analysis_id, fast_mode, usage, cache_hit=False, coalesced=False):
+    """JSON body for /api/analyze from a workflow result (fresh or cached)."""
+    return {
+        "analysisId": analysis_id,
+        "mode": "fast" if fast_mode else "full",
+        "cacheHit": cache_hit,
+        "coalesced": coalesced,
+        "matchScore": result['match_score'],
+        "accuracy": result['match_score'],
+        "skills": ", ".join(result['matched_skills'][:10]) if result['matched_skills'] else "N/A",
+        "strengths": ", ".join(result['strengths'][:10]) if result['strengths'] else "N/A",
+        "weaknesses": ", ".join(result['missing_skills'][:10]) if result['missing_skills'] else "N/A",
+        "atsRecommendations": result.get('ats_recommendations', []),
+        "careerAdvice": result.get('career_advice', []),
+        "improvementSuggestions": result.get('improvement_suggestions', []),
+        "jobTitle": result.get('job_title', 'Software Engineer'),
+        "positionType": result.get('position_type', 'Full-time'),
+        "experienceRequired": result.get('job_experience_required', 'Not specified'),
+        "messages": result.get('messages', []),
+        "hasReports": _has_reports(result, analysis_id),
+        # New enhanced features
+        "companyIntel": result.get('company_intel', {}),
+        "interviewQuestions": result.get('interview_questions', []),
+        "tailoredResumeSuggestions": result.get('tailored_resume_suggestions', []),
+        # Tokens, cost and latency per agent; per-call detail with debug=true
+        "usage": usage
+    }
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze_resume():
     try:
@@ -45,79 +124,73 @@ def analyze_resume():
         # Read file content
         filename = secure_filename(file.filename)
         file_content = file.read()
-        
-        # Initialize state with all fields including new enhanced features
-        initial_state: AgentState = {
-            "resume_file": file_content,
-            "resume_filename": filename,
-            "job_description": job_description,
-            "job_url": request.form.get('jobUrl', None),
+        fast_mode = config.FAST_MODE or request.form.get('mode', '').lower() == 'fast'
+        include_calls = request.values.get('debug', '').lower() == 'true'
+        request_fields = {
             "company_name": request.form.get('companyName', None),
-            "resume_text": "",
-            "resume_sections": {},
-            "resume_skills": [],
-            "resume_experience": [],
-            "resume_education": [],
-            "job_title": "",
-            "position_type": "",
-            "job_requirements": [],
-            "job_skills": [],
-            "job_experience_required": "",
-            "match_score": 0.0,
-            "matched_skills": [],
-            "missing_skills": [],
-            "strengths": [],
-            "weaknesses": [],
-            "ats_recommendations": [],
-            "career_advice": [],
-            "improvement_suggestions": [],
-            # New enhanced features
-            "company_intel": {},
-            "interview_questions": [],
-            "tailored_resume_suggestions": [],
-            # Reports
-            "pdf_report": None,
-            "html_report": None,
-            "messages": [],
-            "current_step": "initialized",
-            "error": None
+            "job_url": request.form.get('jobUrl', None),
+            "mode": "fast" if fast_mode else "full",
         }
         
-        # Run the agent workflow
-        result = resume_analyzer_graph.invoke(initial_state)
+        # Same file bytes + same normalized JD: return the stored result without running the graph
+        cached_result = get_cached_analysis(file_content, job_description, **request_fields)
+        if cached_result is not None:
+            analysis_id = str(uuid.uuid4())
+            result_store.put(analysis_id, cached_result)
+            print("🎯 Analysis Cache HIT")
+            _queue_reports(analysis_id, cached_result)
+            return jsonify(_build_response(cached_result, analysis_id, fast_mode,
+                                           UsageLedger().summary(include_calls), cache_hit=True)), 200
+        
+        def run_workflow():
+            # Initialize state with all fields including new enhanced features
+            initial_state = create_initial_state(
+                file_content,
+                filename,
+                job_description,
+                job_url=request_fields["job_url"],
+                company_name=request_fields["company_name"],
+                fast_mode=fast_mode,
+            )
+            
+            # Load this request's cached JD parse / company intel into L1 in one round trip
+            prefetch_request_keys(job_description, request_fields["company_name"])
+            
+            # Run the agent workflow, recording every LLM call in this request's ledger
+            ledger, ledger_token = start_ledger()
+            try:
+                result = resume_analyzer_graph.invoke(initial_state)
+            finally:
+                end_ledger(ledger_token)
+            result = strip_result(result)
+            
+            # Stored before the flight ends, so later duplicates hit the cache instead
+            if not result.get('error'):
+                cache_analysis_result(file_content, job_description, result, **request_fields)
+            return result, ledger
+        
+        # Identical submissions already in flight attach to that run instead of starting their own
+        flight_key = ":".join(analysis_request_hashes(file_content, job_description, **request_fields))
+        (result, ledger), coalesced = analysis_flight.do(flight_key, run_workflow)
+        if coalesced:
+            print("⚡ Analysis coalesced with an in-flight run")
         
         # Check for errors
         if result.get('error'):
             return jsonify({'error': result['error']}), 500
         
         # Generate a unique ID for this analysis
-        import uuid
         analysis_id = str(uuid.uuid4())
         
-        # Cache the result (including reports)
-        analysis_cache[analysis_id] = result
+        # Store the result (including reports) for /api/report/*
+        result_store.put(analysis_id, result)
         
-        # Prepare response with all features
-        response = {
-            "analysisId": analysis_id,
-            "matchScore": result['match_score'],
-            "accuracy": result['match_score'],
-            "skills": ", ".join(result['matched_skills'][:10]) if result['matched_skills'] else "N/A",
-            "strengths": ", ".join(result['strengths'][:10]) if result['strengths'] else "N/A",
-            "weaknesses": ", ".join(result['missing_skills'][:10]) if result['missing_skills'] else "N/A",
-            "atsRecommendations": result.get('ats_recommendations', []),
-            "careerAdvice": result.get('career_advice', []),
-            "improvementSuggestions": result.get('improvement_suggestions', []),
-            "jobTitle": result.get('job_title', 'Software Engineer'),
-            "positionType": result.get('position_type', 'Full-time'),
-            "experienceRequired": result.get('job_experience_required', 'Not specified'),
-            "messages": result.get('messages', []),
-            "hasReports": result.get('pdf_report') is not None,
-            # New enhanced features
-            "companyIntel": result.get('company_intel', {}),
-            "interviewQuestions": result.get('interview_questions', []),
-            "tailoredResumeSuggestions": result.get('tailored_resume_suggestions', [])
-        }
+        # Reports render in the background; hasReports turns true via /api/report/status/<id>
+        _queue_reports(analysis_id, result)
+        
+        # Prepare response with all features; only the run's own caller is charged its usage
+        usage = UsageLedger().summary(include_calls) if coalesced else ledger.summary(include_calls)
+        response = _build_response(result, analysis_id, fast_mode, usage, coalesced=coalesced)
         
         print(f"DEBUG app.py: jobTitle='{response['jobTitle']}', exp='{response['experienceRequired']}'")
         
@@ -130,24 +203,36 @@ def analyze_resume():
 def download_pdf_report(analysis_id):
     """Download PDF report for a specific analysis"""
     try:
-        if analysis_id not in analysis_cache:
+        result = result_store.get(analysis_id)
+        if result is None:
             return jsonify({'error': 'Analysis not found'}), 404
         
-        result = analysis_cache[analysis_id]
-        pdf_data = result.get('pdf_report')
-        
-        if not pdf_data:
+        digest = result.get('pdf_digest')
+        pdf_path = blob_store.path(digest, ".pdf")
+        if not pdf_path and config.LAZY_REPORTS:
+            # Not rendered during the analysis (SKIP_REPORTS / fast mode) or swept: render it now
+            digest, shared = report_flight.do(analysis_id, lambda: render_pdf_report(result))
+            if not shared:
+                result_store.update(analysis_id, {'pdf_digest': digest})
+                print(f"📄 PDF report rendered on demand for {analysis_id[:8]}")
+            pdf_path = blob_store.path(digest, ".pdf")
+        if not pdf_path:
             return jsonify({'error': 'PDF report not available'}), 404
         
-        # Create a BytesIO object from the PDF data
-        pdf_buffer = io.BytesIO(pdf_data)
-        
-        return send_file(
-            pdf_buffer,
+        # Served from the file path (sendfile, range and conditional requests);
+        # content-addressed, so the digest is a strong ETag
+        response = send_file(
+            pdf_path,
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=f'resume_analysis_report_{analysis_id[:8]}.pdf'
+            download_name=f'resume_analysis_report_{analysis_id[:8]}.pdf',
+            etag=digest,
+            conditional=True,
+            max_age=config.REPORT_CACHE_MAX_AGE,
         )
+        response.cache_control.public = False
+        response.cache_control.private = True  # personal data: browser cache only
+        return response
         
     except Exception as e:
         return jsonify({'error': f'Failed to download PDF: {str(e)}'}), 500
@@ -156,160 +241,21 @@ def download_pdf_report(analysis_id):
 def get_html_report(analysis_id):
     """View HTML report for a specific analysis"""
     try:
-        if analysis_id not in analysis_cache:
+        result = result_store.get(analysis_id)
+        if result is None:
             return jsonify({"error": "Analysis not found"}), 404
         
-        result = analysis_cache[analysis_id]
+        # Pre-rendered by the background pipeline: serve the stored page
+        html_digest = result.get('html_digest')
+        html_path = blob_store.path(html_digest, ".html")
+        if html_path:
+            response = send_file(html_path, mimetype='text/html', etag=html_digest, conditional=True,
+                                 max_age=config.REPORT_CACHE_MAX_AGE)
+            response.cache_control.public = False
+            response.cache_control.private = True
+            return response
         
-        # Extract data from cached result
-        match_score = result.get('match_score', 0)
-        matched_skills = result.get('matched_skills', [])
-        missing_skills = result.get('missing_skills', [])
-        strengths = result.get('strengths', [])
-        weaknesses = result.get('weaknesses', [])
-        ats_recommendations = result.get('ats_recommendations', [])
-        career_advice = result.get('career_advice', [])
-        job_title = result.get('job_title', 'Position')
-        
-        # Format skills as comma-separated strings
-        matched_skills_str = ", ".join(matched_skills[:15]) if matched_skills else "No matched skills identified"
-        missing_skills_str = ", ".join(missing_skills[:15]) if missing_skills else "No missing skills identified"
-        
-        # Generate HTML WITHOUT emojis
-        html_content = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Resume Analysis Report</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            max-width: 900px;
-            margin: 40px auto;
-            padding: 20px;
-            background: #f5f5f5;
-            line-height: 1.6;
-        }}
-        .container {{
-            background: white;
-            padding: 40px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #2563eb;
-            border-bottom: 3px solid #2563eb;
-            padding-bottom: 10px;
-            margin-bottom: 20px;
-        }}
-        h2 {{
-            color: #1e40af;
-            margin-top: 30px;
-            margin-bottom: 15px;
-        }}
-        .score {{
-            font-size: 48px;
-            font-weight: bold;
-            color: #10b981;
-            text-align: center;
-            margin: 30px 0;
-            padding: 20px;
-            background: #f0fdf4;
-            border-radius: 10px;
-        }}
-        .job-title {{
-            text-align: center;
-            font-size: 20px;
-            color: #6b7280;
-            margin-bottom: 20px;
-        }}
-        .section {{
-            margin: 25px 0;
-            padding: 20px;
-            background: #f9fafb;
-            border-radius: 8px;
-            border-left: 4px solid #3b82f6;
-        }}
-        .strengths {{
-            border-left-color: #10b981;
-            background: #f0fdf4;
-        }}
-        .weaknesses {{
-            border-left-color: #ef4444;
-            background: #fef2f2;
-        }}
-        .section h2 {{
-            margin-top: 0;
-        }}
-        ul {{
-            line-height: 1.8;
-            padding-left: 20px;
-        }}
-        ul li {{
-            margin-bottom: 8px;
-        }}
-        .footer {{
-            margin-top: 40px;
-            padding-top: 20px;
-            border-top: 2px solid #e5e7eb;
-            text-align: center;
-            color: #6b7280;
-            font-size: 14px;
-        }}
-        .conclusion {{
-            background: #eff6ff;
-            padding: 20px;
-            border-radius: 8px;
-            margin-top: 30px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Resume Analysis Report</h1>
-        
-        <div class="job-title">Position: <strong>{job_title}</strong></div>
-        
-        <div class="score">Match Score: {match_score:.1f}%</div>
-        
-        <div class="section strengths">
-            <h2>Matched Skills</h2>
-            <p>{matched_skills_str}</p>
-        </div>
-        
-        <div class="section weaknesses">
-            <h2>Skills to Develop</h2>
-            <p>{missing_skills_str}</p>
-        </div>
-        
-        <div class="section">
-            <h2>ATS Optimization Recommendations</h2>
-            <ul>
-                {''.join(f'<li>{rec}</li>' for rec in ats_recommendations) if ats_recommendations else '<li>No specific recommendations available</li>'}
-            </ul>
-        </div>
-        
-        <div class="section">
-            <h2>Career Development Recommendations</h2>
-            <ul>
-                {''.join(f'<li>{advice}</li>' for advice in career_advice) if career_advice else '<li>No specific advice available</li>'}
-            </ul>
-        </div>
-        
-        <div class="conclusion">
-            <h2>Conclusion</h2>
-            <p><strong>Development Opportunity!</strong> While there are notable gaps, this analysis provides a clear roadmap for skill development. Focus on acquiring the missing skills through courses, certifications, and practical projects.</p>
-        </div>
-        
-        <div class="footer">
-            <p>This report was generated by an AI-powered resume analysis system.</p>
-            <p>Recommendations should be considered as guidance and adapted to your specific situation.</p>
-            <p><small>Analysis ID: {analysis_id[:8]}</small></p>
-        </div>
-    </div>
-</body>
-</html>"""
+        html_content = report_generator.generate_report_page(result, analysis_id)
         
         # Return with proper content type
         response = make_response(html_content)
@@ -330,10 +276,69 @@ def get_html_report(analysis_id):
 </html>"""
         return make_response(error_html, 500)
 
+@app.route('/api/report/status/<analysis_id>', methods=['GET'])
+def report_status(analysis_id):
+    """Whether the reports for an analysis are rendered, queued, rendering, failed or rendered on download"""
+    result = result_store.get(analysis_id)
+    if result is None:
+        return jsonify({'error': 'Analysis not found'}), 404
+    pdf_ready = blob_store.path(result.get('pdf_digest'), ".pdf") is not None
+    html_ready = blob_store.path(result.get('html_digest'), ".html") is not None
+    if pdf_ready:
+        state = 'ready'
+    else:
+        state = report_pipeline.status(analysis_id) or ('on_demand' if config.LAZY_REPORTS else 'unavailable')
+    return jsonify({'analysisId': analysis_id, 'state': state, 'hasReports': _has_reports(result, analysis_id),
+                    'pdf': pdf_ready, 'html': html_ready}), 200
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({'status': 'healthy', 'service': 'Resume Analyzer AI'}), 200
+    from tools.circuit_breaker import get_breaker_stats
+    circuits = {name: stats['state'] for name, stats in get_breaker_stats().items()}
+    redis_state = cache.get_health()['state']
+    return jsonify({'status': 'healthy', 'service': 'Resume Analyzer AI', 'circuits': circuits,
+                    'cache': {'tier': 'redis' if cache.enabled else 'memory', 'redis': redis_state}}), 200
+
+@app.before_request
+def require_admin_token():
+    """/api/admin/* needs an X-Admin-Token header matching ADMIN_TOKEN; disabled while it is unset"""
+    if not request.path.startswith('/api/admin/'):
+        return None
+    if not config.ADMIN_TOKEN:
+        return jsonify({'error': 'Admin API disabled: set ADMIN_TOKEN'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode(), config.ADMIN_TOKEN.encode()):
+        return jsonify({'error': 'Invalid admin token'}), 401
+    return None
+
+@app.route('/api/admin/llm-stats', methods=['GET'])
+def llm_stats():
+    """Rate limiter and hedging counters (hedge win rate, added requests/tokens)"""
+    from tools.llm_client import get_llm_stats
+    return jsonify(get_llm_stats()), 200
+
+@app.route('/api/admin/cache/stats', methods=['GET'])
+def cache_stats():
+    """Cache tiers, Redis health and per-namespace hits, misses, sets, evictions, bytes and latency"""
+    stats = cache.get_stats()
+    stats['namespaces'] = cache.namespaces.get_stats()
+    stats['coalescing'] = analysis_flight.get_stats()
+    stats['report_renders'] = report_flight.get_stats()
+    stats['report_prerender'] = report_pipeline.get_stats()
+    stats['charts'] = report_generator.get_chart_stats()
+    stats['results'] = result_store.get_stats()
+    stats['blobs'] = blob_store.get_stats()
+    return jsonify(stats), 200
+
+@app.route('/api/admin/cache/invalidate/<namespace>', methods=['POST'])
+def invalidate_cache_namespace(namespace):
+    """Invalidate a cache namespace (analysis, company, jd_parsed, llm, report, ...) by bumping its generation"""
+    from tools.cache import NAMESPACE_DEPENDENCIES, invalidate_namespace
+    if namespace not in NAMESPACE_DEPENDENCIES:
+        return jsonify({'error': f'Unknown cache namespace: {namespace}'}), 404
+    # The generation bump invalidates immediately; the SCAN purge of orphaned keys runs off the request thread
+    invalidate_namespace(namespace, background=True)
+    return jsonify({'namespace': namespace, 'generation': cache.generation(namespace), 'purge': 'started'}), 202
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=6000, debug=False, threaded=True)
\ No newline at end of file
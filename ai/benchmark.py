@@ -7,6 +7,11 @@ Usage:
     python benchmark.py --test accuracy
     python benchmark.py --test concurrency
     python benchmark.py --test all
+
+Offline (no service, network or OpenAI key; runs the workflow in-process
+against the fake LLM in tools/fake_llm.py):
+    python benchmark.py --test workflow --requests 50 --concurrent 8 --latency lognormal:600:0.4
+    python benchmark.py --test reports --requests 50 --concurrent 8
 """
 
 import requests
@@ -538,6 +543,238 @@ def test_concurrency(num_concurrent=5, requests_per_thread=2):
     }
 
 
+def test_workflow_offline(num_requests=50, num_concurrent=4, latency_spec=None):
+    """
+    Measure workflow throughput in-process with the offline fake LLM.
+    Deterministic responses, no network calls and no API cost.
+    """
+    print(f"\n{'='*60}")
+    print("OFFLINE WORKFLOW TEST (fake LLM)")
+    print(f"{'='*60}")
+    
+    from config import config
+    config.USE_FAKE_LLM = True
+    if latency_spec:
+        config.FAKE_LLM_LATENCY = latency_spec
+    from graph.workflow import resume_analyzer_graph
+    from graph.state import create_initial_state
+    
+    print(f"LLM latency: {config.FAKE_LLM_LATENCY}")
+    print(f"Running {num_requests} analyses with {num_concurrent} workers...")
+    
+    with open(create_sample_resume(), 'rb') as f:
+        resume_bytes = f.read()
+    
+    def run_one(i):
+        state = create_initial_state(resume_bytes, "resume.pdf", SAMPLE_JOB_DESCRIPTION)
+        start = time.time()
+        result = resume_analyzer_graph.invoke(state)
+        return time.time() - start, not result.get('error')
+    
+    times = []
+    errors = 0
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=num_concurrent) as executor:
+        for elapsed, ok in executor.map(run_one, range(num_requests)):
+            if ok:
+                times.append(elapsed)
+            else:
+                errors += 1
+    total_time = time.time() - start
+    
+    if not times:
+        print("No successful analyses!")
+        return None
+    
+    times_sorted = sorted(times)
+    results = {
+        "total_requests": num_requests,
+        "successful": len(times),
+        "errors": errors,
+        "throughput": len(times) / total_time,
+        "p50": times_sorted[int(len(times) * 0.50)],
+        "p95": times_sorted[min(len(times) - 1, int(len(times) * 0.95))],
+        "max": times_sorted[-1],
+    }
+    
+    print(f"\n  Successful:      {results['successful']}/{num_requests}")
+    print(f"  Throughput:      {results['throughput']:.2f} analyses/s")
+    print(f"  p50:             {results['p50']:.2f}s")
+    print(f"  p95:             {results['p95']:.2f}s")
+    print(f"  Max:             {results['max']:.2f}s")
+    print(f"{'='*60}")
+    
+    Path("test_resume.pdf").unlink(missing_ok=True)
+    return results
+
+
+def test_cache_codec(iterations=200):
+    """
+    Compare cache codecs: encode/decode time, encoded size and (if Redis is
+    reachable) Redis MEMORY USAGE per value. Runs in-process.
+    """
+    print(f"\n{'='*60}")
+    print("CACHE CODEC TEST")
+    print(f"{'='*60}")
+    
+    import json
+    import random
+    import numpy as np
+    from tools import cache_codec
+    from tools.cache import cache
+    
+    rng = random.Random(0)
+    samples = {
+        "company_intel": {
+            "company_name": "Acme",
+            "recent_tech": ["python", "kubernetes", "kafka", "react", "postgresql"],
+            "talking_points": [f"Talking point {i} about the engineering blog and platform work" for i in range(5)],
+            "culture_notes": ["Collaborative, product-focused engineering culture."],
+            "raw_search_results": {
+                "engineering_blog": [{"title": f"Scaling service {i}", "url": f"https://acme.dev/blog/{i}",
+                                      "snippet": "How we scaled our services to millions of requests " * 4}
+                                     for i in range(15)],
+                "tech_stack": [{"title": f"Stack {i}", "snippet": "We use python, go and kafka " * 5} for i in range(10)],
+            },
+        },
+        "analysis": {
+            "match_score": 78.5,
+            "matched_skills": ["python", "aws", "docker", "react", "sql"] * 2,
+            "missing_skills": ["kubernetes", "terraform", "kafka"],
+            "ats_recommendations": [f"Recommendation {i}: add measurable impact to experience bullets" for i in range(7)],
+            "interview_questions": [{"question": f"Question {i}?", "why": "Listed in JD", "tip": "Use STAR"} for i in range(5)],
+        },
+        "raw_bytes": rng.randbytes(120_000),
+        "embedding": np.random.default_rng(0).random(384, dtype=np.float32),
+    }
+    variants = [
+        ("legacy-json", None, None),
+        ("json", "json", "none"),
+        ("json+zstd", "json", "zstd"),
+        ("msgpack", "msgpack", "none"),
+        ("msgpack+zstd", "msgpack", "zstd"),
+    ]
+    if not cache_codec.HAS_MSGPACK:
+        print("  msgpack not installed - msgpack variants skipped")
+        variants = [v for v in variants if v[1] != "msgpack"]
+    print(f"  zstd available: {cache_codec.HAS_ZSTD} (falls back to zlib)")
+    print(f"  Redis: {'connected' if cache.enabled else 'not available (MEMORY USAGE skipped)'}")
+    
+    def roundtrip_ok(original, decoded):
+        if isinstance(original, np.ndarray):
+            return isinstance(decoded, np.ndarray) and np.array_equal(original, decoded)
+        return decoded == original
+    
+    results = {}
+    for sample_name, value in samples.items():
+        print(f"\n  {sample_name}:")
+        print(f"    {'variant':<14}{'size':>10}{'encode us':>12}{'decode us':>12}{'redis bytes':>13}  roundtrip")
+        for variant, codec, compression in variants:
+            if codec is None:
+                encode = lambda v: json.dumps(v, default=str)
+                decode = json.loads
+            else:
+                encode = lambda v, c=codec, z=compression: cache_codec.encode(v, codec=c, compression=z)
+                decode = cache_codec.decode
+            
+            start = time.perf_counter()
+            for _ in range(iterations):
+                data = encode(value)
+            encode_us = (time.perf_counter() - start) / iterations * 1e6
+            start = time.perf_counter()
+            for _ in range(iterations):
+                decoded = decode(data)
+            decode_us = (time.perf_counter() - start) / iterations * 1e6
+            
+            redis_bytes = "-"
+            if cache.enabled:
+                key = f"benchmark:codec:{sample_name}:{variant}"
+                cache.client.set(key, data)
+                redis_bytes = cache.client.memory_usage(key)
+                cache.client.delete(key)
+            
+            ok = roundtrip_ok(value, decoded)
+            size = len(data.encode() if isinstance(data, str) else data)
+            results[(sample_name, variant)] = {"size": size, "encode_us": encode_us, "decode_us": decode_us,
+                                               "redis_bytes": redis_bytes, "roundtrip": ok}
+            print(f"    {variant:<14}{size:>10}{encode_us:>12.1f}{decode_us:>12.1f}{str(redis_bytes):>13}  {'OK' if ok else 'LOSSY'}")
+    
+    print(f"{'='*60}")
+    return results
+
+
+def test_report_rendering(num_reports=50, num_concurrent=4):
+    """
+    Chart and PDF render times, sequential and across threads. Runs in-process;
+    with matplotlib installed, also times the old pyplot gauge as a baseline.
+    """
+    print(f"\n{'='*60}")
+    print("REPORT RENDERING TEST")
+    print(f"{'='*60}")
+    
+    from tools.report_generator import report_generator
+    
+    def analysis_data(i):
+        return {
+            "match_score": round(40 + (i * 7.3) % 60, 1),
+            "job_title": "Senior Software Engineer",
+            "matched_skills": ["python", "aws", "docker", "react", "sql"][: 1 + i % 5],
+            "missing_skills": ["kubernetes", "terraform", "kafka"][: i % 4],
+            "strengths": ["Backend development", "Cloud infrastructure"],
+            "ats_recommendations": [f"Recommendation {n}: add measurable impact" for n in range(5)],
+            "career_advice": [f"Advice {n}: build a portfolio project" for n in range(3)],
+        }
+    
+    start = time.perf_counter()
+    for i in range(num_reports):
+        report_generator._create_match_score_chart(analysis_data(i)["match_score"])
+        report_generator._create_skills_chart(analysis_data(i)["matched_skills"], analysis_data(i)["missing_skills"])
+    chart_ms = (time.perf_counter() - start) / num_reports * 1000
+    print(f"  Charts (gauge + pie):   {chart_ms:.2f} ms/report")
+    chart_stats = report_generator.get_chart_stats()
+    print(f"  Chart cache:            {chart_stats['entries']} drawings, hit rate {chart_stats['hit_rate']:.0%}")
+    
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        import io
+        start = time.perf_counter()
+        for i in range(min(num_reports, 10)):
+            fig, ax = plt.subplots(figsize=(6, 3))
+            ax.barh(0, analysis_data(i)["match_score"], height=0.5)
+            plt.savefig(io.BytesIO(), format="png", dpi=150, bbox_inches="tight")
+            plt.close()
+        baseline_ms = (time.perf_counter() - start) / min(num_reports, 10) * 1000
+        print(f"  pyplot gauge baseline:  {baseline_ms:.2f} ms/chart (150 dpi PNG)")
+    except ImportError:
+        print("  matplotlib not installed - pyplot baseline skipped")
+    
+    start = time.perf_counter()
+    sizes = [len(report_generator.generate_pdf_report(analysis_data(i)).getvalue()) for i in range(num_reports)]
+    sequential_ms = (time.perf_counter() - start) / num_reports * 1000
+    print(f"  PDF sequential:         {sequential_ms:.2f} ms/report, {statistics.mean(sizes)/1024:.1f} KB avg")
+    
+    errors = []
+    def render(i):
+        try:
+            pdf = report_generator.generate_pdf_report(analysis_data(i)).getvalue()
+            if not pdf.startswith(b"%PDF-") or b"/Subtype /Image" in pdf:
+                errors.append(i)
+        except Exception as e:
+            errors.append(f"{i}: {e}")
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=num_concurrent) as executor:
+        list(executor.map(render, range(num_reports)))
+    elapsed = time.perf_counter() - start
+    print(f"  PDF {num_concurrent} threads:          {num_reports / elapsed:.1f} reports/s, errors: {len(errors)}")
+    print(f"{'='*60}")
+    
+    return {"chart_ms": chart_ms, "pdf_ms": sequential_ms, "concurrent_rps": num_reports / elapsed,
+            "errors": len(errors)}
+
+
 def run_all_tests():
     """Run all benchmark tests."""
     print("\n" + "="*60)
@@ -603,11 +840,12 @@ def run_all_tests():
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Benchmark the Resume Analyzer AI Service")
-    parser.add_argument("--test", choices=["latency", "accuracy", "throughput", "concurrency", "health", "all"], 
+    parser.add_argument("--test", choices=["latency", "accuracy", "throughput", "concurrency", "health", "workflow", "codec", "reports", "all"], 
                         default="all", help="Which test to run")
     parser.add_argument("--requests", type=int, default=10, help="Number of requests for latency test")
     parser.add_argument("--duration", type=int, default=20, help="Duration in seconds for throughput test")
     parser.add_argument("--concurrent", type=int, default=3, help="Number of concurrent threads")
+    parser.add_argument("--latency", default=None, help="Fake LLM latency spec for the workflow test (e.g. lognormal:600:0.4)")
     
     args = parser.parse_args()
     
@@ -625,5 +863,11 @@ if __name__ == "__main__":
     elif args.test == "concurrency":
         if test_health():
             test_concurrency(num_concurrent=args.concurrent, requests_per_thread=2)
+    elif args.test == "workflow":
+        test_workflow_offline(args.requests, args.concurrent, args.latency)
+    elif args.test == "codec":
+        test_cache_codec()
+    elif args.test == "reports":
+        test_report_rendering(args.requests, args.concurrent)
     else:
         run_all_tests()
\ No newline at end of file
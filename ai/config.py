@@ -1,5 +1,5 @@
 import os
-from typing import Optional
+from typing import Dict, Optional
 
 class Config:
     # OpenAI API 
@@ -21,6 +21,99 @@ class Config:
     SKIP_LLM_PARSING: bool = True   # Use NLP-only for parsing (saves ~5s)
     COMBINE_ADVICE_CALLS: bool = True  # Combine ATS + Career into one LLM call (saves ~3s)
     SKIP_REPORTS: bool = True  # Skip PDF/HTML generation (saves ~2s)
-    USE_LLM_FOR_ADVICE: bool = False  # Use rule-based advice (saves ~3s)
+    USE_LLM_FOR_ADVICE: bool = os.getenv("USE_LLM_FOR_ADVICE", "true").lower() == "true"  # false: rule-based advice (saves ~3s)
+    TITLE_CONFIDENCE_THRESHOLD: float = float(os.getenv("TITLE_CONFIDENCE_THRESHOLD", "0.6"))  # Below this, job titles go to the LLM
+    FAST_MODE: bool = os.getenv("FAST_MODE", "false").lower() == "true"  # Force mode=fast: no outbound calls
+
+    # OpenAI client-side rate limiting (shared by all agents)
+    OPENAI_RPM: int = int(os.getenv("OPENAI_RPM", "500"))
+    OPENAI_TPM: int = int(os.getenv("OPENAI_TPM", "200000"))
+    OPENAI_MAX_CONCURRENCY: int = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+    OPENAI_MAX_RETRIES: int = 3  # 429 retries, paced by the rate limiter
+
+    # Per-agent LLM timeouts (seconds) and request hedging for tail latency
+    LLM_DEFAULT_TIMEOUT: float = float(os.getenv("LLM_DEFAULT_TIMEOUT", "20"))
+    LLM_TIMEOUTS: Dict[str, float] = {
+        "job_parser": 8.0,       # On the critical path; NLP fallback exists
+        "resume_parser": 10.0,
+        "ats_optimizer": 15.0,
+        "career_advisor": 15.0,
+        "interview_prep": 15.0,
+        "resume_coach": 15.0,
+        "investigator": 20.0,
+    }
+    HEDGE_ENABLED: bool = os.getenv("HEDGE_ENABLED", "true").lower() == "true"
+    HEDGE_BUDGET_RATIO: float = float(os.getenv("HEDGE_BUDGET_RATIO", "0.1"))  # Max ~10% extra requests
+    HEDGE_MIN_DELAY: float = 0.5  # Never hedge earlier than this (seconds)
+    HEDGE_MIN_SAMPLES: int = 20  # Latency samples needed before p95 is trusted
+
+    # LLM pricing (USD per 1M tokens) for per-request cost accounting
+    LLM_PRICE_INPUT_PER_1M: float = float(os.getenv("LLM_PRICE_INPUT_PER_1M", "0.15"))
+    LLM_PRICE_OUTPUT_PER_1M: float = float(os.getenv("LLM_PRICE_OUTPUT_PER_1M", "0.60"))
+
+    # Circuit breakers for OpenAI / DuckDuckGo
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+    BREAKER_RECOVERY_TIMEOUT: float = float(os.getenv("BREAKER_RECOVERY_TIMEOUT", "30"))  # Seconds before a half-open probe
+
+    # Redis connection pool
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "32"))
+    REDIS_POOL_TIMEOUT: float = float(os.getenv("REDIS_POOL_TIMEOUT", "1.0"))  # Wait for a free connection (seconds)
+    REDIS_SOCKET_TIMEOUT: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))  # Connect/read timeout (seconds)
+    REDIS_RECONNECT_MIN_DELAY: float = float(os.getenv("REDIS_RECONNECT_MIN_DELAY", "0.5"))  # First reconnect attempt
+    REDIS_RECONNECT_MAX_DELAY: float = float(os.getenv("REDIS_RECONNECT_MAX_DELAY", "30"))  # Backoff cap (seconds)
+
+    # Two-tier cache: in-process LRU (L1) in front of Redis (L2)
+    CACHE_L1_MAX_ENTRIES: int = int(os.getenv("CACHE_L1_MAX_ENTRIES", "2048"))
+    CACHE_L1_TTL: float = float(os.getenv("CACHE_L1_TTL", "300"))  # Max L1 lifetime when Redis is shared
+    CACHE_STALE_TTL: int = int(os.getenv("CACHE_STALE_TTL", "300"))  # Serve stale while one worker refreshes
+    CACHE_XFETCH_BETA: float = float(os.getenv("CACHE_XFETCH_BETA", "1.0"))  # >1 refreshes earlier
+    CACHE_LOCK_TTL: float = 30.0  # Recompute lock lifetime (seconds)
+    CACHE_LOCK_WAIT: float = float(os.getenv("CACHE_LOCK_WAIT", "10"))  # Cold-miss wait for another worker's result
+    CACHE_FAILURE_MARKER_TTL: float = 2.0  # Waiters see a compute that returned None for this long
+    CACHE_CODEC: str = os.getenv("CACHE_CODEC", "msgpack")  # msgpack | json (see tools/cache_codec.py)
+    CACHE_COMPRESSION: str = os.getenv("CACHE_COMPRESSION", "zstd")  # zstd | zlib | none (zstd falls back to zlib)
+    CACHE_COMPRESS_MIN_BYTES: int = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+    COMPANY_INTEL_TTL: int = int(os.getenv("COMPANY_INTEL_TTL", "86400"))
+    COMPANY_NEGATIVE_TTL: int = int(os.getenv("COMPANY_NEGATIVE_TTL", "900"))  # Failed or empty company research
+    ANALYSIS_CACHE_TTL: int = int(os.getenv("ANALYSIS_CACHE_TTL", "3600"))  # Full /api/analyze results
+    EMBEDDING_CACHE_TTL: int = int(os.getenv("EMBEDDING_CACHE_TTL", "604800"))  # Sentence embeddings (7 days)
+    CACHE_WARMUP_SOURCE: str = os.getenv("CACHE_WARMUP_SOURCE", "")  # JD directory or JSONL warmed at startup (see warmup.py)
+    CACHE_WARMUP_WORKERS: int = int(os.getenv("CACHE_WARMUP_WORKERS", "4"))
+
+    # Finished analyses for /api/report/* (see tools/result_store.py)
+    RESULT_STORE_BACKEND: str = os.getenv("RESULT_STORE_BACKEND", "memory")  # memory | redis | disk
+    RESULT_STORE_TTL: int = int(os.getenv("RESULT_STORE_TTL", "21600"))  # 6 hours
+    RESULT_STORE_MAX_ENTRIES: int = int(os.getenv("RESULT_STORE_MAX_ENTRIES", "500"))  # memory backend
+    RESULT_STORE_MAX_BYTES: int = int(os.getenv("RESULT_STORE_MAX_BYTES", str(256 * 1024 * 1024)))  # memory backend
+    RESULT_STORE_DIR: str = os.getenv("RESULT_STORE_DIR", "/tmp/resume_analyzer/results")  # disk backend
+
+    # Generated report files (see tools/blob_store.py); share the directory across replicas
+    REPORT_BLOB_DIR: str = os.getenv("REPORT_BLOB_DIR", "/tmp/resume_analyzer/blobs")
+    REPORT_BLOB_TTL: int = int(os.getenv("REPORT_BLOB_TTL", "86400"))  # Keep longer than RESULT_STORE_TTL
+    REPORT_CACHE_MAX_AGE: int = int(os.getenv("REPORT_CACHE_MAX_AGE", "3600"))  # Browser cache for report downloads
+    CHART_CACHE_MAX_ENTRIES: int = int(os.getenv("CHART_CACHE_MAX_ENTRIES", "512"))  # Report chart drawings kept in memory
+    LAZY_REPORTS: bool = os.getenv("LAZY_REPORTS", "true").lower() == "true"  # With SKIP_REPORTS, render the PDF on first download
+    REPORT_PRERENDER: bool = os.getenv("REPORT_PRERENDER", "false").lower() == "true"  # Render PDF/HTML in the background after each analysis
+    REPORT_PRERENDER_WORKERS: int = int(os.getenv("REPORT_PRERENDER_WORKERS", "2"))
+    REPORT_PRERENDER_QUEUE: int = int(os.getenv("REPORT_PRERENDER_QUEUE", "100"))  # Full queue: render on download instead
+    REPORT_PRERENDER_MAX_DEFER: float = float(os.getenv("REPORT_PRERENDER_MAX_DEFER", "5"))  # Max wait for running analyses
+
+    # Cache key versioning: bump a version to orphan every entry that depends on it
+    CACHE_SCHEMA_VERSION: str = "1"  # Shape of cached values
+    PROMPT_VERSION: str = "1"  # Any agent prompt changed
+    SKILLS_VERSION: str = "1"  # extract_skills / skills database changed
+    REPORT_VERSION: str = "2"  # PDF report layout or charts changed
+    CACHE_GENERATION_REFRESH: float = float(os.getenv("CACHE_GENERATION_REFRESH", "5"))  # Pick up other instances' bumps
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")  # X-Admin-Token for /api/admin/*; unset disables those routes
+
+    # Bloom filter of keys in Redis: definite misses skip the round trip
+    CACHE_BLOOM_ENABLED: bool = os.getenv("CACHE_BLOOM_ENABLED", "true").lower() == "true"
+    CACHE_BLOOM_CAPACITY: int = int(os.getenv("CACHE_BLOOM_CAPACITY", "100000"))  # Grows to 2x the Redis key count
+    CACHE_BLOOM_ERROR_RATE: float = float(os.getenv("CACHE_BLOOM_ERROR_RATE", "0.01"))
+
+    # Offline LLM stand-in for benchmarks/tests (see tools/fake_llm.py)
+    USE_FAKE_LLM: bool = os.getenv("USE_FAKE_LLM", "false").lower() == "true"
+    FAKE_LLM_LATENCY: str = os.getenv("FAKE_LLM_LATENCY", "lognormal:600:0.4")  # fixed:ms | uniform:min:max | lognormal:median:sigma
+    FAKE_LLM_SEED: int = int(os.getenv("FAKE_LLM_SEED", "42"))
 
 config = Config()
\ No newline at end of file
@@ -15,6 +15,7 @@ class AgentState(TypedDict):
     job_description: str
     job_url: Optional[str]
     company_name: Optional[str]
+    fast_mode: bool  # No outbound calls: NLP parsing + rule-based advice
     
     # Parsed resume data
     resume_text: str
@@ -48,10 +49,52 @@ class AgentState(TypedDict):
     tailored_resume_suggestions: List[Dict[str, str]]  # Specific resume edits
     
     # Reports
-    pdf_report: Optional[bytes]
+    pdf_digest: Optional[str]  # SHA-256 of the PDF in tools/blob_store.py
     html_report: Optional[str]
     
     # Metadata
     messages: Annotated[List[str], operator.add]
     current_step: str
     error: Optional[str]
+
+
+def create_initial_state(resume_file: bytes, resume_filename: str, job_description: str,
+                         job_url: Optional[str] = None, company_name: Optional[str] = None,
+                         fast_mode: bool = False) -> AgentState:
+    """Build the workflow input with every field initialized"""
+    return {
+        "resume_file": resume_file,
+        "resume_filename": resume_filename,
+        "job_description": job_description,
+        "job_url": job_url,
+        "company_name": company_name,
+        "fast_mode": fast_mode,
+        "resume_text": "",
+        "resume_sections": {},
+        "resume_skills": [],
+        "resume_experience": [],
+        "resume_education": [],
+        "job_title": "",
+        "position_type": "",
+        "job_requirements": [],
+        "job_skills": [],
+        "job_experience_required": "",
+        "match_score": 0.0,
+        "matched_skills": [],
+        "missing_skills": [],
+        "strengths": [],
+        "weaknesses": [],
+        "ats_recommendations": [],
+        "career_advice": [],
+        "improvement_suggestions": [],
+        # New enhanced features
+        "company_intel": {},
+        "interview_questions": [],
+        "tailored_resume_suggestions": [],
+        # Reports
+        "pdf_digest": None,
+        "html_report": None,
+        "messages": [],
+        "current_step": "initialized",
+        "error": None
+    }
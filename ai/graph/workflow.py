@@ -46,6 +46,7 @@ from agents.interview_prep import interview_prep_agent
 from agents.resume_coach import resume_coach_agent
 from config import config
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextvars
 import copy
 import time
 
@@ -105,8 +106,9 @@ def parallel_enhance(state: AgentState) -> AgentState:
         agents_to_run.append(("investigator", investigator_agent, state))
     
     with ThreadPoolExecutor(max_workers=4) as executor:
+        # Copied context so LLM calls land in this request's usage ledger
         futures = [
-            executor.submit(run_agent, name, func, s) 
+            executor.submit(contextvars.copy_context().run, run_agent, name, func, s)
             for name, func, s in agents_to_run
         ]
         
@@ -0,0 +1,345 @@
+"""
+Rule-based advice generators (no LLM calls).
+Used when Config.USE_LLM_FOR_ADVICE is False and for fast-mode requests:
+1. Interview questions from a question bank indexed by skill
+2. Resume tailoring suggestions from templated bullet rewrites
+3. ATS recommendations and career advice driven by matched/missing skills
+"""
+import re
+from typing import Dict, List, Tuple
+
+from config import config
+
+# Map skill spellings from extract_skills onto question bank keys
+SKILL_ALIASES = {
+    "k8s": "kubernetes", "postgres": "postgresql", "reactjs": "react", "nodejs": "node",
+    "vuejs": "vue", "golang": "go", "google cloud": "gcp", "html5": "html", "css3": "css",
+    "spring boot": "spring", "scikit-learn": "machine learning", "keras": "deep learning",
+    "tensorflow": "deep learning", "pytorch": "deep learning", "mysql": "sql", "sqlite": "sql",
+    "rest api": "api design", "graphql": "api design", "fastapi": "python web", "django": "python web",
+    "flask": "python web", "jenkins": "ci/cd", "github": "git", "gitlab": "git", "dynamodb": "nosql",
+    "cassandra": "nosql", "mongodb": "nosql", "firebase": "nosql", "scrum": "agile", "jira": "agile",
+}
+
+# skill -> [(question, tip)]
+QUESTION_BANK: Dict[str, List[Tuple[str, str]]] = {
+    "python": [
+        ("How does Python manage memory, and when would you reach for generators?",
+         "Cover reference counting, the GC for cycles, and a concrete case where a generator saved memory."),
+        ("How would you speed up a CPU-bound Python service?",
+         "Discuss profiling first, then vectorization, multiprocessing, or moving hot paths to native code."),
+    ],
+    "python web": [
+        ("How do you structure a Python web API for testability and growth?",
+         "Talk about layering (routes, services, data access), dependency injection and test fixtures."),
+    ],
+    "java": [
+        ("Explain how the JVM garbage collector affects latency and how you would tune it.",
+         "Mention generational GC, G1/ZGC trade-offs and how you measured pause times."),
+        ("When do you use an interface versus an abstract class in Java?",
+         "Give a real design example and mention default methods."),
+    ],
+    "spring": [
+        ("How does dependency injection work in Spring, and how do you test a Spring service?",
+         "Explain bean scopes, constructor injection, and slice tests like @WebMvcTest."),
+    ],
+    "javascript": [
+        ("Explain the JavaScript event loop and how promises are scheduled.",
+         "Distinguish the task and microtask queues and walk through a short example."),
+    ],
+    "typescript": [
+        ("How do you use TypeScript's type system to prevent bugs in a large codebase?",
+         "Mention strict mode, discriminated unions and typing API boundaries."),
+    ],
+    "react": [
+        ("How do you find and fix unnecessary re-renders in a React app?",
+         "Cover the profiler, memoization, stable props and state colocation."),
+        ("How do you manage server state versus UI state in React?",
+         "Contrast a data-fetching cache with local/global UI state and explain why you separate them."),
+    ],
+    "angular": [
+        ("How does change detection work in Angular and how can you optimize it?",
+         "Explain zones, OnPush and trackBy with an example."),
+    ],
+    "vue": [
+        ("How does Vue's reactivity system track dependencies?",
+         "Describe proxies, computed caching and a pitfall you have hit."),
+    ],
+    "node": [
+        ("How do you keep a Node.js service responsive under CPU-heavy work?",
+         "Discuss not blocking the event loop, worker threads and offloading to queues."),
+    ],
+    "go": [
+        ("How do goroutines and channels compare to threads and locks?",
+         "Show a concurrency pattern you used and how you avoided leaks or deadlocks."),
+    ],
+    "sql": [
+        ("How would you diagnose and fix a slow SQL query?",
+         "Walk through EXPLAIN plans, indexes, and rewriting joins or subqueries."),
+    ],
+    "postgresql": [
+        ("How do indexes, vacuum and isolation levels affect PostgreSQL performance?",
+         "Give an example of an index you added and the measured improvement."),
+    ],
+    "nosql": [
+        ("When would you choose a NoSQL store over a relational database?",
+         "Tie the choice to access patterns, consistency needs and scaling, with a real example."),
+    ],
+    "redis": [
+        ("How would you use Redis as a cache without serving stale or inconsistent data?",
+         "Discuss TTLs, invalidation strategies and cache stampedes."),
+    ],
+    "aws": [
+        ("Design a highly available web service on AWS. Which services would you use?",
+         "Cover multi-AZ, load balancing, autoscaling, managed data stores and cost trade-offs."),
+    ],
+    "azure": [
+        ("How would you deploy and monitor a service on Azure?",
+         "Mention App Service or AKS, Azure Monitor and infrastructure as code."),
+    ],
+    "gcp": [
+        ("How would you deploy a containerized service on GCP?",
+         "Compare Cloud Run and GKE and explain when you would pick each."),
+    ],
+    "docker": [
+        ("How do you keep Docker images small, secure and reproducible?",
+         "Mention multi-stage builds, pinned base images, layer caching and image scanning."),
+    ],
+    "kubernetes": [
+        ("How do you roll out a new version on Kubernetes with zero downtime?",
+         "Explain rolling updates, readiness probes, resource limits and rollback."),
+        ("How would you debug a pod stuck in CrashLoopBackOff?",
+         "Walk through kubectl describe/logs, events, probes and resource limits."),
+    ],
+    "terraform": [
+        ("How do you manage Terraform state and changes safely in a team?",
+         "Cover remote state with locking, modules, plan reviews and drift detection."),
+    ],
+    "ci/cd": [
+        ("Describe a CI/CD pipeline you built. How did you keep it fast and reliable?",
+         "Mention caching, parallel stages, test gates and deployment strategy."),
+    ],
+    "git": [
+        ("How do you handle branching and code review on a busy team?",
+         "Explain your branching model, small PRs and how you resolve conflicts."),
+    ],
+    "linux": [
+        ("A Linux server is slow. How do you find the cause?",
+         "Walk through top, iostat, vmstat, logs and narrowing CPU vs memory vs IO."),
+    ],
+    "machine learning": [
+        ("How do you detect and handle overfitting?",
+         "Cover validation strategy, regularization, more data and monitoring in production."),
+        ("How would you take a model from notebook to production?",
+         "Discuss feature pipelines, versioning, serving, and monitoring for drift."),
+    ],
+    "deep learning": [
+        ("How do you debug a neural network that is not converging?",
+         "Mention learning rate, data checks, overfitting a small batch and gradient inspection."),
+    ],
+    "nlp": [
+        ("How would you build a text classification system for a new domain?",
+         "Compare baselines, fine-tuning pretrained models and evaluation on realistic data."),
+    ],
+    "pandas": [
+        ("How do you handle a dataset that does not fit in memory with pandas?",
+         "Discuss chunking, dtypes, and when to switch to Spark or a database."),
+    ],
+    "spark": [
+        ("How do you optimize a slow Spark job?",
+         "Cover partitioning, shuffles, broadcast joins and caching."),
+    ],
+    "kafka": [
+        ("How do you guarantee message ordering and delivery with Kafka?",
+         "Explain partitions, keys, consumer groups, offsets and idempotent producers."),
+    ],
+    "microservices": [
+        ("How do you handle failures between microservices?",
+         "Mention timeouts, retries with backoff, circuit breakers and idempotency."),
+    ],
+    "api design": [
+        ("How do you design and version a public API?",
+         "Cover resource modeling, pagination, error formats and backwards compatibility."),
+    ],
+    "agile": [
+        ("How do you break down a large feature and estimate it?",
+         "Describe slicing into deliverable increments and how you handle uncertainty."),
+    ],
+    "html": [
+        ("How do you make a web page accessible?",
+         "Mention semantic HTML, ARIA where needed, keyboard navigation and contrast."),
+    ],
+    "css": [
+        ("How do you structure CSS so it scales across a large app?",
+         "Discuss naming conventions or CSS modules, design tokens and avoiding specificity wars."),
+    ],
+}
+
+GENERIC_QUESTIONS = [
+    {
+        "question": "Tell me about a challenging project you worked on.",
+        "why": "Standard behavioral question",
+        "tip": "Use STAR method: Situation, Task, Action, Result",
+    },
+    {
+        "question": "How do you approach debugging a complex issue?",
+        "why": "Tests problem-solving skills",
+        "tip": "Walk through your systematic approach",
+    },
+    {
+        "question": "Design a system relevant to this role and explain your trade-offs.",
+        "why": "System design is part of most engineering loops",
+        "tip": "Clarify requirements, sketch components, then discuss scaling and failure modes",
+    },
+]
+
+_METRIC = re.compile(r'\d+%|\$\d|\d+x\b|\d{2,}')
+_BULLET_PREFIX = re.compile(r'^[\-•\*●▪]\s*')
+
+
+def use_rule_based_advice(state: dict) -> bool:
+    """True when advice agents should skip the LLM for this request."""
+    return bool(state.get('fast_mode')) or not config.USE_LLM_FOR_ADVICE
+
+
+def _bank_key(skill: str) -> str:
+    skill = skill.lower()
+    return SKILL_ALIASES.get(skill, skill)
+
+
+def generate_interview_questions(job_title: str, job_skills: List[str], matched_skills: List[str],
+                                 missing_skills: List[str], limit: int = 5) -> List[Dict[str, str]]:
+    """Questions for gaps first, then depth on matched skills, then generic ones."""
+    questions = []
+    seen = set()
+
+    def add(skill: str, why: str):
+        key = _bank_key(skill)
+        if key in seen or key not in QUESTION_BANK:
+            return
+        seen.add(key)
+        question, tip = QUESTION_BANK[key][0]
+        questions.append({"question": question, "why": why, "tip": tip})
+
+    for skill in missing_skills:
+        add(skill, f"{job_title} requires {skill}, which your resume does not show")
+    for skill in matched_skills:
+        add(skill, f"{skill} is a core requirement and they will probe for depth")
+    for skill in job_skills:
+        add(skill, f"{skill} is listed in the job description")
+
+    # Second questions for the most important matched skills
+    for skill in matched_skills:
+        key = _bank_key(skill)
+        if len(questions) >= limit:
+            break
+        if key in QUESTION_BANK and len(QUESTION_BANK[key]) > 1:
+            question, tip = QUESTION_BANK[key][1]
+            questions.append({"question": question, "why": f"Follow-up depth on {skill}", "tip": tip})
+
+    for generic in GENERIC_QUESTIONS:
+        if len(questions) >= limit:
+            break
+        questions.append(dict(generic))
+
+    return questions[:limit]
+
+
+def _experience_bullets(experience_text: str) -> List[str]:
+    bullets = []
+    for line in experience_text.split('\n'):
+        line = _BULLET_PREFIX.sub('', line.strip())
+        # Skip headers/dates; keep sentence-like lines
+        if len(line.split()) >= 5 and not re.search(r'\b(19|20)\d{2}\b', line):
+            bullets.append(line)
+    return bullets
+
+
+def generate_resume_suggestions(job_title: str, resume_sections: Dict[str, str], resume_skills: List[str],
+                                matched_skills: List[str], missing_skills: List[str],
+                                limit: int = 5) -> List[Dict[str, str]]:
+    """Templated resume edits grounded in the candidate's own sections and skill gaps."""
+    suggestions = []
+    top_matched = matched_skills[:3]
+    top_missing = missing_skills[:3]
+
+    if top_missing:
+        suggestions.append({
+            "section": "Skills section",
+            "change": f"Add {', '.join(top_missing)} if you have used them, even in projects or coursework",
+            "reason": "These skills are explicitly required and currently missing from your resume",
+        })
+
+    summary_skills = ', '.join(top_matched) or 'your strongest relevant skills'
+    suggestions.append({
+        "section": "Summary",
+        "change": f"Open with \"{job_title} with hands-on experience in {summary_skills}\"",
+        "reason": "Mirroring the job title and top skills helps ATS ranking and recruiter skim-reading",
+    })
+
+    bullets = _experience_bullets(resume_sections.get('experience', ''))
+    unquantified = [b for b in bullets if not _METRIC.search(b)]
+    for bullet in unquantified[:2]:
+        rewrite = bullet.rstrip('.')
+        named = [s for s in top_matched if s.lower() in rewrite.lower()]
+        if top_matched and not named:
+            rewrite = f"{rewrite} using [{' / '.join(top_matched)}, whichever you used]"
+        suggestions.append({
+            "section": f"Experience bullet: \"{bullet[:60]}{'...' if len(bullet) > 60 else ''}\"",
+            "change": f"Rewrite as \"{rewrite}, resulting in [measurable outcome, e.g. 30% faster / $X saved]\"",
+            "reason": "Quantified bullets that name required skills score higher with ATS and reviewers",
+        })
+
+    if top_missing:
+        has_projects = bool(resume_sections.get('projects', '').strip())
+        suggestions.append({
+            "section": "Projects section" if has_projects else "Add a Projects section",
+            "change": f"Add a project that uses {top_missing[0]} and describe what you built and its result",
+            "reason": f"Demonstrates initiative on {top_missing[0]}, the top gap for this role",
+        })
+
+    if not bullets:
+        suggestions.append({
+            "section": "Experience section",
+            "change": "Use one bullet per achievement starting with an action verb (Built, Led, Reduced)",
+            "reason": "ATS parsers and reviewers read clearly structured bullets more reliably",
+        })
+
+    return suggestions[:limit]
+
+
+def generate_ats_recommendations(job_title: str, matched_skills: List[str],
+                                 missing_skills: List[str]) -> List[str]:
+    recommendations = []
+    if missing_skills:
+        recommendations.append(
+            f"Add these job keywords where truthful: {', '.join(missing_skills[:5])}"
+        )
+    if matched_skills:
+        recommendations.append(
+            f"Repeat your matched skills ({', '.join(matched_skills[:5])}) in experience bullets, not only the skills list"
+        )
+    recommendations.extend([
+        f"Match the job title \"{job_title}\" in your summary or most recent role where accurate",
+        "Use standard section headers (Experience, Education, Skills)",
+        "Include measurable achievements with numbers",
+        "Avoid tables, images and multi-column layouts that ATS parsers misread",
+    ])
+    return recommendations[:7]
+
+
+def generate_career_advice(match_score: float, matched_skills: List[str],
+                           missing_skills: List[str]) -> List[str]:
+    advice = []
+    for skill in missing_skills[:3]:
+        advice.append(f"Build a small, public project using {skill} to close this gap")
+    if matched_skills:
+        advice.append(f"Lead interviews with your strongest overlap: {', '.join(matched_skills[:3])}")
+    if match_score >= 80:
+        advice.append("You are a strong match; focus on interview preparation and system design practice")
+    elif match_score >= 60:
+        advice.append("Target a certification or course in your top missing skill to strengthen your candidacy")
+    else:
+        advice.append("Consider adjacent roles that value your current skills while you build the missing ones")
+    advice.append("Network with professionals in your target role")
+    return advice[:7]
@@ -0,0 +1,94 @@
+"""
+Content-addressed blob directory for generated reports.
+Each blob is stored once under REPORT_BLOB_DIR/<sha256[:2]>/<sha256><suffix>,
+written to a temp file and renamed into place, so readers never see a partial
+file. Results keep only the digest; app.py serves the file by path, which lets
+the server use sendfile and answer range and conditional requests.
+Blobs not rewritten for REPORT_BLOB_TTL seconds are swept.
+"""
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from config import config
+
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobStore:
+    _SWEEP_EVERY = 100  # puts between sweeps
+
+    def __init__(self, directory: str, ttl: float):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "deduplicated": 0, "bytes_written": 0, "swept": 0}
+
+    def _path(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.directory, digest[:2], f"{digest}{suffix}")
+
+    def _count(self, key: str, amount: int = 1) -> int:
+        with self._lock:
+            self._stats[key] += amount
+            return self._stats[key]
+
+    def put(self, data: bytes, suffix: str = "") -> str:
+        """Store `data` and return its SHA-256 digest (identical content is stored once)."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest, suffix)
+        if os.path.exists(path):
+            os.utime(path)  # restart its TTL
+            self._count("deduplicated")
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
+            self._count("bytes_written", len(data))
+        if self._count("puts") % self._SWEEP_EVERY == 0:
+            self.sweep()
+        return digest
+
+    def path(self, digest: Optional[str], suffix: str = "") -> Optional[str]:
+        """Filesystem path of a stored blob, or None if the digest is invalid or missing."""
+        if not digest or not _DIGEST.match(digest):
+            return None
+        path = self._path(digest, suffix)
+        return path if os.path.isfile(path) else None
+
+    def sweep(self) -> int:
+        """Delete blobs (and stale temp files) older than the TTL. Returns the number removed."""
+        removed = 0
+        cutoff = time.time() - self.ttl
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.unlink(path)
+                        removed += 1
+                except OSError:
+                    pass
+        if removed:
+            self._count("swept", removed)
+        return removed
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({"directory": self.directory, "ttl": self.ttl})
+        return stats
+
+
+blob_store = BlobStore(config.REPORT_BLOB_DIR, config.REPORT_BLOB_TTL)
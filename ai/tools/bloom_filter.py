@@ -0,0 +1,57 @@
+"""
+Bloom filter over cache keys.
+A `False` from `might_contain` is definite: the key was never added, so the
+cache can skip the Redis round trip. A `True` may be a false positive, at
+roughly `error_rate` while at most `capacity` keys have been added.
+
+Positions use double hashing over one 128-bit BLAKE2b digest
+(Kirsch & Mitzenmacher), so each lookup costs a single hash.
+"""
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._lock = threading.Lock()  # byte-level read-modify-write in add()
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        positions = self._positions(key)
+        with self._lock:
+            for pos in positions:
+                self._bits[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def might_contain(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    __contains__ = might_contain
+
+    def estimated_fp_rate(self) -> float:
+        """Expected false-positive rate for the number of keys added so far."""
+        return (1.0 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def get_stats(self) -> dict:
+        return {
+            "keys": self.count,
+            "capacity": self.capacity,
+            "bits": self.num_bits,
+            "hashes": self.num_hashes,
+            "memory_bytes": len(self._bits),
+            "estimated_fp_rate": round(self.estimated_fp_rate(), 5),
+        }
@@ -4,111 +4,887 @@ Caches:
 1. Analysis results by JD hash (avoid re-processing same JD)
 2. Company intel by company name (avoid re-scraping)
 3. LLM responses by prompt hash (reduce API costs)
+
+Two tiers: a bounded, TTL-aware in-process LRU (L1) in front of Redis (L2).
+L1 entries live at most CACHE_L1_TTL seconds so other instances' writes and
+invalidations are picked up quickly; without Redis, L1 is the only tier and
+keeps the full TTL. Values returned from L1 are shared objects: treat them as
+read-only.
+
+Expensive entries (JD parse, company intel) use `get_or_compute`, which guards
+against stampedes: probabilistic early refresh (XFetch), a per-key recompute
+lock (Redis SET NX, or a local lock without Redis) and stale-while-revalidate.
+
+Redis outages: a connection error or timeout marks Redis down, and from then on
+every call goes straight to L1 without touching the network. A background thread
+pings Redis with exponential backoff and switches the L2 tier back on once it
+answers; the same happens when Redis is unreachable at startup.
+
+Keys are versioned per namespace: `<ns>:v<schema>.<fingerprint>.g<generation>:...`.
+The fingerprint hashes the model, prompt, skills and embedding versions the
+namespace depends on (NAMESPACE_DEPENDENCIES), so changing one orphans exactly
+the affected entries. Bumping a namespace's generation (one Redis INCR)
+invalidates all of its entries in O(1); orphaned keys expire by TTL or are
+removed with incremental SCAN (`purge_namespace`).
+
+A Bloom filter of the keys in Redis lets lookups of keys that were never stored
+skip the Redis round trip. A background SCAN rebuilds it when the pub/sub
+subscription starts, after a reconnect, after a generation change or purge, and
+once more keys were added than it was sized for (expired keys are never removed). Every instance publishes the keys it writes on
+BLOOM_CHANNEL, in the same pipeline as the write, and adds the keys the others
+publish, so a key written by another replica is visible once the message
+arrives. The filter is only consulted while that subscription is live and a
+sync has completed since it (re)started.
 """
 import redis
-import json
 import hashlib
+import math
 import os
-from typing import Optional, Any
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Any, Dict, Iterable, List
 from functools import wraps
 
+from config import config
+from tools import cache_codec
+from tools.bloom_filter import BloomFilter
+from tools.cache_metrics import NamespaceStats, L1, L2
+from tools.company_names import normalize_company_name
+
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+_MISSING = object()
+
+# Delete the lock only if we still own it
+_RELEASE_LOCK_LUA = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+# Version components each namespace's values depend on (see namespace_prefix)
+NAMESPACE_DEPENDENCIES = {
+    "analysis": ("model", "prompt", "skills", "embedding"),
+    "company": ("model", "prompt"),
+    "jd_parsed": ("model", "prompt"),
+    "llm": ("model", "prompt"),
+    "jd_skills": ("skills",),
+    "embedding": ("embedding",),
+    "report": ("report",),
+}
+
+
+BLOOM_CHANNEL = "cache:bloom:keys"
+
+
+def _is_envelope(entry: Any) -> bool:
+    return isinstance(entry, dict) and "__xfetch__" in entry
+
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int, on_evict=None):
+        self.max_entries = max_entries
+        self.on_evict = on_evict  # called with the evicted key
+        self._data: OrderedDict = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    def get(self, key: str, default: Any = _MISSING, count: bool = True) -> Any:
+        """`count=False` leaves hits/misses alone (lookups made on a caller's behalf)."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._stats["misses"] += count
+                return default
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += count
+                return default
+            self._data.move_to_end(key)
+            self._stats["hits"] += count
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                evicted, _ = self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+                if self.on_evict is not None:
+                    self.on_evict(evicted)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def keys(self, prefix: str = "") -> list:
+        now = time.monotonic()
+        with self._lock:
+            return [k for k, (expires_at, _) in self._data.items() if k.startswith(prefix) and expires_at > now]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._data)
+        lookups = stats["hits"] + stats["misses"]
+        stats["max_entries"] = self.max_entries
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
 
 class RedisCache:
     def __init__(self):
         self.client = None
         self.enabled = False
-        self._memory_cache = {}
+        self.namespaces = NamespaceStats()
+        self.local = LRUCache(config.CACHE_L1_MAX_ENTRIES, on_evict=self.namespaces.record_eviction)
+        self._stats_lock = threading.Lock()
+        self._l2_stats = {"hits": 0, "misses": 0, "promotions": 0, "prefetch_hits": 0, "prefetch_misses": 0}
+        self._stampede_stats = {
+            "recomputes": 0, "early_refreshes": 0, "stale_served": 0, "lock_waits": 0, "lock_wait_timeouts": 0,
+            "lock_wait_failures": 0, "lock_takeovers": 0,
+        }
+        self._local_locks: Dict[str, threading.Lock] = {}
+        self._local_locks_guard = threading.Lock()
+        self._release_lock = None
+        self._health_lock = threading.Lock()
+        self._reconnecting = False
+        self._health = {"outages": 0, "reconnects": 0, "reconnect_attempts": 0, "down_since": None, "last_error": None}
+        self._generations: Dict[str, tuple] = {}  # namespace -> (generation, fetched_at)
+        self._generations_lock = threading.Lock()
+        self._bloom: Optional[BloomFilter] = None  # None until the first sync completes
+        self._bloom_pending: Optional[set] = None  # keys written while a sync is running
+        self._bloom_lock = threading.Lock()
+        self._bloom_wakeup = threading.Event()
+        self._bloom_subscribed = threading.Event()  # set while BLOOM_CHANNEL messages are being received
+        self._bloom_synced_at = None
+        self._bloom_stats = {"skips": 0, "false_positives": 0, "syncs": 0, "announced_keys": 0, "resubscribes": 0}
         self._connect()
+        if config.CACHE_BLOOM_ENABLED and self.client is not None:
+            threading.Thread(target=self._bloom_listen_loop, name="cache-bloom-listen", daemon=True).start()
+            threading.Thread(target=self._bloom_sync_loop, name="cache-bloom-sync", daemon=True).start()
     
     def _connect(self):
         try:
-            self.client = redis.from_url(REDIS_URL, decode_responses=True)
+            # One explicitly sized pool shared by request threads and agent workers;
+            # raw bytes because values are encoded by tools/cache_codec.py
+            pool = redis.BlockingConnectionPool.from_url(
+                REDIS_URL,
+                max_connections=config.REDIS_MAX_CONNECTIONS,
+                timeout=config.REDIS_POOL_TIMEOUT,
+                socket_timeout=config.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=config.REDIS_SOCKET_TIMEOUT,
+                decode_responses=False,
+            )
+            self.client = redis.Redis(connection_pool=pool)
+            self._release_lock = self.client.register_script(_RELEASE_LOCK_LUA)
+        except Exception as e:
+            print(f"Redis misconfigured, using in-memory cache only: {e}")
+            return
+        try:
             self.client.ping()
             self.enabled = True
             print("Redis cache connected")
         except Exception as e:
             print(f"Redis unavailable, using in-memory fallback: {e}")
-            self.enabled = False
+            self._mark_down(e)
     
-    def get(self, key: str) -> Optional[Any]:
+    # --- health ---
+
+    def _handle_error(self, op: str, error: Exception):
+        """Log a failed Redis call; connection errors and timeouts take Redis out of service."""
+        print(f"Cache {op} error: {error}")
+        if isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+            # An exhausted pool means Redis is busy, not down
+            if "No connection available" not in str(error):
+                self._mark_down(error)
+
+    def _mark_down(self, error: Exception):
+        with self._health_lock:
+            if self._health["down_since"] is None:
+                self._health["outages"] += 1
+                self._health["down_since"] = time.time()
+            if self.enabled:
+                self.enabled = False
+                with self._bloom_lock:
+                    self._bloom = None  # other instances keep writing; resync before trusting it again
+                print(f"⚠️ Redis down, serving from in-process cache: {error}")
+            self._health["last_error"] = str(error)
+            if self._reconnecting:
+                return
+            self._reconnecting = True
+        threading.Thread(target=self._reconnect_loop, name="redis-reconnect", daemon=True).start()
+
+    def _reconnect_loop(self):
+        """Ping Redis with exponential backoff (plus jitter) until it answers."""
+        delay = config.REDIS_RECONNECT_MIN_DELAY
+        while True:
+            time.sleep(delay * random.uniform(0.8, 1.2))
+            with self._health_lock:
+                self._health["reconnect_attempts"] += 1
+            try:
+                self.client.ping()
+            except Exception as e:
+                with self._health_lock:
+                    self._health["last_error"] = str(e)
+                delay = min(delay * 2, config.REDIS_RECONNECT_MAX_DELAY)
+                continue
+            with self._health_lock:
+                down_for = time.time() - (self._health["down_since"] or time.time())
+                self.enabled = True
+                self._reconnecting = False
+                self._health["reconnects"] += 1
+                self._health["down_since"] = None
+            print(f"✅ Redis reconnected after {down_for:.1f}s, L2 tier back in service")
+            self._bloom_wakeup.set()
+            return
+
+    def get_health(self) -> dict:
+        with self._health_lock:
+            health = dict(self._health)
+        health["state"] = "up" if self.enabled else ("reconnecting" if self._reconnecting else "disabled")
+        down_since = health.pop("down_since")
+        health["down_for_s"] = round(time.time() - down_since, 1) if down_since else 0.0
+        return health
+
+    # --- known-key filter ---
+
+    @staticmethod
+    def _bloom_tracked(key: str) -> bool:
+        return key.split(":", 1)[0] in NAMESPACE_DEPENDENCIES
+
+    def _remember_key(self, key: str):
+        """Record that `key` exists in Redis."""
+        if not self._bloom_tracked(key):
+            return
+        with self._bloom_lock:
+            bloom = self._bloom
+            if self._bloom_pending is not None:
+                self._bloom_pending.add(key)
+        if bloom is not None:
+            bloom.add(key)
+            if bloom.count >= bloom.capacity:
+                self._bloom_wakeup.set()  # past its sizing: rebuild without the expired keys
+
+    def _announce(self, pipe, keys: List[str]):
+        """Queue a BLOOM_CHANNEL publish of `keys` on the pipeline that writes them."""
+        tracked = [key for key in keys if self._bloom_tracked(key)]
+        if config.CACHE_BLOOM_ENABLED and tracked:
+            pipe.publish(BLOOM_CHANNEL, "\n".join(tracked))
+
+    def _bloom_listen_loop(self):
+        """Add keys written by other instances to the filter. While unsubscribed the
+        filter is dropped (messages were missed) and rebuilt once resubscribed."""
+        delay = config.REDIS_RECONNECT_MIN_DELAY
+        while True:
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(BLOOM_CHANNEL)
+                self._bloom_subscribed.set()
+                self._bloom_wakeup.set()  # sync now, so the filter covers writes from before the subscription
+                delay = config.REDIS_RECONNECT_MIN_DELAY
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message["type"] == "message":
+                        for key in message["data"].decode().split("\n"):
+                            self._count("announced_keys")
+                            self._remember_key(key)
+            except Exception as e:
+                if self._bloom_subscribed.is_set():
+                    print(f"⚠️ Bloom filter subscription lost, lookups go to Redis until resync: {e}")
+                    self._count("resubscribes")
+            finally:
+                self._bloom_subscribed.clear()
+                with self._bloom_lock:
+                    self._bloom = None
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 2, config.REDIS_RECONNECT_MAX_DELAY)
+
+    def _filter_for(self, key: str) -> Optional[BloomFilter]:
+        """The Bloom filter to consult for `key`, or None if it cannot answer."""
+        return self._bloom if self._bloom_tracked(key) else None
+
+    def _sync_bloom(self):
+        """Rebuild the filter from one incremental SCAN pass and swap it in."""
+        if not self._bloom_subscribed.is_set():
+            return  # other instances' writes would be missed
+        with self._bloom_lock:
+            self._bloom_pending = set()
         try:
+            capacity = max(config.CACHE_BLOOM_CAPACITY, 2 * self.client.dbsize())
+            bloom = BloomFilter(capacity, config.CACHE_BLOOM_ERROR_RATE)
+            for key in self.client.scan_iter(count=1000):
+                key = key.decode()
+                if self._bloom_tracked(key):
+                    bloom.add(key)
+        except Exception as e:
+            with self._bloom_lock:
+                self._bloom_pending = None
+            self._handle_error("bloom sync", e)
+            return
+        with self._bloom_lock:
+            for key in self._bloom_pending:
+                bloom.add(key)
+            # The subscription may have dropped during the SCAN; then the listener resyncs
+            self._bloom = bloom if self._bloom_subscribed.is_set() else None
+            self._bloom_pending = None
+        self._bloom_synced_at = time.time()
+        self._count("syncs")
+
+    def _bloom_sync_loop(self):
+        """Rebuild on demand; every trigger sets _bloom_wakeup (see the module docstring)."""
+        while True:
+            self._bloom_wakeup.wait()
+            self._bloom_wakeup.clear()
             if self.enabled:
-                value = self.client.get(key)
-                if value:
-                    return json.loads(value)
-            else:
-                return self._memory_cache.get(key)
+                self._sync_bloom()
+
+    def _bloom_report(self) -> dict:
+        bloom = self._bloom
+        with self._stats_lock:
+            report = dict(self._bloom_stats)
+        negatives = report["skips"] + report["false_positives"]
+        report["observed_fp_rate"] = round(report["false_positives"] / negatives, 5) if negatives else 0.0
+        report["ready"] = bloom is not None
+        report["subscribed"] = self._bloom_subscribed.is_set()
+        report["last_sync_age_s"] = round(time.time() - self._bloom_synced_at, 1) if self._bloom_synced_at else None
+        if bloom is not None:
+            report.update(bloom.get_stats())
+        return report
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            for stats in (self._l2_stats, self._stampede_stats, self._bloom_stats):
+                if key in stats:
+                    stats[key] += 1
+                    return
+
+    def _l1_ttl(self, ttl: float) -> float:
+        # Without Redis, L1 is the only tier and keeps the full TTL
+        return min(ttl, config.CACHE_L1_TTL) if self.enabled else ttl
+
+    def _promote(self, key: str, raw: bytes, pttl: int, counter: str = "hits") -> Any:
+        """Decode a Redis value and copy it into L1 (never past its Redis TTL)."""
+        self._count(counter)
+        self._remember_key(key)
+        self.namespaces.record_read_bytes(key, len(raw))
+        value = cache_codec.decode(raw)
+        l1_ttl = config.CACHE_L1_TTL if pttl < 0 else min(config.CACHE_L1_TTL, pttl / 1000)
+        self.local.set(key, value, l1_ttl)
+        self._count("promotions")
+        return value
+
+    def _get_remote(self, key: str, use_filter: bool = True) -> Optional[Any]:
+        """Read `key` from Redis (bypassing L1) and promote it. With `use_filter`,
+        keys the Bloom filter has never seen are misses without a round trip."""
+        try:
+            if self.enabled:
+                bloom = self._filter_for(key) if use_filter else None
+                if bloom is not None and not bloom.might_contain(key):
+                    self._count("skips")
+                    self._count("misses")
+                    return None
+                # GET + PTTL in one round trip so L1 never outlives the Redis entry
+                raw, pttl = self.client.pipeline(transaction=False).get(key).pttl(key).execute()
+                if raw:
+                    return self._promote(key, raw, pttl)
+                self._count("misses")
+                if bloom is not None:
+                    self._count("false_positives")
         except Exception as e:
-            print(f"Cache get error: {e}")
+            self._handle_error("get", e)
         return None
+
+    def get(self, key: str) -> Optional[Any]:
+        start = time.perf_counter()
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self.namespaces.record_get(key, L1, time.perf_counter() - start)
+            return value
+        value = self._get_remote(key)
+        self.namespaces.record_get(key, L2 if value is not None else None, time.perf_counter() - start)
+        return value
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Cached value for `key`, unwrapping get_or_compute entries, even if stale."""
+        entry = self.get(key)
+        return entry["v"] if _is_envelope(entry) else entry
+
+    def mget(self, keys: Iterable[str], prefetch: bool = False) -> Dict[str, Any]:
+        """Fetch many keys: L1 first, the rest from Redis in one pipelined round trip.
+        Returns only the keys that were found.
+        With `prefetch`, the caller reads the keys again with get(), which counts
+        the lookup; here outcomes go to the prefetch_hits/prefetch_misses counters."""
+        found = {}
+        remote: List[str] = []
+        hits, misses = ("prefetch_hits", "prefetch_misses") if prefetch else ("hits", "misses")
+
+        def record(key, tier, seconds):
+            if prefetch:
+                self.namespaces.record_prefetch(key, tier is not None)
+            else:
+                self.namespaces.record_get(key, tier, seconds)
+
+        for key in dict.fromkeys(keys):
+            start = time.perf_counter()
+            value = self.local.get(key, count=not prefetch)
+            if value is not _MISSING:
+                found[key] = value
+                record(key, L1, time.perf_counter() - start)
+                continue
+            bloom = self._filter_for(key)
+            if bloom is not None and not bloom.might_contain(key):
+                self._count("skips")
+                self._count(misses)
+                record(key, None, time.perf_counter() - start)
+            elif self.enabled:
+                remote.append(key)
+            else:
+                record(key, None, time.perf_counter() - start)
+        if not remote:
+            return found
+        start = time.perf_counter()
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key in remote:
+                pipe.get(key)
+                pipe.pttl(key)
+            replies = pipe.execute()
+            for i, key in enumerate(remote):
+                raw, pttl = replies[2 * i], replies[2 * i + 1]
+                if raw:
+                    found[key] = self._promote(key, raw, pttl, counter=hits)
+                else:
+                    self._count(misses)
+                    if self._filter_for(key) is not None:
+                        self._count("false_positives")
+        except Exception as e:
+            self._handle_error("mget", e)
+        # One round trip for all remote keys; each is charged its full latency
+        elapsed = time.perf_counter() - start
+        for key in remote:
+            record(key, L2 if key in found else None, elapsed)
+        return found
+
+    def mset(self, mapping: Dict[str, Any], ttl: int = 3600) -> bool:
+        """Store many keys with one TTL in a single pipelined round trip."""
+        try:
+            for key, value in mapping.items():
+                self.local.set(key, value, self._l1_ttl(ttl))
+            if self.enabled and mapping:
+                start = time.perf_counter()
+                pipe = self.client.pipeline(transaction=False)
+                sizes = {}
+                for key, value in mapping.items():
+                    raw = cache_codec.encode(value)
+                    sizes[key] = len(raw)
+                    pipe.setex(key, ttl, raw)
+                    self._remember_key(key)
+                self._announce(pipe, list(mapping))
+                pipe.execute()
+                elapsed = time.perf_counter() - start
+                for key, nbytes in sizes.items():
+                    self.namespaces.record_set(key, nbytes, elapsed)
+            else:
+                for key in mapping:
+                    self.namespaces.record_set(key, 0, 0.0)
+            return True
+        except Exception as e:
+            self._handle_error("mset", e)
+            return False
     
     def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
         try:
+            start = time.perf_counter()
+            self.local.set(key, value, self._l1_ttl(ttl))
+            nbytes = 0
             if self.enabled:
-                self.client.setex(key, ttl, json.dumps(value, default=str))
-            else:
-                self._memory_cache[key] = value
+                self._remember_key(key)
+                raw = cache_codec.encode(value)
+                nbytes = len(raw)
+                pipe = self.client.pipeline(transaction=False)
+                pipe.setex(key, ttl, raw)
+                self._announce(pipe, [key])
+                pipe.execute()
+            self.namespaces.record_set(key, nbytes, time.perf_counter() - start)
             return True
         except Exception as e:
-            print(f"Cache set error: {e}")
+            self._handle_error("set", e)
             return False
     
+    # --- namespace generations ---
+
+    @staticmethod
+    def _generation_key(namespace: str) -> str:
+        return f"cache:gen:{namespace}"
+
+    def generation(self, namespace: str) -> int:
+        """Current generation of `namespace`, re-read from Redis every CACHE_GENERATION_REFRESH seconds."""
+        with self._generations_lock:
+            cached = self._generations.get(namespace)
+        if cached and (not self.enabled or time.monotonic() - cached[1] < config.CACHE_GENERATION_REFRESH):
+            return cached[0]
+        generation = cached[0] if cached else 0
+        if self.enabled:
+            try:
+                stored = int(self.client.get(self._generation_key(namespace)) or 0)
+                if cached and stored > generation:
+                    self._bloom_wakeup.set()  # bumped by another instance; its old keys are orphaned
+                generation = max(generation, stored)
+            except Exception as e:
+                self._handle_error("generation", e)
+        with self._generations_lock:
+            self._generations[namespace] = (generation, time.monotonic())
+        return generation
+
+    def bump_generation(self, namespace: str) -> int:
+        """Invalidate every entry in `namespace` in O(1). Returns the new generation."""
+        generation = self.generation(namespace) + 1
+        if self.enabled:
+            try:
+                generation = max(generation, self.client.incr(self._generation_key(namespace)))
+            except Exception as e:
+                self._handle_error("generation bump", e)
+        with self._generations_lock:
+            self._generations[namespace] = (generation, time.monotonic())
+        self._bloom_wakeup.set()
+        print(f"♻️ Cache namespace '{namespace}' now at generation {generation}")
+        return generation
+
+    def purge_namespace(self, namespace: str, keep_prefix: str, batch: int = 500) -> int:
+        """Delete `namespace` keys outside `keep_prefix` with incremental SCAN + UNLINK
+        (never KEYS, which blocks Redis). Returns the number of keys deleted."""
+        for key in self.local.keys(f"{namespace}:"):
+            if not key.startswith(keep_prefix):
+                self.local.delete(key)
+        if not self.enabled:
+            return 0
+        deleted = 0
+        try:
+            stale = []
+            for key in self.client.scan_iter(match=f"{namespace}:*", count=batch):
+                if not key.decode().startswith(keep_prefix):
+                    stale.append(key)
+                if len(stale) >= batch:
+                    deleted += self.client.unlink(*stale)
+                    stale = []
+            if stale:
+                deleted += self.client.unlink(*stale)
+        except Exception as e:
+            self._handle_error("purge", e)
+        if deleted:
+            self._bloom_wakeup.set()
+        return deleted
+
+    # --- stampede protection ---
+
+    def _try_lock(self, key: str):
+        """Non-blocking recompute lock for `key`. Returns a release function, or None if held."""
+        if self.enabled:
+            lock_key = f"lock:{key}"
+            token = uuid.uuid4().hex
+            try:
+                if not self.client.set(lock_key, token, nx=True, px=int(config.CACHE_LOCK_TTL * 1000)):
+                    return None
+
+                def release():
+                    try:
+                        self._release_lock(keys=[lock_key], args=[token])
+                    except Exception as e:
+                        self._handle_error("lock release", e)  # expires after CACHE_LOCK_TTL
+
+                return release
+            except Exception as e:
+                self._handle_error("lock", e)  # falls through to a local lock
+
+        with self._local_locks_guard:
+            lock = self._local_locks.setdefault(key, threading.Lock())
+        if not lock.acquire(blocking=False):
+            return None
+
+        def release_local():
+            with self._local_locks_guard:
+                self._local_locks.pop(key, None)
+            lock.release()
+
+        return release_local
+
+    def _lock_held(self, key: str) -> bool:
+        if self.enabled:
+            try:
+                return bool(self.client.exists(f"lock:{key}"))
+            except Exception as e:
+                self._handle_error("lock check", e)
+        with self._local_locks_guard:
+            lock = self._local_locks.get(key)
+        return lock is not None and lock.locked()
+
+    def _mark_failed(self, key: str):
+        """Tell waiters that the lock holder's compute produced nothing, so they stop waiting."""
+        marker = f"nil:{key}"
+        if self.enabled:
+            try:
+                self.client.set(marker, 1, px=int(config.CACHE_FAILURE_MARKER_TTL * 1000))
+                return
+            except Exception as e:
+                self._handle_error("failure marker", e)
+        self.local.set(marker, True, ttl=config.CACHE_FAILURE_MARKER_TTL)
+
+    def _has_failed(self, key: str) -> bool:
+        marker = f"nil:{key}"
+        if self.enabled:
+            try:
+                return bool(self.client.exists(marker))
+            except Exception as e:
+                self._handle_error("failure marker", e)
+        return self.local.get(marker, None) is not None
+
+    def _read_current(self, key: str) -> Optional[Any]:
+        """Latest value of `key`, bypassing L1 and the Bloom filter (the writer may be another instance)."""
+        return self._get_remote(key, use_filter=False) if self.enabled else self.local.get(key, None)
+
+    @staticmethod
+    def _should_refresh(entry: dict, beta: float) -> bool:
+        """XFetch: refresh early with a probability that rises as expiry nears
+        and with how long the value took to compute."""
+        jitter = entry["delta"] * beta * -math.log(1.0 - random.random())
+        return time.time() + jitter >= entry["expiry"]
+
+    def _compute_and_store(self, key: str, compute, ttl: int, stale_ttl: int, ttl_for=None) -> Any:
+        start = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - start
+        self._count("recomputes")
+        if value is None:
+            self._mark_failed(key)
+        else:
+            if ttl_for is not None:
+                ttl = ttl_for(value)
+            envelope = {"__xfetch__": 1, "v": value, "delta": delta, "expiry": time.time() + ttl}
+            # Kept stale_ttl past its logical expiry so it can be served while one worker refreshes
+            self.set(key, envelope, ttl=ttl + stale_ttl)
+        return value
+
+    def _wait_for(self, key: str, compute, ttl: int, stale_ttl: int, ttl_for=None) -> Any:
+        """
+        Cold miss while another worker computes: poll for its result.
+        - The holder's compute returned None: return None too (its failure marker)
+        - The lock is gone without a result (holder raised or died): take it over and compute
+        - Still nothing after CACHE_LOCK_WAIT: compute without the lock
+        """
+        self._count("lock_waits")
+        deadline = time.monotonic() + config.CACHE_LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            entry = self._read_current(key)
+            if entry is not None:
+                return entry["v"] if _is_envelope(entry) else entry
+            if self._has_failed(key):
+                self._count("lock_wait_failures")
+                return None
+            if not self._lock_held(key):
+                release = self._try_lock(key)
+                if release is None:
+                    continue  # another waiter took over; wait for it instead
+                try:
+                    entry = self._read_current(key)
+                    if entry is not None:
+                        return entry["v"] if _is_envelope(entry) else entry
+                    self._count("lock_takeovers")
+                    return self._compute_and_store(key, compute, ttl, stale_ttl, ttl_for)
+                finally:
+                    release()
+        self._count("lock_wait_timeouts")
+        return self._compute_and_store(key, compute, ttl, stale_ttl, ttl_for)
+
+    def get_or_compute(self, key: str, compute, ttl: int = 3600, stale_ttl: Optional[int] = None,
+                       beta: Optional[float] = None, ttl_for=None) -> Any:
+        """
+        Read-through cache with stampede protection.
+        - Fresh entries are returned, except that XFetch occasionally refreshes one early
+        - Only the worker holding the key's recompute lock calls `compute`; the others
+          get the stale value, or on a cold miss wait up to CACHE_LOCK_WAIT for the result
+        - Values stay servable for `stale_ttl` seconds past `ttl`
+        `compute` returning None is not cached. `ttl_for(value)`, if given, overrides
+        `ttl` per value (e.g. a short TTL for negative results).
+        """
+        stale_ttl = config.CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        beta = config.CACHE_XFETCH_BETA if beta is None else beta
+
+        entry = self.get(key)
+        if entry is not None and not _is_envelope(entry):
+            return entry  # plain set() value (e.g. warmed), served as-is
+        if entry is not None and not self._should_refresh(entry, beta):
+            return entry["v"]
+
+        release = self._try_lock(key)
+        if release is None:
+            if entry is not None:
+                self._count("stale_served")
+                return entry["v"]
+            return self._wait_for(key, compute, ttl, stale_ttl, ttl_for)
+
+        try:
+            if entry is None:
+                # The previous holder may have stored it between our miss and taking the lock
+                current = self._read_current(key)
+                if current is not None:
+                    return current["v"] if _is_envelope(current) else current
+            else:
+                # Another worker may have refreshed since our (possibly L1) read
+                current = self._get_remote(key, use_filter=False) if self.enabled else entry
+                if current is not None and (not _is_envelope(current) or current["expiry"] > entry["expiry"]):
+                    return current["v"] if _is_envelope(current) else current
+                if time.time() < entry["expiry"]:
+                    self._count("early_refreshes")
+            return self._compute_and_store(key, compute, ttl, stale_ttl, ttl_for)
+        finally:
+            release()
+
     def delete(self, key: str) -> bool:
         try:
+            self.local.delete(key)
             if self.enabled:
                 self.client.delete(key)
-            else:
-                self._memory_cache.pop(key, None)
             return True
-        except Exception:
+        except Exception as e:
+            self._handle_error("delete", e)
             return False
     
     def get_stats(self) -> dict:
+        l1 = self.local.get_stats()
+        with self._stats_lock:
+            l2 = dict(self._l2_stats)
+            stampede = dict(self._stampede_stats)
+        l2_lookups = l2["hits"] + l2["misses"]
+        l2["hit_rate"] = round(l2["hits"] / l2_lookups, 3) if l2_lookups else 0.0
+        with self._generations_lock:
+            generations = {ns: gen for ns, (gen, _) in self._generations.items()}
+        lookups = l1["hits"] + l1["misses"]
+        stats = {
+            "type": "redis" if self.enabled else "memory",
+            "connected": self.enabled,
+            "health": self.get_health(),
+            "generations": generations,
+            "bloom": self._bloom_report(),
+            "l1": l1,
+            "l2": l2,
+            "stampede": stampede,
+            "hit_rate": round((l1["hits"] + l2["hits"]) / lookups, 3) if lookups else 0.0,
+        }
         if self.enabled:
             try:
                 info = self.client.info()
-                return {
-                    "type": "redis",
-                    "connected": True,
+                l2.update({
                     "keys": self.client.dbsize(),
                     "memory_used": info.get("used_memory_human", "unknown"),
-                    "hits": info.get("keyspace_hits", 0),
-                    "misses": info.get("keyspace_misses", 0),
-                }
-            except Exception:
-                pass
-        return {
-            "type": "memory",
-            "connected": False,
-            "keys": len(self._memory_cache),
-        }
+                    "keyspace_hits": info.get("keyspace_hits", 0),
+                    "keyspace_misses": info.get("keyspace_misses", 0),
+                })
+            except Exception as e:
+                self._handle_error("stats", e)
+        return stats
 
 
 cache = RedisCache()
 
 
+def _version_components() -> Dict[str, str]:
+    return {
+        "model": config.MODEL_NAME,
+        "prompt": config.PROMPT_VERSION,
+        "skills": config.SKILLS_VERSION,
+        "embedding": config.EMBEDDING_MODEL,
+        "report": config.REPORT_VERSION,
+    }
+
+
+def namespace_prefix(namespace: str) -> str:
+    """Key prefix for `namespace`: schema version, dependency fingerprint and generation."""
+    components = _version_components()
+    deps = "|".join(f"{d}={components[d]}" for d in NAMESPACE_DEPENDENCIES.get(namespace, ()))
+    fingerprint = hashlib.md5(deps.encode()).hexdigest()[:8]
+    return f"{namespace}:v{config.CACHE_SCHEMA_VERSION}.{fingerprint}.g{cache.generation(namespace)}:"
+
+
+def invalidate_namespace(namespace: str, background: bool = False) -> Optional[int]:
+    """Bump the namespace generation, then SCAN-delete the orphaned keys.
+    Returns the number of Redis keys deleted, or None if the purge was started
+    in a background thread (the bump alone already invalidates every entry)."""
+    cache.bump_generation(namespace)
+    keep_prefix = namespace_prefix(namespace)
+    if not background:
+        return cache.purge_namespace(namespace, keep_prefix=keep_prefix)
+
+    def purge():
+        deleted = cache.purge_namespace(namespace, keep_prefix=keep_prefix)
+        print(f"🧹 Purged {deleted} orphaned '{namespace}' keys")
+
+    threading.Thread(target=purge, name=f"cache-purge-{namespace}", daemon=True).start()
+    return None
+
+
 def analysis_cache_key(jd_hash: str, resume_hash: str) -> str:
-    return f"analysis:{jd_hash}:{resume_hash}"
+    return f"{namespace_prefix('analysis')}{jd_hash}:{resume_hash}"
 
 
 def company_cache_key(company_name: str) -> str:
-    return f"company:{company_name.lower().replace(' ', '_')}"
+    """Key on the normalized name, so "Acme Inc." and "acme" share an entry."""
+    return f"{namespace_prefix('company')}{normalize_company_name(company_name).replace(' ', '_')}"
 
 
 def jd_parse_cache_key(jd_hash: str) -> str:
-    return f"jd_parsed:{jd_hash}"
+    return f"{namespace_prefix('jd_parsed')}{jd_hash}"
 
 
 def llm_cache_key(prompt_hash: str) -> str:
-    return f"llm:{prompt_hash}"
+    return f"{namespace_prefix('llm')}{prompt_hash}"
+
+
+def jd_skills_cache_key(jd_hash: str) -> str:
+    return f"{namespace_prefix('jd_skills')}{jd_hash}"
+
+
+def embedding_cache_key(text_hash: str) -> str:
+    return f"{namespace_prefix('embedding')}{text_hash}"
+
+
+def report_cache_key(data_hash: str) -> str:
+    return f"{namespace_prefix('report')}{data_hash}"
 
 
 def hash_content(content: str) -> str:
     return hashlib.md5(content.encode()).hexdigest()
 
 
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_jd(text: str) -> str:
+    """Whitespace-insensitive form of a job description (re-pasted JDs hash the same)."""
+    return " ".join(text.split())
+
+
 def cached(key_func, ttl: int = 3600):
     def decorator(func):
         @wraps(func)
@@ -144,22 +920,48 @@ def store_llm_response(prompt: str, response: str, model: str = "default", ttl:
 
 
 # Analysis Result Caching
-def cache_analysis_result(resume_text: str, jd_text: str, result: dict, ttl: int = 3600) -> bool:
-    """Cache full analysis result for resume+JD combination."""
-    resume_hash = hash_content(resume_text[:5000])
-    jd_hash = hash_content(jd_text[:2000])
-    cache_key = analysis_cache_key(jd_hash, resume_hash)
-    return cache.set(cache_key, result, ttl)
+def analysis_request_hashes(resume_content: bytes, jd_text: str, company_name: Optional[str] = None,
+                            job_url: Optional[str] = None, mode: str = "full") -> tuple:
+    """(jd_hash, resume_hash) over the full content: every uploaded byte, and the
+    normalized JD plus everything else that changes the result."""
+    resume_hash = hash_bytes(resume_content)
+    request_text = "\x1f".join([normalize_jd(jd_text), (company_name or "").strip().lower(), job_url or "", mode])
+    return hash_bytes(request_text.encode()), resume_hash
+
 
+def cache_analysis_result(resume_content: bytes, jd_text: str, result: dict, ttl: int = None,
+                          **request_fields) -> bool:
+    """Cache full analysis result for resume+JD combination (without the uploaded file)."""
+    cache_key = analysis_cache_key(*analysis_request_hashes(resume_content, jd_text, **request_fields))
+    slim = {k: v for k, v in result.items() if k != "resume_file"}
+    return cache.set(cache_key, slim, config.ANALYSIS_CACHE_TTL if ttl is None else ttl)
 
-def get_cached_analysis(resume_text: str, jd_text: str) -> Optional[dict]:
+
+def get_cached_analysis(resume_content: bytes, jd_text: str, **request_fields) -> Optional[dict]:
     """Get cached analysis result if available."""
-    resume_hash = hash_content(resume_text[:5000])
-    jd_hash = hash_content(jd_text[:2000])
-    cache_key = analysis_cache_key(jd_hash, resume_hash)
+    cache_key = analysis_cache_key(*analysis_request_hashes(resume_content, jd_text, **request_fields))
     return cache.get(cache_key)
 
 
+# Request prefetch
+def request_cache_keys(jd_text: str, company_name: Optional[str] = None) -> List[str]:
+    """Cache keys the workflow will read for this request (same keys the agents use)."""
+    keys = [
+        jd_parse_cache_key(hash_content(jd_text[:2000])),
+        jd_skills_cache_key(hash_content(jd_text)),
+        embedding_cache_key(hash_content(jd_text)),
+    ]
+    if company_name:
+        keys.append(company_cache_key(company_name))
+    return keys
+
+
+def prefetch_request_keys(jd_text: str, company_name: Optional[str] = None) -> int:
+    """Load this request's cached entries into L1 with one Redis round trip.
+    Agents' later cache.get calls then hit L1. Returns the number found."""
+    return len(cache.mget(request_cache_keys(jd_text, company_name), prefetch=True))
+
+
 # Cache warming for common JDs
 def warm_cache_for_jd(jd_text: str, parsed_result: dict) -> bool:
     """Pre-cache parsed JD for faster subsequent analyses."""
@@ -176,13 +978,5 @@ def invalidate_company_cache(company_name: str) -> bool:
 
 
 def clear_all_llm_cache() -> int:
-    """Clear all LLM response cache."""
-    if cache.enabled:
-        try:
-            keys = cache.client.keys("llm:*")
-            if keys:
-                cache.client.delete(*keys)
-            return len(keys)
-        except Exception as e:
-            print(f"Error clearing LLM cache: {e}")
-    return 0
+    """Clear all LLM response cache (O(1) generation bump, then incremental cleanup)."""
+    return invalidate_namespace("llm")
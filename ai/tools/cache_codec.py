@@ -0,0 +1,189 @@
+"""
+Binary codecs for cached values.
+Every encoded value starts with one header byte:
+    0x80 | codec (0x01 JSON, 0x02 msgpack) | compression (0x10 zlib, 0x20 zstd)
+JSON text always starts with an ASCII byte (< 0x80), so values written before
+this format (plain `json.dumps`) are still decoded.
+
+1. msgpack (default when installed) stores bytes natively and NumPy arrays as an
+   ext type; the JSON fallback tags them as base64 objects
+2. Payloads of at least CACHE_COMPRESS_MIN_BYTES are compressed with zstd when
+   installed, else zlib, and kept compressed only if that saves space
+"""
+import base64
+import json
+import zlib
+from typing import Any
+
+from config import config
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+HEADER = 0x80
+CODEC_JSON = 0x01
+CODEC_MSGPACK = 0x02
+COMPRESS_ZLIB = 0x10
+COMPRESS_ZSTD = 0x20
+_CODEC_MASK = 0x0F
+_COMPRESS_MASK = 0x30
+
+_EXT_NDARRAY = 1
+_ZSTD_LEVEL = 3
+
+
+class CodecError(ValueError):
+    """Raised when a cached value cannot be decoded."""
+
+
+# --- JSON (tagged) ---------------------------------------------------------
+
+def _json_default(obj):
+    if isinstance(obj, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(bytes(obj)).decode("ascii")}
+    if HAS_NUMPY and isinstance(obj, np.ndarray):
+        return {
+            "__ndarray__": base64.b64encode(np.ascontiguousarray(obj).tobytes()).decode("ascii"),
+            "dtype": obj.dtype.str,
+            "shape": list(obj.shape),
+        }
+    if HAS_NUMPY and isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+
+def _json_object_hook(obj: dict):
+    if "__bytes__" in obj and len(obj) == 1:
+        return base64.b64decode(obj["__bytes__"])
+    if "__ndarray__" in obj and HAS_NUMPY:
+        data = base64.b64decode(obj["__ndarray__"])
+        return np.frombuffer(data, dtype=np.dtype(obj["dtype"])).reshape(obj["shape"]).copy()
+    return obj
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    return json.loads(data, object_hook=_json_object_hook)
+
+
+# --- msgpack ---------------------------------------------------------------
+
+def _msgpack_default(obj):
+    if HAS_NUMPY and isinstance(obj, np.ndarray):
+        array = np.ascontiguousarray(obj)
+        header = json.dumps({"dtype": array.dtype.str, "shape": list(array.shape)}).encode("ascii")
+        return msgpack.ExtType(_EXT_NDARRAY, len(header).to_bytes(2, "big") + header + array.tobytes())
+    if HAS_NUMPY and isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def _msgpack_ext_hook(code: int, data: bytes):
+    if code == _EXT_NDARRAY and HAS_NUMPY:
+        size = int.from_bytes(data[:2], "big")
+        meta = json.loads(data[2:2 + size])
+        return np.frombuffer(data[2 + size:], dtype=np.dtype(meta["dtype"])).reshape(meta["shape"]).copy()
+    return msgpack.ExtType(code, data)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    return msgpack.unpackb(data, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+
+
+# --- compression -----------------------------------------------------------
+
+def _compress(data: bytes, method: str):
+    if method == "zstd" and HAS_ZSTD:
+        # Compressor objects are not thread-safe, so one per call
+        return zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(data), COMPRESS_ZSTD
+    if method in ("zstd", "zlib"):
+        return zlib.compress(data, 6), COMPRESS_ZLIB
+    return data, 0
+
+
+def _decompress(data: bytes, flag: int) -> bytes:
+    if flag == COMPRESS_ZSTD:
+        if not HAS_ZSTD:
+            raise CodecError("value is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if flag == COMPRESS_ZLIB:
+        return zlib.decompress(data)
+    return data
+
+
+# --- public API ------------------------------------------------------------
+
+def default_codec() -> str:
+    codec = config.CACHE_CODEC
+    if codec == "msgpack" and not HAS_MSGPACK:
+        return "json"
+    return codec
+
+
+def encode(value: Any, codec: str = None, compression: str = None,
+           min_compress_bytes: int = None) -> bytes:
+    """Serialize `value` to header byte + (optionally compressed) payload."""
+    codec = codec or default_codec()
+    compression = compression or config.CACHE_COMPRESSION
+    min_compress_bytes = config.CACHE_COMPRESS_MIN_BYTES if min_compress_bytes is None else min_compress_bytes
+
+    if codec == "msgpack":
+        payload, flags = _msgpack_dumps(value), CODEC_MSGPACK
+    elif codec == "json":
+        payload, flags = _json_dumps(value), CODEC_JSON
+    else:
+        raise CodecError(f"unknown cache codec: {codec}")
+
+    if compression != "none" and len(payload) >= min_compress_bytes:
+        compressed, compress_flag = _compress(payload, compression)
+        if len(compressed) < len(payload):
+            payload, flags = compressed, flags | compress_flag
+
+    return bytes([HEADER | flags]) + payload
+
+
+def decode(data) -> Any:
+    """Inverse of `encode`; also accepts legacy plain-JSON values (bytes or str)."""
+    if isinstance(data, str):
+        return json.loads(data)
+    if not data:
+        raise CodecError("empty cache value")
+    header = data[0]
+    if not header & HEADER:
+        return json.loads(data)
+
+    payload = _decompress(data[1:], header & _COMPRESS_MASK)
+    codec = header & _CODEC_MASK
+    if codec == CODEC_MSGPACK:
+        if not HAS_MSGPACK:
+            raise CodecError("value is msgpack-encoded but msgpack is not installed")
+        return _msgpack_loads(payload)
+    if codec == CODEC_JSON:
+        return _json_loads(payload)
+    raise CodecError(f"unknown codec flag {codec:#x}")
@@ -0,0 +1,130 @@
+"""
+Per-namespace cache counters.
+The namespace is the key's first segment (`jd_parsed`, `company`, `llm`, ...).
+For each namespace:
+1. Lookups by outcome: L1 hit, L2 (Redis) hit, miss. Request prefetches
+   (cache.mget(prefetch=True)) are counted apart, so hit rates count each
+   key the agents read once
+2. Sets, L1 evictions, encoded bytes written to and read from Redis
+3. Get/set latency histograms (millisecond buckets) with p50/p95/p99
+   estimated from the bucket bounds
+Exposed through /api/admin/cache/stats to size TTLs and memory from data.
+"""
+import threading
+from typing import Dict, List, Optional
+
+# Bucket upper bounds in milliseconds; one extra bucket counts everything slower
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+L1 = "l1"
+L2 = "l2"
+
+
+def namespace_of(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+def _bucket(seconds: float) -> int:
+    ms = seconds * 1000
+    for i, bound in enumerate(LATENCY_BUCKETS_MS):
+        if ms <= bound:
+            return i
+    return len(LATENCY_BUCKETS_MS)
+
+
+def _percentile(counts: List[int], q: float) -> Optional[float]:
+    """Upper bound of the bucket holding the q-th quantile (None past the last bound)."""
+    total = sum(counts)
+    if not total:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(counts):
+        seen += count
+        if seen >= rank:
+            return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else None
+    return None
+
+
+def _histogram(counts: List[int]) -> dict:
+    labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+    return {
+        "buckets": {label: count for label, count in zip(labels, counts) if count},
+        "p50_ms": _percentile(counts, 0.50),
+        "p95_ms": _percentile(counts, 0.95),
+        "p99_ms": _percentile(counts, 0.99),
+    }
+
+
+class NamespaceStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._namespaces: Dict[str, dict] = {}
+
+    def _entry(self, key: str) -> dict:
+        # Caller holds self._lock
+        namespace = namespace_of(key)
+        entry = self._namespaces.get(namespace)
+        if entry is None:
+            entry = self._namespaces[namespace] = {
+                "l1_hits": 0, "l2_hits": 0, "misses": 0, "prefetch_hits": 0, "prefetch_misses": 0,
+                "sets": 0, "evictions": 0,
+                "bytes_written": 0, "bytes_read": 0,
+                "get_latency": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                "set_latency": [0] * (len(LATENCY_BUCKETS_MS) + 1),
+            }
+        return entry
+
+    def record_get(self, key: str, tier: Optional[str], seconds: float):
+        """One lookup; `tier` is L1, L2 or None for a miss."""
+        with self._lock:
+            entry = self._entry(key)
+            if tier == L1:
+                entry["l1_hits"] += 1
+            elif tier == L2:
+                entry["l2_hits"] += 1
+            else:
+                entry["misses"] += 1
+            entry["get_latency"][_bucket(seconds)] += 1
+
+    def record_prefetch(self, key: str, found: bool):
+        """One prefetched key; the later get() is what record_get counts."""
+        with self._lock:
+            self._entry(key)["prefetch_hits" if found else "prefetch_misses"] += 1
+
+    def record_set(self, key: str, nbytes: int, seconds: float):
+        with self._lock:
+            entry = self._entry(key)
+            entry["sets"] += 1
+            entry["bytes_written"] += nbytes
+            entry["set_latency"][_bucket(seconds)] += 1
+
+    def record_read_bytes(self, key: str, nbytes: int):
+        with self._lock:
+            self._entry(key)["bytes_read"] += nbytes
+
+    def record_eviction(self, key: str):
+        with self._lock:
+            self._entry(key)["evictions"] += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            snapshot = {
+                ns: {k: list(v) if isinstance(v, list) else v for k, v in entry.items()}
+                for ns, entry in self._namespaces.items()
+            }
+        stats = {}
+        for namespace, entry in sorted(snapshot.items()):
+            hits = entry["l1_hits"] + entry["l2_hits"]
+            lookups = hits + entry["misses"]
+            get_latency = entry.pop("get_latency")
+            set_latency = entry.pop("set_latency")
+            entry.update({
+                "hits": hits,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "avg_value_bytes": round(entry["bytes_written"] / entry["sets"]) if entry["sets"] else 0,
+                "get_latency": _histogram(get_latency),
+                "set_latency": _histogram(set_latency),
+            })
+            stats[namespace] = entry
+        return stats
@@ -0,0 +1,138 @@
+"""
+Circuit breakers for external dependencies (OpenAI, DuckDuckGo).
+After N consecutive failures the circuit opens and calls fail immediately with
+CircuitOpenError, so agents switch to their fallbacks in milliseconds instead of
+waiting for every call to time out. After a cool-down, a limited number of
+half-open probe calls decide whether to close the circuit again.
+"""
+import threading
+import time
+from typing import Dict, Tuple, Type
+
+from config import config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"circuit '{name}' is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_types: Tuple[Type[BaseException], ...] = (Exception,),
+                 failure_threshold: int = config.BREAKER_FAILURE_THRESHOLD,
+                 recovery_timeout: float = config.BREAKER_RECOVERY_TIMEOUT,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_types = failure_types
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._stats = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def check(self):
+        """Fail fast if the circuit is open (does not consume a half-open probe)."""
+        with self._lock:
+            if self._current_state() == OPEN:
+                self._stats["rejected"] += 1
+                raise CircuitOpenError(self.name)
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == OPEN or (state == HALF_OPEN and self._probes >= self.half_open_max_calls):
+                self._stats["rejected"] += 1
+                return False
+            if state == HALF_OPEN:
+                self._probes += 1
+            self._stats["calls"] += 1
+            return True
+
+    def _on_success(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                print(f"✅ Circuit '{self.name}' closed")
+            self._state = CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def _on_failure(self):
+        with self._lock:
+            self._stats["failures"] += 1
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._stats["opened"] += 1
+                    print(f"⚡ Circuit '{self.name}' opened after {self._failures} failures")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probes = 0
+
+    def _on_neutral(self):
+        # Errors that say nothing about dependency health (e.g. 429, bad request)
+        with self._lock:
+            if self._state == HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def call(self, func, *args, **kwargs):
+        """Run `func` through the breaker; raises CircuitOpenError when open."""
+        if not self._acquire():
+            raise CircuitOpenError(self.name)
+        try:
+            result = func(*args, **kwargs)
+        except self.failure_types:
+            self._on_failure()
+            raise
+        except BaseException:
+            self._on_neutral()
+            raise
+        self._on_success()
+        return result
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                **self._stats,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Return the process-wide breaker for `name`, creating it on first use."""
+    with _registry_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, **kwargs)
+        return _breakers[name]
+
+
+def get_breaker_stats() -> dict:
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.get_stats() for b in breakers}
@@ -0,0 +1,46 @@
+"""
+Company name normalization for cache keys.
+"Acme Inc.", "ACME, Inc" and "acme" all normalize to "acme", and known
+aliases ("Facebook", "Meta Platforms") map to one canonical name, so they
+share a single company-intel cache entry.
+"""
+import re
+
+# Legal-form suffixes dropped from the end of a name
+_SUFFIXES = {
+    "inc", "incorporated", "llc", "llp", "ltd", "limited", "corp", "corporation",
+    "co", "company", "plc", "gmbh", "ag", "sa", "bv", "pty", "pvt", "holdings",
+}
+
+# Normalized alias -> canonical normalized name. No single letters: "X" could be any company
+COMPANY_ALIASES = {
+    "facebook": "meta",
+    "meta platforms": "meta",
+    "alphabet": "google",
+    "google cloud": "google",
+    "amazon com": "amazon",
+    "amazon web services": "amazon",
+    "aws": "amazon",
+    "microsoft azure": "microsoft",
+    "msft": "microsoft",
+    "ibm research": "ibm",
+    "international business machines": "ibm",
+    "jp morgan": "jpmorgan",
+    "jpmorgan chase": "jpmorgan",
+    "j p morgan": "jpmorgan",
+}
+
+
+def normalize_company_name(name: str) -> str:
+    """Lowercase, strip punctuation, a leading "the" and legal suffixes, then resolve aliases.
+    Returns "" when nothing recognizable is left."""
+    words = re.sub(r"[^a-z0-9&]+", " ", (name or "").lower().replace("&", " & ")).split()
+    if words and words[0] == "the":
+        words = words[1:]
+    # "&" only survives between words ("Johnson & Johnson", not "Acme & Co")
+    while words and words[0] == "&":
+        words = words[1:]
+    while len(words) > 1 and (words[-1] in _SUFFIXES or words[-1] == "&"):
+        words = words[:-1]
+    normalized = " ".join(words)
+    return COMPANY_ALIASES.get(normalized, normalized)
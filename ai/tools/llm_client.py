@@ -0,0 +1,327 @@
+"""
+Shared OpenAI client for all agents.
+Every LLM call goes through `invoke_llm` so that:
+1. The process-wide rate limiter sees all traffic, and 429s are retried through
+   the limiter instead of the OpenAI SDK's own (uncoordinated) retry loop
+2. Each agent has its own timeout
+3. Slow calls are hedged: after the agent's p95 latency a duplicate request is
+   sent and the first answer wins, bounded by a global hedging budget
+4. While OpenAI is failing, the circuit breaker rejects calls immediately
+5. Tokens, cost and latency of every call land in the request's usage ledger
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Optional
+
+from langchain_openai import ChatOpenAI
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+from config import config
+from tools.circuit_breaker import CircuitOpenError, get_breaker, get_breaker_stats
+from tools.usage_ledger import record_usage, settle_usage, current_ledger, agent_counters
+from tools.rate_limiter import (
+    rate_limiter,
+    parse_reset_duration,
+    PRIORITY_CRITICAL,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BACKGROUND,
+)
+
+# Parsing runs before the matcher; everything else is off the critical path
+AGENT_PRIORITIES: Dict[str, int] = {
+    "resume_parser": PRIORITY_CRITICAL,
+    "job_parser": PRIORITY_CRITICAL,
+}
+
+# Set by llm_priority() for batch work such as cache warmup
+_priority_override: ContextVar[Optional[int]] = ContextVar("llm_priority", default=None)
+
+# Rough completion budget used until the real usage is known
+COMPLETION_TOKEN_ESTIMATE = 400
+
+_models: Dict[tuple, ChatOpenAI] = {}
+_models_lock = threading.Lock()
+
+# Connection errors, timeouts and 5xx count as outages; 429s and bad requests do not
+openai_breaker = get_breaker("openai", failure_types=(APIConnectionError, InternalServerError))
+
+# Calls wait in the rate limiter inside these threads, so size well above the concurrency cap
+_executor = ThreadPoolExecutor(
+    max_workers=max(32, config.OPENAI_MAX_CONCURRENCY * 4),
+    thread_name_prefix="llm",
+)
+
+
+class LLMTimeoutError(TimeoutError):
+    """Raised when an LLM call does not finish within its agent's timeout."""
+
+
+def get_chat_model(temperature: float, timeout: float) -> ChatOpenAI:
+    """Return a shared ChatOpenAI instance (one HTTP connection pool per settings)."""
+    key = (temperature, timeout)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            if config.USE_FAKE_LLM:
+                from tools.fake_llm import FakeChatModel
+                model = FakeChatModel(
+                    latency_spec=config.FAKE_LLM_LATENCY,
+                    seed=config.FAKE_LLM_SEED,
+                    temperature=temperature,
+                )
+            else:
+                model = ChatOpenAI(
+                    model=config.MODEL_NAME,
+                    temperature=temperature,
+                    timeout=timeout,
+                    max_retries=0,  # retries go through the rate limiter
+                    include_response_headers=True,
+                )
+            _models[key] = model
+        return model
+
+
+@contextmanager
+def llm_priority(priority: int):
+    """Run every LLM call in this context at `priority` (e.g. PRIORITY_BACKGROUND for warmup)."""
+    token = _priority_override.set(priority)
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
+
+def agent_timeout(agent: str) -> float:
+    return config.LLM_TIMEOUTS.get(agent, config.LLM_DEFAULT_TIMEOUT)
+
+
+class _Hedger:
+    """Tracks per-agent latency percentiles and the global hedging budget."""
+
+    def __init__(self, budget_ratio: float, max_burst: float = 10.0):
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, deque] = {}
+        self.budget_ratio = budget_ratio
+        self.max_burst = max_burst
+        # Each call earns `budget_ratio` of a hedge; each hedge spends one
+        self._budget = 0.0
+        self._stats = {
+            "calls": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "budget_exhausted": 0,
+            "timeouts": 0,
+            "added_requests": 0,
+            "added_tokens": 0,
+        }
+
+    def record_call(self):
+        with self._lock:
+            self._stats["calls"] += 1
+            self._budget = min(self.max_burst, self._budget + self.budget_ratio)
+
+    def record_latency(self, agent: str, seconds: float):
+        with self._lock:
+            self._latencies.setdefault(agent, deque(maxlen=200)).append(seconds)
+
+    def delay(self, agent: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None if there is not enough history yet."""
+        with self._lock:
+            samples = self._latencies.get(agent)
+            if not samples or len(samples) < config.HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(samples)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return max(config.HEDGE_MIN_DELAY, p95)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._budget >= 1.0:
+                self._budget -= 1.0
+                self._stats["hedged"] += 1
+                self._stats["added_requests"] += 1
+                return True
+            self._stats["budget_exhausted"] += 1
+            return False
+
+    def record(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            p95 = {}
+            for agent, samples in self._latencies.items():
+                ordered = sorted(samples)
+                p95[agent] = round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000)
+        stats["hedge_win_rate"] = round(stats["hedge_wins"] / stats["hedged"], 3) if stats["hedged"] else 0.0
+        stats["added_request_pct"] = round(100 * stats["added_requests"] / stats["calls"], 2) if stats["calls"] else 0.0
+        stats["p95_latency_ms"] = p95
+        return stats
+
+
+hedger = _Hedger(budget_ratio=config.HEDGE_BUDGET_RATIO)
+
+
+def estimate_tokens(prompt) -> int:
+    """Cheap token estimate (~4 chars per token) plus a completion budget."""
+    if hasattr(prompt, "to_string"):
+        text = prompt.to_string()
+    elif isinstance(prompt, list):
+        text = " ".join(str(getattr(m, "content", m)) for m in prompt)
+    else:
+        text = str(prompt)
+    return len(text) // 4 + COMPLETION_TOKEN_ESTIMATE
+
+
+def _retry_after(error: RateLimitError) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("x-ratelimit-reset-requests")
+    return parse_reset_duration(value)
+
+
+def _call_with_limits(agent: str, llm: ChatOpenAI, prompt, estimated: int,
+                      priority: int, deadline: float):
+    """One logical LLM request: rate-limited, with 429 retries, until `deadline`."""
+    for attempt in range(config.OPENAI_MAX_RETRIES + 1):
+        if not rate_limiter.acquire(estimated, priority, timeout=max(0.0, deadline - time.monotonic())):
+            raise LLMTimeoutError(f"{agent}: timed out waiting for OpenAI rate limit")
+        actual_tokens = None
+        headers = None
+        success = False
+        try:
+            response = openai_breaker.call(llm.invoke, prompt)
+            usage = getattr(response, "usage_metadata", None) or {}
+            actual_tokens = usage.get("total_tokens")
+            headers = response.response_metadata.get("headers")
+            success = True
+            return response
+        except RateLimitError as e:
+            rate_limiter.penalize(_retry_after(e))
+            if attempt == config.OPENAI_MAX_RETRIES:
+                raise
+            print(f"⏳ OpenAI 429 for {agent}, retrying ({attempt + 1}/{config.OPENAI_MAX_RETRIES})")
+        finally:
+            rate_limiter.release(estimated, actual_tokens, headers, success)
+
+
+def _charge_hedge_loser(agent: str, loser, estimated: int):
+    """
+    Charge the abandoned request of a hedged pair to the current request's ledger.
+    The request's usage summary is usually built before the loser finishes, so its
+    estimated prompt tokens are recorded now; the actual usage replaces them when
+    it completes. A loser that never got past the limiter or breaker costs nothing.
+    """
+    entry = record_usage(agent, prompt_tokens=max(0, estimated - COMPLETION_TOKEN_ESTIMATE), hedge_loser=True)
+    ledger = current_ledger()
+
+    def settle(future):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            usage = getattr(future.result(), "usage_metadata", None) or {}
+            hedger.record("added_tokens", usage.get("total_tokens", 0))
+            settle_usage(entry, ledger, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+        elif isinstance(error, (LLMTimeoutError, CircuitOpenError)):
+            settle_usage(entry, ledger, 0, 0)
+
+    loser.add_done_callback(settle)
+
+
+def invoke_llm(agent: str, prompt, temperature: float = config.TEMPERATURE,
+               priority: Optional[int] = None):
+    """
+    Invoke the chat model for `agent` under the shared rate limiter.
+    `prompt` is anything ChatOpenAI.invoke accepts (string, PromptValue, messages).
+    Returns the AIMessage; raises LLMTimeoutError after the agent's timeout and
+    CircuitOpenError (without waiting) while OpenAI is down.
+    """
+    start = time.monotonic()
+    try:
+        response, hedged = _invoke_hedged(agent, prompt, temperature, priority)
+    except Exception as e:
+        record_usage(agent, latency_ms=(time.monotonic() - start) * 1000, error=type(e).__name__)
+        raise
+    usage = getattr(response, "usage_metadata", None) or {}
+    record_usage(
+        agent,
+        prompt_tokens=usage.get("input_tokens", 0),
+        completion_tokens=usage.get("output_tokens", 0),
+        latency_ms=(time.monotonic() - start) * 1000,
+        hedged=hedged,
+    )
+    return response
+
+
+def _invoke_hedged(agent: str, prompt, temperature: float, priority: Optional[int]):
+    """Primary request plus an optional hedge; returns (response, whether a hedge was sent)."""
+    openai_breaker.check()
+    if priority is None:
+        priority = _priority_override.get()
+    if priority is None:
+        priority = AGENT_PRIORITIES.get(agent, PRIORITY_INTERACTIVE)
+    estimated = estimate_tokens(prompt)
+    timeout = agent_timeout(agent)
+    llm = get_chat_model(temperature, timeout)
+    start = time.monotonic()
+    deadline = start + timeout
+    hedger.record_call()
+
+    primary = _executor.submit(_call_with_limits, agent, llm, prompt, estimated, priority, deadline)
+
+    def record_primary_latency(future):
+        # Recorded even when a hedge wins, so p95 is not biased low
+        if future.exception() is None:
+            hedger.record_latency(agent, time.monotonic() - start)
+
+    primary.add_done_callback(record_primary_latency)
+    pending = {primary}
+    hedge = None
+
+    hedge_delay = hedger.delay(agent) if config.HEDGE_ENABLED else None
+    if hedge_delay is not None and hedge_delay < timeout:
+        done, _ = wait(pending, timeout=hedge_delay)
+        if not done and hedger.try_spend():
+            hedge = _executor.submit(
+                _call_with_limits, agent, llm, prompt, estimated, PRIORITY_BACKGROUND, deadline
+            )
+            pending.add(hedge)
+
+    errors = []
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                             return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            if future.exception() is not None:
+                errors.append(future.exception())
+                continue
+            if future is hedge:
+                hedger.record("hedge_wins")
+            if hedge is not None:
+                _charge_hedge_loser(agent, hedge if future is primary else primary, estimated)
+            return future.result(), hedge is not None
+
+    if errors and not pending:
+        raise errors[0]
+    hedger.record("timeouts")
+    if hedge is not None and hedge in pending:
+        _charge_hedge_loser(agent, hedge, estimated)
+    raise LLMTimeoutError(f"{agent}: no LLM response within {timeout:.0f}s")
+
+
+def get_llm_stats() -> dict:
+    """Rate limiter, hedging and per-agent usage counters for the admin endpoint."""
+    return {
+        "rate_limiter": rate_limiter.get_stats(),
+        "hedging": hedger.get_stats(),
+        "agents": agent_counters.get_stats(),
+        "circuits": get_breaker_stats(),
+    }
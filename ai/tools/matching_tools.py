@@ -1,16 +1,29 @@
-from sentence_transformers import SentenceTransformer, util
-import torch
+from sentence_transformers import SentenceTransformer
+import numpy as np
 from typing import List, Tuple
 
+from config import config
+from tools.cache import cache, embedding_cache_key, hash_content
+
 class MatchingTools:
     def __init__(self, model_name: str = 'all-MiniLM-L6-v2'):
         self.model = SentenceTransformer(model_name)
     
-    def calculate_similarity(self, text1: str, text2: str) -> float:
-        """Calculate cosine similarity between two texts"""
-        embedding1 = self.model.encode(text1, convert_to_tensor=True)
-        embedding2 = self.model.encode(text2, convert_to_tensor=True)
-        similarity = util.cos_sim(embedding1, embedding2).item()
+    def embed(self, text: str, cached: bool = True) -> np.ndarray:
+        """Normalized embedding for text; with `cached`, stored by content hash (for JDs, which
+        repeat across candidates; resumes are never reused and are personal data)"""
+        if not cached:
+            return self.model.encode(text, normalize_embeddings=True)
+        key = embedding_cache_key(hash_content(text))
+        embedding = cache.get(key)
+        if embedding is None:
+            embedding = self.model.encode(text, normalize_embeddings=True)
+            cache.set(key, embedding, ttl=config.EMBEDDING_CACHE_TTL)
+        return embedding
+    
+    def calculate_similarity(self, resume_text: str, job_text: str) -> float:
+        """Calculate cosine similarity between a resume and a job description (only the JD side is cached)"""
+        similarity = float(np.dot(self.embed(resume_text, cached=False), self.embed(job_text)))
         return round(similarity * 100, 2)
     
     def calculate_skill_match(self, resume_skills: List[str], job_skills: List[str]) -> Tuple[List[str], List[str], float]:
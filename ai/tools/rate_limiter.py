@@ -0,0 +1,200 @@
+"""
+Client-side rate limiter for OpenAI calls, shared by all agents.
+Enforces:
+1. Requests per minute (token bucket)
+2. Tokens per minute (token bucket, reconciled with actual usage)
+3. Max concurrent in-flight requests
+Waiters are served by priority (lower value first), FIFO within a priority.
+Limits adapt to the x-ratelimit-* response headers and back off on 429s.
+"""
+import heapq
+import itertools
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+from config import config
+
+# Lower value = served first
+PRIORITY_CRITICAL = 0      # On the critical path (parsing before matching)
+PRIORITY_INTERACTIVE = 1   # Enhancement agents for a live request
+PRIORITY_BACKGROUND = 2    # Warmup, pre-rendering, hedged duplicates
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|s|m|h)')
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse OpenAI reset durations like '20ms', '1s', '6m0s' into seconds."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(str(value))
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(num) * _DURATION_UNITS[unit] for num, unit in parts)
+
+
+class _TokenBucket:
+    """Continuously refilling bucket; capacity is the per-minute limit."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float, rate_factor: float):
+        rate = self.capacity / 60.0 * rate_factor
+        self.level = min(self.capacity, self.level + (now - self.updated) * rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, rate_factor: float) -> float:
+        deficit = min(amount, self.capacity) - self.level
+        if deficit <= 0:
+            return 0.0
+        return deficit / (self.capacity / 60.0 * rate_factor)
+
+    def resize(self, per_minute: int):
+        if per_minute > 0 and per_minute != self.capacity:
+            self.level = min(self.level, float(per_minute))
+            self.capacity = float(per_minute)
+
+
+class RateLimiter:
+    def __init__(self, rpm: int, tpm: int, max_concurrency: int):
+        self._cond = threading.Condition()
+        self._requests = _TokenBucket(rpm)
+        self._tokens = _TokenBucket(tpm)
+        self.max_concurrency = max_concurrency
+        self._in_flight = 0
+        self._waiters = []
+        self._seq = itertools.count()
+        # AIMD factor applied to both refill rates: halved on 429, recovers on success
+        self._rate_factor = 1.0
+        self._paused_until = 0.0
+        self._stats = {
+            "acquired": 0,
+            "throttled_429": 0,
+            "header_updates": 0,
+            "total_wait_s": 0.0,
+            "max_queue_depth": 0,
+        }
+
+    def acquire(self, estimated_tokens: int, priority: int = PRIORITY_INTERACTIVE,
+                timeout: Optional[float] = None) -> bool:
+        """Block until a request slot and token budget are available."""
+        start = time.monotonic()
+        deadline = start + timeout if timeout is not None else None
+        entry = (priority, next(self._seq))
+
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._waiters))
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._wait_time(entry, estimated_tokens, now)
+                    if wait == 0.0:
+                        break
+                    if deadline is not None:
+                        if now >= deadline:
+                            return False
+                        wait = deadline - now if wait is None else min(wait, deadline - now)
+                    self._cond.wait(wait)
+
+                heapq.heappop(self._waiters)
+                self._requests.level -= 1
+                self._tokens.level -= estimated_tokens
+                self._in_flight += 1
+                self._stats["acquired"] += 1
+                self._stats["total_wait_s"] += time.monotonic() - start
+                return True
+            finally:
+                if entry in self._waiters:
+                    # Timed out while queued: drop our entry
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+    def _wait_time(self, entry, estimated_tokens: int, now: float) -> Optional[float]:
+        """Seconds to wait before `entry` may proceed (0.0 = go now, None = wait for a signal)."""
+        if self._waiters[0] != entry:
+            return None
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._in_flight >= self.max_concurrency:
+            return None
+        self._requests.refill(now, self._rate_factor)
+        self._tokens.refill(now, self._rate_factor)
+        return max(
+            self._requests.wait_time(1, self._rate_factor),
+            self._tokens.wait_time(estimated_tokens, self._rate_factor),
+        )
+
+    def release(self, estimated_tokens: int, actual_tokens: Optional[int] = None,
+                headers: Optional[Dict[str, str]] = None, success: bool = True):
+        """Free the concurrency slot and reconcile the token estimate with actual usage."""
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            if actual_tokens is not None:
+                self._tokens.level += estimated_tokens - actual_tokens
+            if headers:
+                self._apply_headers(headers)
+            if success:
+                self._rate_factor = min(1.0, self._rate_factor + 0.05)
+            self._cond.notify_all()
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """Back off after a 429: pause the queue and halve the effective rate."""
+        with self._cond:
+            self._stats["throttled_429"] += 1
+            self._rate_factor = max(0.1, self._rate_factor * 0.5)
+            pause = retry_after if retry_after is not None else 1.0
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            self._cond.notify_all()
+
+    def _apply_headers(self, headers: Dict[str, str]):
+        """Sync buckets with the provider's view from x-ratelimit-* headers."""
+        headers = {k.lower(): v for k, v in headers.items()}
+        applied = False
+        for bucket, kind in ((self._requests, "requests"), (self._tokens, "tokens")):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            try:
+                if limit is not None:
+                    bucket.resize(int(limit))
+                    applied = True
+                if remaining is not None:
+                    # The provider counts in-flight work we may not have reconciled yet
+                    bucket.level = min(bucket.level, float(remaining))
+                    applied = True
+            except ValueError:
+                continue
+            if remaining is not None and float(remaining) <= 0:
+                reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self._paused_until = max(self._paused_until, time.monotonic() + reset)
+        if applied:
+            self._stats["header_updates"] += 1
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            return {
+                "rpm_limit": int(self._requests.capacity),
+                "tpm_limit": int(self._tokens.capacity),
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self._in_flight,
+                "queued": len(self._waiters),
+                "rate_factor": round(self._rate_factor, 2),
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in self._stats.items()},
+            }
+
+
+rate_limiter = RateLimiter(
+    rpm=config.OPENAI_RPM,
+    tpm=config.OPENAI_TPM,
+    max_concurrency=config.OPENAI_MAX_CONCURRENCY,
+)
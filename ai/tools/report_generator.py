@@ -1,17 +1,59 @@
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
 import io
 import base64
+import html
+import math
+import threading
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_JUSTIFY, TA_LEFT, TA_CENTER
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Flowable
+from reportlab.graphics import renderPDF
+from reportlab.graphics.shapes import Drawing, Line, Rect, String
+from reportlab.graphics.charts.piecharts import Pie
 from reportlab.lib import colors
 from reportlab.lib.colors import HexColor
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # Non-GUI backend
+
+from config import config
+from tools.cache import LRUCache
+
+
+class CachedChart:
+    """A cached chart Drawing and the lock that serializes rendering it."""
+    
+    def __init__(self, drawing: Drawing):
+        self.drawing = drawing
+        self.lock = threading.Lock()
+
+
+class ChartFlowable(Flowable):
+    """
+    Places a shared, cached chart Drawing in one document.
+    Rendering is not read-only: platypus records the canvas on a flowable, and
+    renderPDF sets and then deletes `_parent` on the drawing and each node. So a
+    cached drawing is never added to a story directly. Each report gets its own
+    wrapper, and the renderPDF call holds the chart's lock (a fraction of a
+    millisecond for these drawings).
+    """
+    
+    def __init__(self, chart: CachedChart, title: Optional[str] = None):
+        super().__init__()
+        self.chart = chart
+        self.drawing = chart.drawing
+        self.title = title
+    
+    def wrap(self, availWidth, availHeight):
+        return self.drawing.width, self.drawing.height
+    
+    def draw(self):
+        with self.chart.lock:
+            renderPDF.draw(self.drawing, self.canv, 0, 0)
+        if self.title:
+            self.canv.setFont('Helvetica-Bold', 14)
+            self.canv.drawCentredString(self.drawing.width / 2, self.drawing.height - 25, self.title)
+
 
 class ReportGenerator:
     """Generate professional PDF reports for resume analysis"""
@@ -19,6 +61,8 @@ class ReportGenerator:
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
+        # Chart drawings keyed by their quantized inputs (see _create_*_chart)
+        self._charts = LRUCache(config.CHART_CACHE_MAX_ENTRIES)
     
     def _setup_custom_styles(self):
         """Setup custom paragraph styles"""
@@ -62,15 +106,23 @@ class ReportGenerator:
             spaceAfter=6
         ))
     
-    def _create_match_score_chart(self, match_score: float) -> str:
-        """Create a gauge chart for match score"""
-        fig, ax = plt.subplots(figsize=(6, 3))
-        
-        # Create gauge chart
-        categories = ['Poor', 'Fair', 'Good', 'Excellent']
-        colors_list = ['#ef4444', '#f59e0b', '#10b981', '#059669']
-        
-        # Determine which category the score falls into
+    def _chart(self, key: str, build: Callable[[], Drawing]) -> CachedChart:
+        """Cached chart for `key`, built on a miss (see ChartFlowable for how it is shared)."""
+        chart = self._charts.get(key, None)
+        if chart is None:
+            chart = CachedChart(build())
+            self._charts.set(key, chart, ttl=math.inf)
+        return chart
+    
+    def get_chart_stats(self) -> dict:
+        return self._charts.get_stats()
+    
+    def _create_match_score_chart(self, match_score: float) -> ChartFlowable:
+        """
+        Create a gauge chart for match score.
+        The bar is cached per score rounded to 0.5 (at most 201 gauges); the
+        category colour and the title use the exact score.
+        """
         if match_score < 50:
             color_idx = 0
         elif match_score < 70:
@@ -79,61 +131,78 @@ class ReportGenerator:
             color_idx = 2
         else:
             color_idx = 3
-        
-        # Create horizontal bar
-        ax.barh(0, match_score, height=0.5, color=colors_list[color_idx], alpha=0.8)
-        ax.set_xlim(0, 100)
-        ax.set_ylim(-0.5, 0.5)
-        ax.set_xlabel('Match Score (%)', fontsize=12, fontweight='bold')
-        ax.set_title(f'Overall Match Score: {match_score}%', fontsize=14, fontweight='bold')
-        ax.grid(axis='x', alpha=0.3)
-        
-        # Remove y-axis
-        ax.set_yticks([])
-        
-        # Add vertical lines for categories
-        ax.axvline(x=50, color='gray', linestyle='--', alpha=0.5)
-        ax.axvline(x=70, color='gray', linestyle='--', alpha=0.5)
-        ax.axvline(x=85, color='gray', linestyle='--', alpha=0.5)
-        
-        plt.tight_layout()
-        
-        # Save to bytes
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
-        plt.close()
-        
-        return img_buffer
+        quantized = round(max(0.0, min(float(match_score), 100.0)) * 2) / 2
+        chart = self._chart(f"gauge:{quantized}:{color_idx}",
+                            lambda: self._draw_match_score_gauge(quantized, color_idx))
+        return ChartFlowable(chart, title=f'Overall Match Score: {match_score}%')
     
-    def _create_skills_chart(self, matched_skills: List[str], missing_skills: List[str]) -> str:
-        """Create a pie chart for skills distribution"""
-        fig, ax = plt.subplots(figsize=(6, 4))
+    def _draw_match_score_gauge(self, score: float, color_idx: int) -> Drawing:
+        """Gauge bar, axis and category lines (vector drawing, no shared plotting state)"""
+        width, height = 5 * inch, 2.5 * inch
+        left, right, bar_y, bar_h = 20, width - 20, 70, 50
+        scale = (right - left) / 100
+        drawing = Drawing(width, height)
+        colors_list = ['#ef4444', '#f59e0b', '#10b981', '#059669']
         
+        # Grid and axis ticks every 20%
+        for tick in range(0, 101, 20):
+            x = left + tick * scale
+            drawing.add(Line(x, bar_y - 10, x, bar_y + bar_h + 10, strokeColor=colors.lightgrey, strokeWidth=0.5))
+            drawing.add(String(x, bar_y - 24, str(tick), fontName='Helvetica', fontSize=9, textAnchor='middle'))
+        
+        # Horizontal bar
+        drawing.add(Rect(left, bar_y, score * scale, bar_h, fillColor=HexColor(colors_list[color_idx]),
+                         fillOpacity=0.8, strokeColor=None))
+        
+        # Category boundaries
+        for boundary in (50, 70, 85):
+            x = left + boundary * scale
+            drawing.add(Line(x, bar_y - 10, x, bar_y + bar_h + 10, strokeColor=colors.grey,
+                             strokeWidth=1, strokeDashArray=[4, 3]))
+        
+        drawing.add(String(width / 2, bar_y - 45, 'Match Score (%)',
+                           fontName='Helvetica-Bold', fontSize=12, textAnchor='middle'))
+        return drawing
+    
+    def _create_skills_chart(self, matched_skills: List[str], missing_skills: List[str]) -> ChartFlowable:
+        """Create a pie chart for skills distribution, cached per (matched, missing) count pair"""
         matched_count = len(matched_skills)
         missing_count = len(missing_skills)
         
         if matched_count == 0 and missing_count == 0:
             matched_count = 1  # Avoid empty chart
         
-        sizes = [matched_count, missing_count]
-        labels = [f'Matched\n({matched_count})', f'Missing\n({missing_count})']
-        colors_list = ['#10b981', '#ef4444']
-        explode = (0.05, 0)
-        
-        ax.pie(sizes, explode=explode, labels=labels, colors=colors_list,
-               autopct='%1.1f%%', shadow=True, startangle=90)
-        ax.set_title('Skills Match Distribution', fontsize=14, fontweight='bold')
-        
-        plt.tight_layout()
-        
-        # Save to bytes
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
-        plt.close()
-        
-        return img_buffer
+        chart = self._chart(f"pie:{matched_count}:{missing_count}",
+                            lambda: self._draw_skills_pie(matched_count, missing_count))
+        return ChartFlowable(chart)
+    
+    def _draw_skills_pie(self, matched_count: int, missing_count: int) -> Drawing:
+        """Skills pie with its title (vector drawing, no shared plotting state)"""
+        width, height = 4 * inch, 3 * inch
+        drawing = Drawing(width, height)
+        
+        total = matched_count + missing_count
+        pie = Pie()
+        pie.width = pie.height = 150
+        pie.x = (width - pie.width) / 2
+        pie.y = 30
+        pie.data = [matched_count, missing_count]
+        pie.labels = [f'Matched ({matched_count}) {matched_count / total:.1%}',
+                      f'Missing ({missing_count}) {missing_count / total:.1%}']
+        pie.startAngle = 90
+        pie.direction = 'anticlockwise'
+        pie.sideLabels = True
+        pie.slices.strokeColor = colors.white
+        pie.slices.fontName = 'Helvetica'
+        pie.slices.fontSize = 9
+        pie.slices[0].fillColor = HexColor('#10b981')
+        pie.slices[1].fillColor = HexColor('#ef4444')
+        pie.slices[0].popout = 6
+        drawing.add(pie.draw())  # the widget's shapes, so the cached drawing is not re-laid-out per render
+        
+        drawing.add(String(width / 2, height - 20, 'Skills Match Distribution',
+                           fontName='Helvetica-Bold', fontSize=14, textAnchor='middle'))
+        return drawing
     
     def generate_pdf_report(self, analysis_data: Dict) -> io.BytesIO:
         """Generate a comprehensive PDF report"""
@@ -173,9 +242,7 @@ class ReportGenerator:
         
         # Match Score Chart
         try:
-            match_chart = self._create_match_score_chart(match_score)
-            img = Image(match_chart, width=5*inch, height=2.5*inch)
-            elements.append(img)
+            elements.append(self._create_match_score_chart(match_score))
             elements.append(Spacer(1, 20))
         except Exception as e:
             print(f"Error creating match score chart: {e}")
@@ -208,12 +275,10 @@ class ReportGenerator:
         
         # Skills Analysis Chart
         try:
-            skills_chart = self._create_skills_chart(
+            elements.append(self._create_skills_chart(
                 analysis_data.get('matched_skills', []),
                 analysis_data.get('missing_skills', [])
-            )
-            img = Image(skills_chart, width=4*inch, height=3*inch)
-            elements.append(img)
+            ))
             elements.append(Spacer(1, 20))
         except Exception as e:
             print(f"Error creating skills chart: {e}")
@@ -312,6 +377,159 @@ class ReportGenerator:
         buffer.seek(0)
         return buffer
     
+    def generate_report_page(self, result: Dict, analysis_id: str) -> str:
+        """HTML page served by /api/report/html/<analysis_id> (built from a stored result).
+        Text from the resume, the JD and the LLM is escaped before it is interpolated."""
+        
+        # Extract data from the stored result
+        match_score = result.get('match_score', 0)
+        matched_skills = [html.escape(str(skill)) for skill in result.get('matched_skills', [])]
+        missing_skills = [html.escape(str(skill)) for skill in result.get('missing_skills', [])]
+        ats_recommendations = [html.escape(str(rec)) for rec in result.get('ats_recommendations', [])]
+        career_advice = [html.escape(str(advice)) for advice in result.get('career_advice', [])]
+        job_title = html.escape(str(result.get('job_title', 'Position')))
+        
+        # Format skills as comma-separated strings
+        matched_skills_str = ", ".join(matched_skills[:15]) if matched_skills else "No matched skills identified"
+        missing_skills_str = ", ".join(missing_skills[:15]) if missing_skills else "No missing skills identified"
+        
+        # Generate HTML WITHOUT emojis
+        html_content = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Resume Analysis Report</title>
+    <style>
+        body {{
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            max-width: 900px;
+            margin: 40px auto;
+            padding: 20px;
+            background: #f5f5f5;
+            line-height: 1.6;
+        }}
+        .container {{
+            background: white;
+            padding: 40px;
+            border-radius: 10px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }}
+        h1 {{
+            color: #2563eb;
+            border-bottom: 3px solid #2563eb;
+            padding-bottom: 10px;
+            margin-bottom: 20px;
+        }}
+        h2 {{
+            color: #1e40af;
+            margin-top: 30px;
+            margin-bottom: 15px;
+        }}
+        .score {{
+            font-size: 48px;
+            font-weight: bold;
+            color: #10b981;
+            text-align: center;
+            margin: 30px 0;
+            padding: 20px;
+            background: #f0fdf4;
+            border-radius: 10px;
+        }}
+        .job-title {{
+            text-align: center;
+            font-size: 20px;
+            color: #6b7280;
+            margin-bottom: 20px;
+        }}
+        .section {{
+            margin: 25px 0;
+            padding: 20px;
+            background: #f9fafb;
+            border-radius: 8px;
+            border-left: 4px solid #3b82f6;
+        }}
+        .strengths {{
+            border-left-color: #10b981;
+            background: #f0fdf4;
+        }}
+        .weaknesses {{
+            border-left-color: #ef4444;
+            background: #fef2f2;
+        }}
+        .section h2 {{
+            margin-top: 0;
+        }}
+        ul {{
+            line-height: 1.8;
+            padding-left: 20px;
+        }}
+        ul li {{
+            margin-bottom: 8px;
+        }}
+        .footer {{
+            margin-top: 40px;
+            padding-top: 20px;
+            border-top: 2px solid #e5e7eb;
+            text-align: center;
+            color: #6b7280;
+            font-size: 14px;
+        }}
+        .conclusion {{
+            background: #eff6ff;
+            padding: 20px;
+            border-radius: 8px;
+            margin-top: 30px;
+        }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>Resume Analysis Report</h1>
+        
+        <div class="job-title">Position: <strong>{job_title}</strong></div>
+        
+        <div class="score">Match Score: {match_score:.1f}%</div>
+        
+        <div class="section strengths">
+            <h2>Matched Skills</h2>
+            <p>{matched_skills_str}</p>
+        </div>
+        
+        <div class="section weaknesses">
+            <h2>Skills to Develop</h2>
+            <p>{missing_skills_str}</p>
+        </div>
+        
+        <div class="section">
+            <h2>ATS Optimization Recommendations</h2>
+            <ul>
+                {''.join(f'<li>{rec}</li>' for rec in ats_recommendations) if ats_recommendations else '<li>No specific recommendations available</li>'}
+            </ul>
+        </div>
+        
+        <div class="section">
+            <h2>Career Development Recommendations</h2>
+            <ul>
+                {''.join(f'<li>{advice}</li>' for advice in career_advice) if career_advice else '<li>No specific advice available</li>'}
+            </ul>
+        </div>
+        
+        <div class="conclusion">
+            <h2>Conclusion</h2>
+            <p><strong>Development Opportunity!</strong> While there are notable gaps, this analysis provides a clear roadmap for skill development. Focus on acquiring the missing skills through courses, certifications, and practical projects.</p>
+        </div>
+        
+        <div class="footer">
+            <p>This report was generated by an AI-powered resume analysis system.</p>
+            <p>Recommendations should be considered as guidance and adapted to your specific situation.</p>
+            <p><small>Analysis ID: {html.escape(analysis_id[:8])}</small></p>
+        </div>
+    </div>
+</body>
+</html>"""
+        return html_content
+    
     def generate_html_report(self, analysis_data: Dict) -> str:
         """Generate a comprehensive HTML report"""
         
@@ -0,0 +1,108 @@
+"""
+Background report pre-rendering (REPORT_PRERENDER=true).
+Once /api/analyze has its response, the analysisId is queued here and a small
+pool of daemon workers renders the PDF and HTML report off the request path:
+1. The pool has REPORT_PRERENDER_WORKERS threads and the queue holds at most
+   REPORT_PRERENDER_QUEUE jobs; when it is full the job is dropped and the
+   report is rendered on first download instead
+2. Workers run below interactive analyses: while any analysis is running a
+   worker waits (up to REPORT_PRERENDER_MAX_DEFER seconds) before rendering
+3. Progress is tracked per analysis (queued, rendering, failed) for
+   /api/report/status/<analysis_id>; finished renders are recorded on the
+   stored result itself
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+QUEUED = "queued"
+RENDERING = "rendering"
+FAILED = "failed"
+
+
+class ReportPipeline:
+    _MAX_TRACKED = 1000  # failed jobs remembered for status lookups
+    _BUSY_POLL = 0.05  # seconds between checks for running analyses
+
+    def __init__(self, render: Callable[[str], None], workers: int, queue_size: int,
+                 is_busy: Callable[[], bool], max_defer: float):
+        self.render = render
+        self.workers = max(1, workers)
+        self.is_busy = is_busy
+        self.max_defer = max_defer
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._states: OrderedDict = OrderedDict()  # analysis_id -> QUEUED | RENDERING | FAILED
+        self._threads: List[threading.Thread] = []
+        self._stats = {"submitted": 0, "rendered": 0, "failed": 0, "dropped": 0, "deferred": 0}
+
+    def _start(self):
+        # Caller holds self._lock; threads start with the first job
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"report-prerender-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _set_state(self, analysis_id: str, state: Optional[str]):
+        # Caller holds self._lock
+        self._states.pop(analysis_id, None)
+        if state is not None:
+            self._states[analysis_id] = state
+            while len(self._states) > self._MAX_TRACKED:
+                self._states.popitem(last=False)
+
+    def submit(self, analysis_id: str) -> bool:
+        """Queue a render. Returns False if the queue is full (the report stays render-on-download)."""
+        with self._lock:
+            self._start()
+            try:
+                self._queue.put_nowait(analysis_id)
+            except queue.Full:
+                self._stats["dropped"] += 1
+                return False
+            self._set_state(analysis_id, QUEUED)
+            self._stats["submitted"] += 1
+        return True
+
+    def status(self, analysis_id: str) -> Optional[str]:
+        """QUEUED, RENDERING or FAILED while tracked; None once rendered or if never queued."""
+        with self._lock:
+            return self._states.get(analysis_id)
+
+    def _yield_to_analyses(self):
+        deadline = time.monotonic() + self.max_defer
+        if self.is_busy():
+            with self._lock:
+                self._stats["deferred"] += 1
+            while self.is_busy() and time.monotonic() < deadline:
+                time.sleep(self._BUSY_POLL)
+
+    def _worker(self):
+        while True:
+            analysis_id = self._queue.get()
+            try:
+                self._yield_to_analyses()
+                with self._lock:
+                    self._set_state(analysis_id, RENDERING)
+                self.render(analysis_id)
+                with self._lock:
+                    self._set_state(analysis_id, None)
+                    self._stats["rendered"] += 1
+            except Exception as e:
+                print(f"⚠️ Report pre-render failed for {analysis_id[:8]}: {e}")
+                with self._lock:
+                    self._set_state(analysis_id, FAILED)
+                    self._stats["failed"] += 1
+            finally:
+                self._queue.task_done()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["rendering"] = sum(1 for state in self._states.values() if state == RENDERING)
+        stats.update({"queued": self._queue.qsize(), "workers": self.workers, "max_defer": self.max_defer})
+        return stats
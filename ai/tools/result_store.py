@@ -0,0 +1,316 @@
+"""
+Storage for finished analyses, looked up by analysisId for /api/report/*.
+Selected by RESULT_STORE_BACKEND:
+1. memory - bounded LRU with TTL expiry and a byte budget (single process)
+2. redis  - shared by every worker and replica; falls back to memory while Redis is down
+3. disk   - one file per analysis under RESULT_STORE_DIR (shared volume), expired by mtime
+Heavy fields that reports never read (uploaded file, resume text) are stripped
+before storage. Fields added later (report digests) go through `update`, which
+merges into the stored result atomically and keeps its original expiry.
+"""
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import redis
+
+from config import config
+from tools import cache_codec
+from tools.cache import cache
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # Windows: updates are serialized within this process only
+    HAS_FCNTL = False
+
+# Not needed once the analysis is done; the uploaded file alone can be megabytes
+HEAVY_FIELDS = ("resume_file", "resume_text", "resume_sections", "html_report")
+
+
+def strip_result(result: dict) -> dict:
+    """Copy of a workflow result without HEAVY_FIELDS."""
+    return {k: v for k, v in result.items() if k not in HEAVY_FIELDS}
+
+
+def _encoded_size(result: dict) -> int:
+    return len(cache_codec.encode(result, compression="none"))
+
+
+class MemoryResultStore:
+    """LRU bounded by entry count and total encoded bytes, with per-entry TTL."""
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()  # id -> (expires_at, size, result)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "updates": 0, "hits": 0, "misses": 0, "evictions": 0, "expirations": 0,
+                       "rejected": 0}
+
+    def _drop(self, analysis_id: str):
+        _, size, _ = self._data.pop(analysis_id)
+        self._bytes -= size
+
+    def put(self, analysis_id: str, result: dict):
+        size = _encoded_size(result)
+        with self._lock:
+            if size > self.max_bytes:
+                self._stats["rejected"] += 1
+                return
+            if analysis_id in self._data:
+                self._drop(analysis_id)
+            self._data[analysis_id] = (time.monotonic() + self.ttl, size, result)
+            self._bytes += size
+            self._stats["puts"] += 1
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+                self._stats["evictions"] += 1
+
+    def update(self, analysis_id: str, fields: dict) -> Optional[dict]:
+        """Merge `fields` into a stored result without restarting its TTL. Returns the merged
+        result, or None if it is missing or expired."""
+        with self._lock:
+            item = self._data.get(analysis_id)
+            if item is None or item[0] <= time.monotonic():
+                return None
+            expires_at, size, result = item
+            merged = {**result, **fields}
+            new_size = _encoded_size(merged)
+            self._data[analysis_id] = (expires_at, new_size, merged)
+            self._bytes += new_size - size
+            self._stats["updates"] += 1
+            return merged
+
+    def get(self, analysis_id: str) -> Optional[dict]:
+        with self._lock:
+            item = self._data.get(analysis_id)
+            if item is None:
+                self._stats["misses"] += 1
+                return None
+            if item[0] <= time.monotonic():
+                self._drop(analysis_id)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._data.move_to_end(analysis_id)
+            self._stats["hits"] += 1
+            return item[2]
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({"entries": len(self._data), "bytes": self._bytes})
+        stats.update({"backend": self.backend, "max_entries": self.max_entries,
+                      "max_bytes": self.max_bytes, "ttl": self.ttl})
+        return stats
+
+
+class RedisResultStore:
+    """Results in Redis (visible to every replica); in-process memory store while Redis is down."""
+
+    backend = "redis"
+    _UPDATE_RETRIES = 5
+
+    def __init__(self, ttl: int, fallback: MemoryResultStore):
+        self.ttl = ttl
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "updates": 0, "update_conflicts": 0, "hits": 0, "misses": 0, "errors": 0}
+
+    @staticmethod
+    def _key(analysis_id: str) -> str:
+        return f"result:{analysis_id}"
+
+    def _count(self, key: str):
+        with self._lock:
+            self._stats[key] += 1
+
+    def put(self, analysis_id: str, result: dict):
+        if cache.enabled:
+            try:
+                cache.client.setex(self._key(analysis_id), self.ttl, cache_codec.encode(result))
+                self._count("puts")
+                return
+            except Exception as e:
+                self._count("errors")
+                cache._handle_error("result store put", e)
+        self.fallback.put(analysis_id, result)
+
+    def update(self, analysis_id: str, fields: dict) -> Optional[dict]:
+        """Compare-and-set merge (WATCH/MULTI, retried on conflict); SET KEEPTTL keeps the expiry."""
+        if cache.enabled:
+            key = self._key(analysis_id)
+            try:
+                with cache.client.pipeline() as pipe:
+                    for _ in range(self._UPDATE_RETRIES):
+                        try:
+                            pipe.watch(key)
+                            raw = pipe.get(key)
+                            if not raw:
+                                pipe.reset()
+                                break  # stored during an outage, or expired
+                            merged = {**cache_codec.decode(raw), **fields}
+                            pipe.multi()
+                            pipe.set(key, cache_codec.encode(merged), keepttl=True)
+                            pipe.execute()
+                            self._count("updates")
+                            return merged
+                        except redis.WatchError:
+                            self._count("update_conflicts")
+                    else:
+                        return None  # still contended after every retry; the stored result stands
+            except Exception as e:
+                self._count("errors")
+                cache._handle_error("result store update", e)
+        return self.fallback.update(analysis_id, fields)
+
+    def get(self, analysis_id: str) -> Optional[dict]:
+        if cache.enabled:
+            try:
+                raw = cache.client.get(self._key(analysis_id))
+                if raw:
+                    self._count("hits")
+                    return cache_codec.decode(raw)
+            except Exception as e:
+                self._count("errors")
+                cache._handle_error("result store get", e)
+        # Stored during an outage, or Redis is still down
+        result = self.fallback.get(analysis_id)
+        self._count("hits" if result is not None else "misses")
+        return result
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({"backend": self.backend, "ttl": self.ttl, "fallback": self.fallback.get_stats()})
+        return stats
+
+
+class DiskResultStore:
+    """One encoded file per analysis; atomic writes, expiry by file age."""
+
+    backend = "disk"
+    _SWEEP_EVERY = 100  # puts between sweeps of expired files
+
+    def __init__(self, directory: str, ttl: float):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._stats = {"puts": 0, "updates": 0, "hits": 0, "misses": 0, "expirations": 0}
+        self._update_lock = threading.Lock()
+
+    def _path(self, analysis_id: str) -> str:
+        # analysisIds are UUIDs; anything else could escape the directory
+        if not analysis_id.replace("-", "").isalnum():
+            raise ValueError(f"invalid analysis id: {analysis_id!r}")
+        return os.path.join(self.directory, f"{analysis_id}.bin")
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+            return self._stats[key]
+
+    def put(self, analysis_id: str, result: dict):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(cache_codec.encode(result))
+            os.replace(tmp, self._path(analysis_id))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        if self._count("puts") % self._SWEEP_EVERY == 0:
+            self.sweep()
+
+    def update(self, analysis_id: str, fields: dict) -> Optional[dict]:
+        """Read-merge-replace under a lock (an flock on the directory, for other processes);
+        the file keeps its mtime, so its expiry is unchanged."""
+        try:
+            path = self._path(analysis_id)
+        except ValueError:
+            return None
+        with self._update_lock, open(os.path.join(self.directory, ".update.lock"), "a") as lock_file:
+            if HAS_FCNTL:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                stat = os.stat(path)
+                if time.time() - stat.st_mtime > self.ttl:
+                    return None
+                with open(path, "rb") as f:
+                    merged = {**cache_codec.decode(f.read()), **fields}
+            except (OSError, ValueError):
+                return None
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(cache_codec.encode(merged))
+                os.utime(tmp, (stat.st_atime, stat.st_mtime))
+                os.replace(tmp, path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
+        self._count("updates")
+        return merged
+
+    def get(self, analysis_id: str) -> Optional[dict]:
+        try:
+            path = self._path(analysis_id)
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.unlink(path)
+                self._count("expirations")
+                self._count("misses")
+                return None
+            with open(path, "rb") as f:
+                result = cache_codec.decode(f.read())
+        except (OSError, ValueError):
+            self._count("misses")
+            return None
+        self._count("hits")
+        return result
+
+    def sweep(self) -> int:
+        """Delete expired result files (and stale temp files). Returns the number removed."""
+        removed = 0
+        cutoff = time.time() - self.ttl
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.is_file() and entry.name != ".update.lock" and entry.stat().st_mtime < cutoff:
+                    os.unlink(entry.path)
+                    removed += 1
+            except OSError:
+                pass
+        if removed:
+            self._count("expirations", removed)
+        return removed
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({"backend": self.backend, "directory": self.directory, "ttl": self.ttl})
+        return stats
+
+
+def create_result_store():
+    backend = config.RESULT_STORE_BACKEND
+    memory = MemoryResultStore(config.RESULT_STORE_MAX_ENTRIES, config.RESULT_STORE_MAX_BYTES, config.RESULT_STORE_TTL)
+    if backend == "redis":
+        return RedisResultStore(config.RESULT_STORE_TTL, fallback=memory)
+    if backend == "disk":
+        return DiskResultStore(config.RESULT_STORE_DIR, config.RESULT_STORE_TTL)
+    if backend != "memory":
+        print(f"⚠️ Unknown RESULT_STORE_BACKEND '{backend}', using memory")
+    return memory
+
+
+result_store = create_result_store()
@@ -0,0 +1,186 @@
+"""
+Local job title / seniority classifier.
+Replaces the job parser's title LLM call on the critical path:
+1. Compiled regexes find title-like lines, seniority, position type and experience
+2. A literal match against the title taxonomy gives confidence 1.0
+3. Otherwise nearest-centroid over taxonomy embeddings (shared sentence transformer)
+   gives a cosine-similarity confidence; the caller falls back to the LLM below
+   Config.TITLE_CONFIDENCE_THRESHOLD
+"""
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from tools.matching_tools import matching_tools
+
+# Canonical title -> phrasings; phrasings are both literal patterns and centroid examples
+TITLE_TAXONOMY: Dict[str, List[str]] = {
+    "Software Engineer": ["software engineer", "software developer", "software development engineer",
+                          "sde", "application developer", "programmer"],
+    "Backend Engineer": ["backend engineer", "back-end engineer", "backend developer", "server-side engineer",
+                         "api engineer"],
+    "Frontend Engineer": ["frontend engineer", "front-end engineer", "frontend developer", "ui engineer",
+                          "web developer"],
+    "Full Stack Engineer": ["full stack engineer", "full-stack engineer", "full stack developer",
+                            "full-stack developer"],
+    "Mobile Engineer": ["mobile engineer", "mobile developer", "mobile app developer"],
+    "iOS Engineer": ["ios engineer", "ios developer", "swift developer"],
+    "Android Engineer": ["android engineer", "android developer", "kotlin developer"],
+    "Machine Learning Engineer": ["machine learning engineer", "ml engineer", "ai engineer",
+                                  "deep learning engineer", "mlops engineer"],
+    "Data Scientist": ["data scientist", "applied scientist", "research scientist", "machine learning scientist"],
+    "Data Engineer": ["data engineer", "big data engineer", "etl developer", "analytics engineer"],
+    "Data Analyst": ["data analyst", "business intelligence analyst", "bi developer"],
+    "DevOps Engineer": ["devops engineer", "build and release engineer", "ci/cd engineer"],
+    "Site Reliability Engineer": ["site reliability engineer", "sre", "production engineer"],
+    "Platform Engineer": ["platform engineer", "infrastructure engineer", "developer platform engineer"],
+    "Cloud Engineer": ["cloud engineer", "aws engineer", "cloud infrastructure engineer", "cloud architect"],
+    "Security Engineer": ["security engineer", "application security engineer", "cybersecurity engineer"],
+    "QA Engineer": ["qa engineer", "quality assurance engineer", "test engineer", "sdet",
+                    "test automation engineer"],
+    "Embedded Software Engineer": ["embedded software engineer", "embedded engineer", "firmware engineer"],
+    "Engineering Manager": ["engineering manager", "software engineering manager", "manager, software engineering"],
+    "Solutions Architect": ["solutions architect", "software architect", "technical architect"],
+}
+
+_SENIORITY = [
+    (re.compile(r'\bprincipal\b', re.IGNORECASE), "Principal"),
+    (re.compile(r'\bstaff\b', re.IGNORECASE), "Staff"),
+    (re.compile(r'\b(?:senior|sr\.?)(?=\s)', re.IGNORECASE), "Senior"),
+    (re.compile(r'\blead\b', re.IGNORECASE), "Lead"),
+    (re.compile(r'\b(?:junior|jr\.?)(?=\s)|\bentry[- ]level\b', re.IGNORECASE), "Junior"),
+]
+
+_POSITION_TYPES = [
+    (re.compile(r'\bintern(?:ship)?\b', re.IGNORECASE), "Internship"),
+    (re.compile(r'\bcontract(?:or)?\b', re.IGNORECASE), "Contract"),
+    (re.compile(r'\bpart[- ]?time\b', re.IGNORECASE), "Part-time"),
+    (re.compile(r'\bfull[- ]?time\b', re.IGNORECASE), "Full-time"),
+    (re.compile(r'\bfreelance\b', re.IGNORECASE), "Freelance"),
+]
+
+_EXPERIENCE = [
+    re.compile(r'(\d+)\+?\s*(?:years?|yrs?)(?:\s+of)?\s+(?:experience|exp)', re.IGNORECASE),
+    re.compile(r'(?:minimum|at least)\s+(\d+)\s*(?:years?|yrs?)', re.IGNORECASE),
+]
+_ENTRY_LEVEL = re.compile(r'recent graduate|entry.level|new grad', re.IGNORECASE)
+
+_TITLE_FIELD = re.compile(r'^\s*(?:job\s+)?(?:title|role|position)\s*[:\-]\s*(.+)$', re.IGNORECASE | re.MULTILINE)
+_HIRING = re.compile(r'(?:hiring|looking for|seeking|join us as)\s+(?:an?\s+)?(.{3,80}?)(?:\s+to\b|\s+who\b|[.,;\n]|$)',
+                     re.IGNORECASE)
+_ROLE_NOUN = re.compile(r'\b(?:engineer|developer|scientist|analyst|architect|manager|programmer|dev|sre|sde|sdet)s?\b',
+                        re.IGNORECASE)
+
+_PHRASE_TO_TITLE = {p: title for title, phrases in TITLE_TAXONOMY.items() for p in phrases}
+_LITERAL = re.compile(
+    r'(?<![\w-])(' + '|'.join(re.escape(p) for p in sorted(_PHRASE_TO_TITLE, key=len, reverse=True)) + r')(?![\w-])',
+    re.IGNORECASE,
+)
+
+
+def detect_position_type(text: str) -> str:
+    for pattern, position_type in _POSITION_TYPES:
+        if pattern.search(text):
+            return position_type
+    # Default to Full-time for most job postings
+    return "Full-time"
+
+
+def detect_experience(text: str) -> str:
+    for pattern in _EXPERIENCE:
+        match = pattern.search(text)
+        if match:
+            return f"{match.group(1)}+ years"
+    if _ENTRY_LEVEL.search(text):
+        return "Entry Level / New Grad"
+    return "Not specified"
+
+
+def detect_seniority(text: str) -> Optional[str]:
+    for pattern, level in _SENIORITY:
+        if pattern.search(text):
+            return level
+    return None
+
+
+def _candidate_lines(text: str, max_lines: int = 10) -> List[str]:
+    """Short title-like spans: explicit title fields, 'hiring a ...' phrases, then early role lines."""
+    candidates = [m.group(1).strip() for m in _TITLE_FIELD.finditer(text)]
+    candidates += [m.group(1).strip() for m in _HIRING.finditer(text[:3000]) if _ROLE_NOUN.search(m.group(1))]
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    for line in lines[:max_lines]:
+        if len(line.split()) <= 12 and _ROLE_NOUN.search(line):
+            candidates.append(line)
+
+    seen = set()
+    unique = []
+    for candidate in candidates:
+        key = candidate.lower()
+        if key not in seen:
+            seen.add(key)
+            unique.append(candidate[:120])
+    return unique[:8]
+
+
+class TitleClassifier:
+    """Nearest-centroid title classifier over TITLE_TAXONOMY."""
+
+    def __init__(self):
+        self._titles = list(TITLE_TAXONOMY)
+        self._centroids = None
+        self._lock = threading.Lock()
+
+    def _get_centroids(self):
+        # Built lazily so importing the job parser does not encode the taxonomy
+        if self._centroids is None:
+            with self._lock:
+                if self._centroids is None:
+                    centroids = []
+                    for title in self._titles:
+                        embeddings = matching_tools.model.encode(TITLE_TAXONOMY[title], normalize_embeddings=True)
+                        centroid = embeddings.mean(axis=0)
+                        centroids.append(centroid / np.linalg.norm(centroid))
+                    self._centroids = np.stack(centroids)
+        return self._centroids
+
+    def classify(self, job_description: str) -> Dict:
+        """Return title, position type, experience and a 0-1 title confidence."""
+        text = job_description[:5000]
+        result = {
+            "title": None,
+            "position_type": detect_position_type(text),
+            "experience": detect_experience(text),
+            "confidence": 0.0,
+            "method": None,
+        }
+
+        candidates = _candidate_lines(text)
+        if not candidates:
+            return result
+
+        # 1. Literal taxonomy hit in a title-like line
+        for line in candidates:
+            match = _LITERAL.search(line)
+            if match:
+                result.update(title=_PHRASE_TO_TITLE[match.group(1).lower()], confidence=1.0,
+                              method="literal", _line=line)
+                break
+
+        # 2. Nearest centroid
+        if result["title"] is None:
+            embeddings = matching_tools.model.encode(candidates, normalize_embeddings=True)
+            scores = embeddings @ self._get_centroids().T
+            line_idx, title_idx = np.unravel_index(int(np.argmax(scores)), scores.shape)
+            result.update(title=self._titles[title_idx], confidence=round(float(scores[line_idx, title_idx]), 3),
+                          method="embedding", _line=candidates[line_idx])
+
+        line = result.pop("_line")
+        seniority = detect_seniority(line)
+        if seniority and not result["title"].startswith(seniority):
+            result["title"] = f"{seniority} {result['title']}"
+        return result
+
+
+title_classifier = TitleClassifier()
@@ -0,0 +1,178 @@
+"""
+Token, cost and latency accounting for LLM calls.
+1. A per-request ledger lives in a context variable; app.py starts one per
+   analysis and returns its summary in the response
+2. Every LLM call (and every agent-level cache hit that replaced one) is
+   recorded with prompt/completion tokens, latency and cache status
+3. The same records are aggregated per agent in process-level counters,
+   exposed through /api/admin/llm-stats
+4. A request abandoned by hedging is recorded when it is abandoned, from the
+   token estimate, and settled to its actual usage if it finishes later
+Worker threads only see the ledger if they run in a copied context
+(contextvars.copy_context), as graph/workflow.py does.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from config import config
+
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    """USD cost at Config.LLM_PRICE_INPUT_PER_1M / LLM_PRICE_OUTPUT_PER_1M."""
+    return (prompt_tokens * config.LLM_PRICE_INPUT_PER_1M
+            + completion_tokens * config.LLM_PRICE_OUTPUT_PER_1M) / 1_000_000
+
+
+class UsageLedger:
+    """LLM calls made on behalf of one analysis request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.entries: List[dict] = []
+
+    def add(self, entry: dict):
+        with self._lock:
+            entry["at_ms"] = round((time.monotonic() - self._start) * 1000, 1)
+            self.entries.append(entry)
+
+    def update(self, entry: dict, fields: dict):
+        with self._lock:
+            entry.update(fields)
+
+    def summary(self, include_calls: bool = False) -> dict:
+        with self._lock:
+            entries = list(self.entries)
+
+        agents: Dict[str, dict] = {}
+        for e in entries:
+            a = agents.setdefault(e["agent"], {
+                "calls": 0, "cache_hits": 0, "errors": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "latency_ms": 0.0, "cost_usd": 0.0,
+            })
+            a["calls"] += 1
+            a["cache_hits"] += e["cache"] == CACHE_HIT
+            a["errors"] += e.get("error") is not None
+            a["prompt_tokens"] += e["prompt_tokens"]
+            a["completion_tokens"] += e["completion_tokens"]
+            a["latency_ms"] += e["latency_ms"]
+            a["cost_usd"] += e["cost_usd"]
+        for a in agents.values():
+            a["latency_ms"] = round(a["latency_ms"], 1)
+            a["cost_usd"] = round(a["cost_usd"], 6)
+
+        summary = {
+            "llm_calls": sum(1 for e in entries if e["cache"] == CACHE_MISS),
+            "cache_hits": sum(1 for e in entries if e["cache"] == CACHE_HIT),
+            "prompt_tokens": sum(e["prompt_tokens"] for e in entries),
+            "completion_tokens": sum(e["completion_tokens"] for e in entries),
+            "llm_latency_ms": round(sum(e["latency_ms"] for e in entries if e["cache"] == CACHE_MISS), 1),
+            "cost_usd": round(sum(e["cost_usd"] for e in entries), 6),
+            "agents": agents,
+        }
+        if include_calls:
+            summary["calls"] = entries
+        return summary
+
+
+class _AgentCounters:
+    """Process-lifetime totals per agent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._agents: Dict[str, dict] = {}
+
+    def add(self, entry: dict):
+        with self._lock:
+            a = self._agents.setdefault(entry["agent"], {
+                "calls": 0, "cache_hits": 0, "errors": 0, "hedged": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "latency_ms_total": 0.0, "cost_usd": 0.0,
+            })
+            a["calls"] += 1
+            a["cache_hits"] += entry["cache"] == CACHE_HIT
+            a["errors"] += entry.get("error") is not None
+            a["hedged"] += bool(entry.get("hedged"))
+            a["prompt_tokens"] += entry["prompt_tokens"]
+            a["completion_tokens"] += entry["completion_tokens"]
+            if entry["cache"] == CACHE_MISS:
+                a["latency_ms_total"] += entry["latency_ms"]
+            a["cost_usd"] += entry["cost_usd"]
+
+    def adjust(self, agent: str, prompt_tokens: int, completion_tokens: int, cost_usd: float):
+        """Apply a correction to an entry already added."""
+        with self._lock:
+            a = self._agents.get(agent)
+            if a is not None:
+                a["prompt_tokens"] += prompt_tokens
+                a["completion_tokens"] += completion_tokens
+                a["cost_usd"] += cost_usd
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            agents = {name: dict(a) for name, a in self._agents.items()}
+        for a in agents.values():
+            llm_calls = a["calls"] - a["cache_hits"]
+            a["avg_latency_ms"] = round(a["latency_ms_total"] / llm_calls, 1) if llm_calls else 0.0
+            a["cache_hit_rate"] = round(a["cache_hits"] / a["calls"], 3) if a["calls"] else 0.0
+            a["latency_ms_total"] = round(a["latency_ms_total"], 1)
+            a["cost_usd"] = round(a["cost_usd"], 6)
+        return agents
+
+
+_current_ledger: ContextVar[Optional[UsageLedger]] = ContextVar("usage_ledger", default=None)
+agent_counters = _AgentCounters()
+
+
+def start_ledger():
+    """Begin a ledger for the current request. Returns (ledger, token for end_ledger)."""
+    ledger = UsageLedger()
+    return ledger, _current_ledger.set(ledger)
+
+
+def end_ledger(token):
+    _current_ledger.reset(token)
+
+
+def current_ledger() -> Optional[UsageLedger]:
+    return _current_ledger.get()
+
+
+def record_usage(agent: str, cache: str = CACHE_MISS, prompt_tokens: int = 0, completion_tokens: int = 0,
+                 latency_ms: float = 0.0, hedged: bool = False, error: Optional[str] = None,
+                 hedge_loser: bool = False) -> dict:
+    """Record one LLM call (or a cache hit that replaced one). Returns the entry,
+    for settle_usage."""
+    entry = {
+        "agent": agent,
+        "cache": cache,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "latency_ms": round(latency_ms, 1),
+        "cost_usd": round(estimate_cost(prompt_tokens, completion_tokens), 6),
+        "hedged": hedged,
+        "hedge_loser": hedge_loser,
+        "error": error,
+    }
+    agent_counters.add(entry)
+    ledger = _current_ledger.get()
+    if ledger is not None:
+        ledger.add(entry)
+    return entry
+
+
+def settle_usage(entry: dict, ledger: Optional[UsageLedger], prompt_tokens: int, completion_tokens: int):
+    """Replace an estimated entry's tokens and cost with the actual usage. `ledger` is the
+    one current when the entry was recorded (this may run in another thread, or later)."""
+    cost = round(estimate_cost(prompt_tokens, completion_tokens), 6)
+    fields = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "cost_usd": cost}
+    agent_counters.adjust(entry["agent"], prompt_tokens - entry["prompt_tokens"],
+                          completion_tokens - entry["completion_tokens"], cost - entry["cost_usd"])
+    if ledger is not None:
+        ledger.update(entry, fields)
+    else:
+        entry.update(fields)
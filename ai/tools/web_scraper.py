@@ -8,6 +8,11 @@ from bs4 import BeautifulSoup
 from typing import Dict, List
 from urllib.parse import urlparse, quote_plus
 
+from tools.circuit_breaker import get_breaker
+
+# Opens after repeated DuckDuckGo failures so searches fail fast during outages
+duckduckgo_breaker = get_breaker("duckduckgo", failure_types=(requests.RequestException,))
+
 
 class WebScraper:
     """Tool for scraping job postings and company information"""
@@ -100,7 +105,7 @@ class WebScraper:
         """Perform DuckDuckGo search."""
         try:
             url = f"https://html.duckduckgo.com/html/?q={quote_plus(query)}"
-            response = self.session.get(url, timeout=10)
+            response = duckduckgo_breaker.call(self._fetch_search_page, url)
             soup = BeautifulSoup(response.text, 'html.parser')
             
             results = []
@@ -119,6 +124,11 @@ class WebScraper:
         except Exception as e:
             return [{"error": str(e)}]
     
+    def _fetch_search_page(self, url: str) -> requests.Response:
+        response = self.session.get(url, timeout=10)
+        response.raise_for_status()
+        return response
+    
     def extract_tech_from_url(self, url: str, job_keywords: List[str] = None) -> List[str]:
         """Scrape URL and extract mentioned technologies/keywords relevant to the job."""
         try:
@@ -0,0 +1,140 @@
+"""
+Cache warmer: precompute what the workflow caches for a set of active job
+descriptions, so the first candidate for each open role gets a warm-path response.
+For each JD:
+1. Skill set and parsed fields (title, position type, experience), under the
+   job parser's own cache keys; JSONL records that already carry `title` are
+   stored with warm_cache_for_jd without an LLM call
+2. JD embedding used by the matcher
+3. Company intel (skip with --no-company)
+LLM calls run at background priority, so live analyses are served first.
+
+Usage:
+    python warmup.py jds/                   # directory of .txt/.md files, one JD each
+    python warmup.py active_jobs.jsonl      # one {"job_description", "company_name", "title", ...} per line
+    python warmup.py active_jobs.jsonl --workers 8 --no-company
+
+Set CACHE_WARMUP_SOURCE to run the same warmup in the background when app.py starts.
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+from config import config
+
+JD_SUFFIXES = {".txt", ".md"}
+
+
+def load_jobs(source: str) -> List[dict]:
+    """Read job descriptions from a directory of text files or a JSONL file."""
+    path = Path(source)
+    jobs = []
+    if path.is_dir():
+        for file in sorted(path.iterdir()):
+            if file.suffix.lower() in JD_SUFFIXES:
+                jobs.append({"job_description": file.read_text(encoding="utf-8"), "source": file.name})
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                jd = record.get("job_description") or record.get("jobDescriptionText") or record.get("text")
+                if not jd:
+                    print(f"⚠️ {path.name}:{line_no} has no job description, skipped")
+                    continue
+                jobs.append({
+                    "job_description": jd,
+                    "company_name": record.get("company_name") or record.get("companyName"),
+                    "title": record.get("title"),
+                    "position_type": record.get("position_type"),
+                    "experience": record.get("experience"),
+                    "source": f"{path.name}:{line_no}",
+                })
+    return jobs
+
+
+def warm_job(job: dict, include_company: bool = True) -> dict:
+    """Run the cache-populating steps of the workflow for one JD."""
+    from graph.state import create_initial_state
+    from agents.job_parser import job_parser_agent
+    from agents.investigator import investigator_agent
+    from tools.cache import warm_cache_for_jd
+    from tools.llm_client import llm_priority
+    from tools.matching_tools import matching_tools
+    from tools.rate_limiter import PRIORITY_BACKGROUND
+
+    jd = job["job_description"]
+    if job.get("title"):
+        warm_cache_for_jd(jd, {
+            "title": job["title"],
+            "position_type": job.get("position_type"),
+            "experience": job.get("experience"),
+        })
+
+    state = create_initial_state(b"", "", jd, company_name=job.get("company_name"))
+    with llm_priority(PRIORITY_BACKGROUND):
+        job_parser_agent(state)
+        matching_tools.embed(jd)
+        if include_company:
+            investigator_agent(state)
+
+    return {
+        "source": job.get("source"),
+        "title": state.get("job_title"),
+        "company": state.get("company_intel", {}).get("company_name"),
+        "error": state.get("error"),
+    }
+
+
+def warm_from_source(source: str, workers: int = None, include_company: bool = True) -> dict:
+    """Warm every JD in `source` with a bounded worker pool. Returns a summary."""
+    jobs = load_jobs(source)
+    workers = max(1, workers or config.CACHE_WARMUP_WORKERS)
+    print(f"🔥 Warming cache for {len(jobs)} job descriptions ({workers} workers)")
+    start = time.time()
+    failed = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warmup") as pool:
+        for result in pool.map(lambda job: _warm_safely(job, include_company), jobs):
+            if result.get("error"):
+                failed += 1
+                print(f"   ❌ {result['source']}: {result['error']}")
+            else:
+                print(f"   ✅ {result['source']}: {result['title']} @ {result['company'] or '-'}")
+    summary = {"jobs": len(jobs), "failed": failed, "seconds": round(time.time() - start, 2)}
+    print(f"🔥 Cache warmup done: {summary}")
+    return summary
+
+
+def _warm_safely(job: dict, include_company: bool) -> dict:
+    try:
+        return warm_job(job, include_company)
+    except Exception as e:
+        return {"source": job.get("source"), "error": str(e)}
+
+
+def start_background_warmup(source: str) -> threading.Thread:
+    """Startup hook: warm from `source` without delaying the service."""
+    def run():
+        try:
+            warm_from_source(source)
+        except Exception as e:
+            print(f"⚠️ Cache warmup failed: {e}")
+
+    thread = threading.Thread(target=run, name="cache-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute caches for active job descriptions")
+    parser.add_argument("source", help="Directory of .txt/.md job descriptions, or a JSONL file")
+    parser.add_argument("--workers", type=int, default=config.CACHE_WARMUP_WORKERS, help="Concurrent JDs")
+    parser.add_argument("--no-company", action="store_true", help="Skip company research")
+
+    args = parser.parse_args()
+    warm_from_source(args.source, workers=args.workers, include_company=not args.no_company)
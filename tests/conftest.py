@@ -1,5 +1,8 @@
 """
 AutoE2E Test Configuration for Resume Analyzer
+
+To run without the live OpenAI API, start the stack with the offline fake LLM:
+    USE_FAKE_LLM=true docker compose up
 """
 import pytest
 import requests
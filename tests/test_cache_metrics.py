@@ -0,0 +1,65 @@
+"""
+Cache Metrics Tests - Per-namespace hit/miss accounting (no live stack)
+Run: pytest tests/test_cache_metrics.py -v
+"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai"))
+
+from tools import cache as cache_module
+
+
+JD_KEY = "jd_parsed:v1:cached"
+COMPANY_KEY = "company:v1:uncached"
+
+
+def prefetch_then_get(cache):
+    found = cache.mget([JD_KEY, COMPANY_KEY], prefetch=True)
+    assert list(found) == [JD_KEY]
+    assert cache.get(JD_KEY) == {"title": "Engineer"}
+    assert cache.get(COMPANY_KEY) is None
+    return cache.get_stats(), cache.namespaces.get_stats()
+
+
+def assert_counted_once(stats, namespaces):
+    jd, company = namespaces["jd_parsed"], namespaces["company"]
+    assert jd["hits"] == 1 and jd["misses"] == 0
+    assert jd["prefetch_hits"] == 1
+    assert company["hits"] == 0 and company["misses"] == 1
+    assert company["prefetch_misses"] == 1
+    assert stats["l1"]["hits"] + stats["l1"]["misses"] == 2
+    assert stats["hit_rate"] == 0.5
+
+
+class TestPrefetchAccounting:
+    """A prefetched key is counted once, by the agent's own get()."""
+
+    def test_memory_cache(self, monkeypatch):
+        """Without Redis, prefetch and get should not double-count L1 lookups."""
+        def unavailable(**kwargs):
+            raise cache_module.redis.ConnectionError("no Redis here")
+
+        monkeypatch.setattr(cache_module.redis, "Redis", unavailable)
+        cache = cache_module.RedisCache()
+        assert not cache.enabled
+        cache.set(JD_KEY, {"title": "Engineer"}, ttl=60)
+        assert_counted_once(*prefetch_then_get(cache))
+
+    def test_redis_cache(self, monkeypatch):
+        """With Redis, a prefetch promotes into L1 and the get counts one hit."""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        monkeypatch.setattr(cache_module.redis, "Redis",
+                            lambda connection_pool=None, **kwargs: fakeredis.FakeRedis(server=server))
+        monkeypatch.setattr(cache_module.config, "CACHE_BLOOM_ENABLED", False)
+        cache = cache_module.RedisCache()
+        assert cache.enabled
+        cache.set(JD_KEY, {"title": "Engineer"}, ttl=60)
+        cache.local.delete(JD_KEY)  # only in Redis, as for another replica's write
+        stats, namespaces = prefetch_then_get(cache)
+        assert namespaces["jd_parsed"]["l2_hits"] == 0 and namespaces["jd_parsed"]["l1_hits"] == 1
+        assert stats["l2"]["prefetch_hits"] == 1 and stats["l2"]["hits"] == 0
+        assert stats["l2"]["prefetch_misses"] == 1 and stats["l2"]["misses"] == 1
+        assert_counted_once(stats, namespaces)
@@ -0,0 +1,33 @@
+"""
+Company Name Tests - Normalization used for company-intel cache keys
+Run: pytest tests/test_company_names.py -v
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai"))
+
+from tools.company_names import COMPANY_ALIASES, normalize_company_name
+
+
+class TestNormalizeCompanyName:
+    """Spellings of one company share a key; different companies do not."""
+
+    def test_suffix_variants_share_a_name(self):
+        """Case, punctuation and legal suffixes should not matter."""
+        assert {normalize_company_name(n) for n in ["Acme Inc.", "ACME, Inc", "acme", "The Acme Corp"]} == {"acme"}
+
+    def test_ampersand_before_suffix_is_dropped(self):
+        """Removing "Co" should not leave a trailing "&"."""
+        assert normalize_company_name("Acme & Co") == "acme"
+        assert normalize_company_name("Acme & Co.") == "acme"
+        assert normalize_company_name("Johnson & Johnson") == "johnson & johnson"
+
+    def test_single_letter_names_are_not_aliased(self):
+        """A company actually named "X" should not become another company."""
+        assert normalize_company_name("X") == "x"
+        assert not [alias for alias in COMPANY_ALIASES if len(alias) == 1]
+
+    def test_known_alias_resolves(self):
+        """Aliases should map to the canonical name."""
+        assert normalize_company_name("Meta Platforms, Inc.") == "meta"
@@ -115,6 +115,33 @@ class TestConcurrency:
         # 50 concurrent should have at least 90% success
         assert success_rate >= 90, f"Success rate {success_rate}% is below 90%"
 
+    def test_concurrent_pdf_downloads(self, ai_service_url, sample_resume, sample_job_description):
+        """Reports for different analyses should render correctly in parallel."""
+        extra_skills = ["Go", "Rust", "Kafka", "Terraform", "GraphQL", "Spark", "Redis", "Scala"]
+        analysis_ids = []
+
+        for skill in extra_skills:
+            files = {"file": ("resume.pdf", sample_resume, "application/pdf")}
+            data = {"jobDescriptionText": f"{sample_job_description}\n    - Experience with {skill}"}
+            response = requests.post(f"{ai_service_url}/api/analyze", files=files, data=data, timeout=120)
+            assert response.status_code == 200
+            if response.json().get("hasReports"):
+                analysis_ids.append(response.json()["analysisId"])
+
+        assert analysis_ids, "hasReports was false for every analysis; enable reports (LAZY_REPORTS or SKIP_REPORTS=false)"
+
+        def download(analysis_id):
+            response = requests.get(f"{ai_service_url}/api/report/pdf/{analysis_id}", timeout=60)
+            return response.status_code, response.content[:5]
+
+        # Every analysis twice: distinct reports render concurrently, duplicates share a render
+        with ThreadPoolExecutor(max_workers=len(analysis_ids) * 2) as executor:
+            results = list(executor.map(download, analysis_ids * 2))
+
+        for status, head in results:
+            assert status == 200
+            assert head == b"%PDF-"
+
 
 class TestResilience:
     """Resilience and error handling tests."""
@@ -0,0 +1,96 @@
+"""
+Report Rendering Tests - In-process PDF rendering across threads (no live stack)
+Run: pytest tests/test_report_rendering.py -v
+"""
+import os
+import sys
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+
+pytest.importorskip("reportlab")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai"))
+
+from tools.report_generator import ReportGenerator
+import benchmark
+
+
+ANALYSIS = {
+    "match_score": 72.5,
+    "job_title": "Senior Software Engineer",
+    "matched_skills": ["Python", "SQL", "Docker"],
+    "missing_skills": ["Go"],
+    "strengths": ["Strong backend experience"],
+    "ats_recommendations": ["Add a skills section"],
+    "career_advice": ["Highlight cloud projects"],
+}
+
+
+def analysis_with_score(score):
+    return {**ANALYSIS, "match_score": score}
+
+
+class TestConcurrentRendering:
+    """Reports render in parallel without shared plotting state."""
+
+    def test_distinct_reports_in_threads(self):
+        """Threads rendering different charts should all produce vector PDFs."""
+        generator = ReportGenerator()
+
+        def render(i):
+            return generator.generate_pdf_report(analysis_with_score(40 + i * 0.5)).getvalue()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            pdfs = list(executor.map(render, range(80)))
+
+        for pdf in pdfs:
+            assert pdf.startswith(b"%PDF-")
+            assert b"/Subtype /Image" not in pdf  # charts are vector, not PNGs
+
+    def test_same_chart_renders_identically_in_threads(self):
+        """A report rendered under contention should match its sequential render."""
+        generator = ReportGenerator()
+        expected = len(generator.generate_pdf_report(dict(ANALYSIS)).getvalue())
+
+        def render(_):
+            return len(generator.generate_pdf_report(dict(ANALYSIS)).getvalue())
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            sizes = list(executor.map(render, range(40)))
+
+        assert sizes == [expected] * 40
+
+    def test_benchmark_reports_without_errors(self):
+        """benchmark.py --test reports should finish with no failed renders."""
+        result = benchmark.test_report_rendering(num_reports=20, num_concurrent=4)
+        assert result["errors"] == 0
+
+    def test_identical_reports_in_threads(self):
+        """Threads sharing cached chart drawings should all produce valid PDFs."""
+        generator = ReportGenerator()
+
+        def render(_):
+            return generator.generate_pdf_report(dict(ANALYSIS)).getvalue()[:5]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            heads = list(executor.map(render, range(200)))
+
+        assert heads == [b"%PDF-"] * 200
+        assert generator.get_chart_stats()["hits"] > 0
+
+
+class TestReportPage:
+    """HTML report page served from a stored result."""
+
+    def test_interpolated_text_is_escaped(self):
+        """Markup in resume, JD or LLM text should be shown, not executed."""
+        result = {
+            **ANALYSIS,
+            "job_title": "<script>alert(1)</script>",
+            "matched_skills": ["C&C++"],
+            "ats_recommendations": ["<img src=x onerror=alert(1)>"],
+        }
+        page = ReportGenerator().generate_report_page(result, "analysis-1234")
+
+        assert "<script>" not in page and "<img" not in page
+        assert "&lt;script&gt;alert(1)&lt;/script&gt;" in page
+        assert "C&amp;C++" in page